@@ -4,7 +4,6 @@ import ipyleaflet as leaf
 import ipywidgets
 import pandas as pd
 from faicons import icon_svg
-from ratelimit import debounce
 from shiny import App, Inputs, Outputs, Session, reactive, render, req, ui
 from utils import col_numeric, create_map, density_plot, heatmap_gradient
 
@@ -168,13 +167,12 @@ def server(input: Inputs, output: Outputs, session: Session):
 
     @reactive.effect
     def _():
-        bb = reactive_read(map.widget, "bounds")
+        bb = reactive_read(map.widget, "bounds", debounce=0.3)
         if input.navbar() != "Interactive map":
             return
         with reactive.isolate():
             current_bounds.set(bb)
 
-    @debounce(0.3)
     @reactive.calc
     def zips_in_bounds():
         bb = req(current_bounds())
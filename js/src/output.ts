@@ -1,7 +1,7 @@
 import { HTMLManager, requireLoader } from '@jupyter-widgets/html-manager';
 import { ShinyComm } from './comm';
 import { findPlotlyGraphDiv, waitForPlotlyReadyToReveal } from './plotly';
-import { jsonParse } from './utils';
+import { clearChunks, finishChunks, jsonParse, receiveChunk, takeChunks, unpackBatch } from './utils';
 import type { ErrorsMessageValue } from 'rstudio-shiny/srcts/types/src/shiny/shinyapp';
 
 
@@ -91,6 +91,20 @@ class IPyWidgetOutput extends Shiny.OutputBinding {
       return;
     }
 
+    // The model's open may be in a batch that hasn't been applied yet (i.e., one that's
+    // still arriving in chunks, which can't happen until Shiny is done with this
+    // value), in which case render once it has been
+    if (!manager.get_model(data.model_id) && unappliedBatches > 0) {
+      pendingBatches.then(() => {
+        if (this._isCurrentRenderToken(el, renderToken)) {
+          return this.renderValue(el, data);
+        }
+      }).catch((err) => {
+        console.error("Error rendering widget:", err);
+      });
+      return;
+    }
+
     const isPlotlyWidget = data.widget_pkg === "plotly";
     el.style.visibility = isPlotlyWidget ? hiddenVisibility : revealVisibility;
 
@@ -220,20 +234,95 @@ if (taskQueue) {
 * Handle messages from the server-side Widget
 ******************************************************************************/
 
+// All the comm messages produced during a server-side flush arrive as one batch, which
+// we apply in order (the server guarantees that opens come before messages that
+// reference them). Batches are applied one at a time, in the order the flushes that
+// produced them happened.
+let pendingBatches: Promise<void> = Promise.resolve();
+// How many batches are yet to be applied, and how many of those are still arriving in
+// chunks
+let unappliedBatches = 0;
+let chunkedBatches = 0;
+
+function enqueueBatch(batch: () => Promise<any>): Promise<void> {
+  unappliedBatches++;
+  pendingBatches = pendingBatches
+    .then(async () => applyBatch(await batch()))
+    .catch((err) => {
+      console.error("Error applying comm messages:", err);
+    })
+    .finally(() => {
+      unappliedBatches--;
+    });
+  return pendingBatches;
+}
+
+// Shiny handles messages one at a time, waiting on what a handler returns. So, while
+// a chunked batch is still arriving, don't have it wait on batches being applied
+// (which would keep it from ever getting the rest of the chunks).
+function waitForBatches(): Promise<void> | undefined {
+  return chunkedBatches > 0 ? undefined : pendingBatches;
+}
+
+Shiny.addCustomMessageHandler("shinywidgets_comm_batch", (x) => {
+  const batch = jsonParse(x);
+  if (batch.chunks !== undefined) {
+    // A batch that was sent in chunks (all of which have arrived by now), and that
+    // already got in line when its first chunk arrived
+    finishChunks(batch.chunks);
+    chunkedBatches--;
+  } else {
+    enqueueBatch(async () => batch);
+  }
+  return waitForBatches();
+});
+
+// The pieces of a very large batch. Listen for the 'shinywidgets:chunk-progress' event
+// on document to track progress.
+Shiny.addCustomMessageHandler("shinywidgets_comm_chunk", (x) => {
+  const id = receiveChunk(x);
+  if (id !== null) {
+    // The first chunk comes with the flush that produced the batch, so that's its
+    // place in line
+    chunkedBatches++;
+    enqueueBatch(async () => jsonParse(await takeChunks(id)));
+  }
+});
+
+async function applyBatch(batch: any): Promise<void> {
+  for (const { type, msg } of await unpackBatch(batch)) {
+    const handler = commMessageHandlers[type];
+    if (!handler) {
+      console.error(`Unknown comm message type ${type}.`);
+      continue;
+    }
+    await handler(msg);
+  }
+}
+
 // Initialize the comm and model when a new widget is created
 // This is basically our version of https://github.com/jupyterlab/jupyterlab/blob/d33de15/packages/services/src/kernel/default.ts#L1144-L1176
-Shiny.addCustomMessageHandler("shinywidgets_comm_open", (msg_txt) => {
+async function handleCommOpen(msg: any): Promise<void> {
   setBaseURL();
-  const msg = jsonParse(msg_txt);
   Shiny.renderDependencies(msg.content.html_deps);
   const comm = new ShinyComm(msg.content.comm_id);
-  manager.handle_comm_open(comm, msg);
-});
+  try {
+    await manager.handle_comm_open(comm, msg);
+  } catch (err) {
+    console.error("Error opening widget model:", err);
+  }
+}
+
+// Open a whole tree of widgets (ordered children first) at once: every model gets
+// registered right away, so they're created concurrently (a model that references
+// another just waits on that model's promise), and then wait for all of them
+async function handleCommOpenBulk(msgs: any[]): Promise<void> {
+  await Promise.all(msgs.map(handleCommOpen));
+}
 
 // Handle any mutation of the model (e.g., add a marker to a map, without a full redraw)
 // Basically out version of https://github.com/jupyterlab/jupyterlab/blob/d33de15/packages/services/src/kernel/default.ts#L1200-L1215
-Shiny.addCustomMessageHandler("shinywidgets_comm_msg", async (msg_txt) => {
-  const msg = jsonParse(msg_txt);
+async function handleCommMsg(msg: any): Promise<void> {
   const id = msg.content.comm_id;
   const model = manager.get_model(id);
   if (!model) {
@@ -247,12 +336,11 @@ Shiny.addCustomMessageHandler("shinywidgets_comm_msg", async (msg_txt) => {
   } catch (err) {
     console.error("Error handling message:", err);
   }
-});
+}
 
 
 // Handle the closing of a widget/comm/model
-Shiny.addCustomMessageHandler("shinywidgets_comm_close", async (msg_txt) => {
-  const msg = jsonParse(msg_txt);
+async function handleCommClose(msg: any): Promise<void> {
   const id = msg.content.comm_id;
   const model = manager.get_model(id);
   if (!model) {
@@ -312,10 +400,21 @@ Shiny.addCustomMessageHandler("shinywidgets_comm_close", async (msg_txt) => {
   } catch (err) {
     console.error("Error during model cleanup:", err);
   }
-});
+}
+
+const commMessageHandlers: Record<string, (msg: any) => void | Promise<void>> = {
+  shinywidgets_comm_open: handleCommOpen,
+  shinywidgets_comm_open_bulk: handleCommOpenBulk,
+  shinywidgets_comm_msg: handleCommMsg,
+  shinywidgets_comm_close: handleCommClose,
+};
 
 $(document).on("shiny:disconnected", () => {
   manager.clear_state();
+  clearChunks();
+  pendingBatches = Promise.resolve();
+  unappliedBatches = 0;
+  chunkedBatches = 0;
 });
 
 // When in filling layout, some widgets (specifically, altair) incorrectly think their
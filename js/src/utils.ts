@@ -3,12 +3,142 @@ import { decode, encode } from 'base64-arraybuffer';
 // On the server, we're using jupyter_client.session.json_packer to serialize messages,
 // and it encodes binary data (i.e., buffers) as base64, so decode it before passing it
 // along to the comm logic
-function jsonParse(x: string) {
+function jsonParse(x: string | ArrayBuffer) {
+  if (typeof x !== "string") {
+    return binaryParse(x);
+  }
   const msg = JSON.parse(x);
   msg.buffers = msg.buffers.map((base64: string) => new DataView(decode(base64)));
   return msg;
 }
 
+// When SHINYWIDGETS_BINARY_BUFFERS is enabled, messages with buffers arrive as binary
+// frames (see pack_binary_frame() on the server) laid out as:
+//   [4 byte header length][JSON header][buffer 0][buffer 1]...
+// where the header's buffers field holds the byte length of each buffer.
+function binaryParse(x: ArrayBuffer) {
+  const headerLength = new DataView(x, 0, 4).getUint32(0);
+  const header = new TextDecoder().decode(new Uint8Array(x, 4, headerLength));
+  const msg = JSON.parse(header);
+  let offset = 4 + headerLength;
+  msg.buffers = msg.buffers.map((byteLength: number) => {
+    const buf = new DataView(x, offset, byteLength);
+    offset += byteLength;
+    return buf;
+  });
+  return msg;
+}
+
+// Comm messages arrive in batches (one per server-side flush phase). Each message's
+// buffers are either base64 strings or, when the batch is a binary frame, the byte
+// lengths of the message's share of the frame's buffers (which are in message order).
+// Large messages may arrive deflate compressed (see SHINYWIDGETS_COMPRESS_THRESHOLD),
+// in which case the compressed payload is either base64 text or the frame buffer
+// preceding the message's own buffers. Takes the batch as parsed by jsonParse().
+async function unpackBatch(batch: any): Promise<{ type: string, msg: any }[]> {
+  const frameBuffers: DataView[] = batch.buffers;
+  let i = 0;
+  const result: { type: string, msg: any }[] = [];
+  for (const entry of batch.messages) {
+    let msg = entry.msg;
+    if (entry.deflate !== undefined) {
+      const payload = typeof entry.deflate === "string" ?
+        new DataView(decode(entry.deflate)) : frameBuffers[i++];
+      msg = JSON.parse(await inflate(payload));
+    }
+    // A bulk open's message is a list of open messages
+    for (const m of Array.isArray(msg) ? msg : [msg]) {
+      m.buffers = m.buffers.map((buf: string | number) => {
+        return typeof buf === "string" ? new DataView(decode(buf)) : frameBuffers[i++];
+      });
+    }
+    result.push({ type: entry.type, msg });
+  }
+  return result;
+}
+
+// A chunk is either JSON (a piece of the batch's text) or, for a binary batch, a binary
+// frame whose one buffer is a piece of the batch's frame
+type Chunk = {
+  id: string, comm_ids: string[], index: number, total: number, data?: string, buffers?: DataView[]
+};
+
+type PendingChunks = {
+  pieces: (string | DataView)[],
+  received: number,
+  done: Promise<string | ArrayBuffer>,
+  resolve: (x: string | ArrayBuffer) => void,
+};
+
+const pendingChunks = new Map<string, PendingChunks>();
+
+function getPendingChunks(id: string): PendingChunks {
+  let pending = pendingChunks.get(id);
+  if (!pending) {
+    let resolve: (x: string | ArrayBuffer) => void;
+    const done = new Promise<string | ArrayBuffer>((r) => { resolve = r; });
+    pending = { pieces: [], received: 0, done, resolve };
+    pendingChunks.set(id, pending);
+  }
+  return pending;
+}
+
+// A very large batch gets sent in chunks (see SHINYWIDGETS_CHUNK_SIZE), ahead of a
+// batch that just refers to them. The first chunk comes with the server-side flush
+// that produced the batch (and the rest after it). Collect the pieces, and let anyone
+// listening know how far along they are. Returns the batch's id if this is its first
+// piece.
+function receiveChunk(x: Chunk | ArrayBuffer): string | null {
+  const chunk: Chunk = x instanceof ArrayBuffer ? binaryParse(x) : x;
+  const pending = getPendingChunks(chunk.id);
+  pending.pieces[chunk.index] = chunk.data !== undefined ? chunk.data : chunk.buffers[0];
+  pending.received++;
+  document.dispatchEvent(new CustomEvent("shinywidgets:chunk-progress", {
+    detail: { comm_ids: chunk.comm_ids, received: pending.received, total: chunk.total },
+  }));
+  return chunk.index === 0 ? chunk.id : null;
+}
+
+// Called once the batch that refers to the chunks arrives (by which time all of them
+// have arrived too)
+function finishChunks(id: string): void {
+  const pending = getPendingChunks(id);
+  pending.resolve(joinChunks(pending.pieces));
+}
+
+function joinChunks(pieces: (string | DataView)[]): string | ArrayBuffer {
+  if (typeof pieces[0] === "string") {
+    return pieces.join("");
+  }
+  const views = pieces as DataView[];
+  const result = new Uint8Array(views.reduce((n, v) => n + v.byteLength, 0));
+  let offset = 0;
+  for (const v of views) {
+    result.set(new Uint8Array(v.buffer, v.byteOffset, v.byteLength), offset);
+    offset += v.byteLength;
+  }
+  return result.buffer;
+}
+
+function clearChunks(): void {
+  pendingChunks.clear();
+}
+
+// Wait for (all the pieces of) a chunked batch
+async function takeChunks(id: string): Promise<string | ArrayBuffer> {
+  const result = await getPendingChunks(id).done;
+  pendingChunks.delete(id);
+  return result;
+}
+
+// zlib.compress() on the server produces what DecompressionStream calls "deflate"
+async function inflate(payload: DataView): Promise<string> {
+  const stream = new Blob([payload]).stream().pipeThrough(
+    new (window as any).DecompressionStream("deflate")
+  );
+  return new Response(stream).text();
+}
+
 function normalizeBufferPayload(payload: ArrayBuffer | ArrayBufferView): ArrayBuffer {
   if (!ArrayBuffer.isView(payload)) {
     return payload;
@@ -88,4 +218,4 @@ class Throttler {
 }
 
 
-export { base64EncodeBuffers, jsonParse, Throttler };
+export { base64EncodeBuffers, clearChunks, finishChunks, jsonParse, receiveChunk, takeChunks, Throttler, unpackBatch };
@@ -16,7 +16,8 @@ except ImportError:
         __version__ = "0+unknown"
 
 from ._as_widget import as_widget
-from ._dependencies import bokeh_dependency
+from ._comm import queue_overflow_counts
+from ._dependencies import bokeh_dependency, clear_dependency_cache
 from ._output_widget import output_widget
 from ._render_widget import (
     render_altair,
@@ -42,6 +43,8 @@ __all__ = (
     # Other methods last
     "as_widget",
     "bokeh_dependency",
+    "clear_dependency_cache",
+    "queue_overflow_counts",
     # Soft deprecated
     "register_widget",
 )
@@ -1,14 +1,107 @@
+import asyncio
+import itertools
+import math
+import os
+import warnings
+import zlib
 from base64 import b64encode
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from weakref import WeakSet, WeakValueDictionary
 
+from ipywidgets.widgets.widget import _remove_buffers
+from shiny import Session
 from shiny.session import get_current_session
 
-from ._serialization import json_packer
+from ._serialization import json_packer, pack_binary_frame
+
+# Opt-in to sending comm buffers as raw binary WebSocket frames (instead of base64
+# strings embedded in the JSON text). Falls back to base64 when the session's transport
+# can't carry binary frames.
+SHINYWIDGETS_BINARY_BUFFERS = (
+    os.getenv("SHINYWIDGETS_BINARY_BUFFERS", "false").lower() == "true"
+)
+
+# Comm messages whose JSON text is at least this many bytes get deflate compressed
+# (and inflated client-side) before they're sent. Set to 0 to disable compression.
+SHINYWIDGETS_COMPRESS_THRESHOLD = int(os.getenv("SHINYWIDGETS_COMPRESS_THRESHOLD", "0"))
+
+# Batches of comm messages larger than this many bytes get sent in pieces (as separate
+# 'shinywidgets_comm_chunk' messages) ahead of the batch, which then just refers to
+# them. Only the first piece goes out with the reactive flush; the rest (and then the
+# batch) go out from a task that yields to the event loop in between pieces, so that a
+# huge widget state doesn't hold up the flush (and other sessions) while it goes out.
+# Set to 0 to disable chunking.
+SHINYWIDGETS_CHUNK_SIZE = int(os.getenv("SHINYWIDGETS_CHUNK_SIZE", "0"))
+
+# Caps on how much comm traffic a session may have pending at once, i.e., produced but
+# not yet written to the client's socket. That's what's queued in the current flush,
+# plus what previous flushes are still sending (the pieces of chunked batches, which go
+# out at the pace of the client). What to do with a state update that would exceed a
+# cap:
+#   * "coalesce": hold it back, merged with the widget's other held back updates (last
+#     write wins per trait), until the session's pending traffic is under the caps again.
+#   * "drop": drop it, and just remember which traits of the widget were dropped. Once
+#     back under the caps, their current values get sent.
+#   * "block": nothing is held back, but the session's next flush waits until what
+#     previous flushes are still sending gets under the caps (which holds up the
+#     session's reactivity, and thus whatever is producing the traffic).
+# Widget opens, closes, and custom messages are never held back or dropped (but they
+# count towards the caps). 0 means no cap.
+SHINYWIDGETS_QUEUE_MAX_BYTES = int(os.getenv("SHINYWIDGETS_QUEUE_MAX_BYTES", "0"))
+SHINYWIDGETS_QUEUE_MAX_MESSAGES = int(os.getenv("SHINYWIDGETS_QUEUE_MAX_MESSAGES", "0"))
+SHINYWIDGETS_QUEUE_OVERFLOW = os.getenv("SHINYWIDGETS_QUEUE_OVERFLOW", "coalesce")
+
+OVERFLOW_POLICIES = ("coalesce", "drop", "block")
+if SHINYWIDGETS_QUEUE_OVERFLOW not in OVERFLOW_POLICIES:
+    raise ValueError(
+        f"SHINYWIDGETS_QUEUE_OVERFLOW must be one of {OVERFLOW_POLICIES}, "
+        f"not {SHINYWIDGETS_QUEUE_OVERFLOW!r}"
+    )
+
+# How often each overflow policy has fired (across all sessions in this process): how
+# many state updates were held back or dropped, or how many flushes were blocked
+OVERFLOW_COUNTS: Dict[str, int] = {policy: 0 for policy in OVERFLOW_POLICIES}
+
+
+def queue_overflow_counts(session: Optional[Session] = None) -> Dict[str, int]:
+    """
+    How often each `SHINYWIDGETS_QUEUE_OVERFLOW` policy has fired.
+
+    When a session's pending comm traffic exceeds `SHINYWIDGETS_QUEUE_MAX_BYTES` or
+    `SHINYWIDGETS_QUEUE_MAX_MESSAGES`, state updates get held back ("coalesce") or
+    dropped ("drop"), or the session's next flush waits for the traffic to drain
+    ("block"). The counts are the number of state updates held back or dropped, and
+    the number of flushes blocked.
+
+    Parameters
+    ----------
+    session
+        The session to count for. If `None`, the counts are for all sessions (since
+        the process started).
+    """
+    if session is None:
+        return dict(OVERFLOW_COUNTS)
+    return dict(CommMessageQueue.get(session).overflow_counts)
 
 
+# Each (root) session has its own registry of comms (and the widgets they belong to),
+# so inbound messages only ever reach the session's own comms, and session teardown
+# only has to visit the session's own widgets.
 class ShinyCommManager:
-    comms: Dict[str, "ShinyComm"] = {}
+    def __init__(self) -> None:
+        self.comms: Dict[str, "ShinyComm"] = {}
+        # model_id -> widget (weakly held, since closed widgets may be gc'd anytime)
+        self.widgets: "WeakValueDictionary[str, Any]" = WeakValueDictionary()
+
+    @staticmethod
+    def get(session: Session) -> "ShinyCommManager":
+        session = session.root_scope()
+        manager = vars(session).get("__shinywidget_comm_manager")
+        if manager is None:
+            manager = ShinyCommManager()
+            vars(session)["__shinywidget_comm_manager"] = manager
+        return manager
 
     def register_comm(self, comm: "ShinyComm") -> str:
         id = comm.comm_id
@@ -36,6 +129,8 @@ class ShinyComm:
     _close_callback: Optional[MsgCallback]
     _closed: bool = False
     _closed_data: Dict[str, object] = {}
+    # The size of the comm_open message (once it's been queued)
+    open_nbytes: int = 0
 
     def __init__(
         self,
@@ -61,7 +156,7 @@ class ShinyComm:
     ) -> None:
         self.comm_manager.register_comm(self)
         try:
-            self._publish_msg(
+            item = self._publish_msg(
                 "shinywidgets_comm_open",
                 data=data,
                 metadata=metadata,
@@ -70,6 +165,7 @@ class ShinyComm:
                 target_module=None,
                 **keys,
             )
+            self.open_nbytes = item.nbytes()
             self._closed = False
         except Exception:
             self.comm_manager.unregister_comm(self)
@@ -120,7 +216,7 @@ class ShinyComm:
         metadata: MetadataType = None,
         buffers: BufferType = None,
         **keys: object,
-    ) -> None:
+    ) -> "QueuedMessage":
         data = {} if data is None else data
         metadata = {} if metadata is None else metadata
 
@@ -141,13 +237,17 @@ class ShinyComm:
                         "Buffer objects must support the buffer protocol."
                     ) from e
 
-        # Construct the message payload
+        session = get_current_session()
+        if session is None:
+            raise RuntimeError(
+                "Cannot send an ipywidget messages to the client outside of a Shiny session context."
+            )
+
+        # Construct the message payload (the queue fills in the buffers, since how
+        # they get encoded depends on the transport)
         msg = dict(
             content=dict(data=data, comm_id=self.comm_id, **keys),
             metadata=metadata,
-            # Since Shiny doesn't currently have support for sending binary data, we base64 encode
-            # it (and decode whenever it's received).
-            buffers=[b64encode(b).decode("ascii") for b in buffers],
             # I don't think this value matters unless we decide we want to sign
             # the message in a similar way to the kernel (since we don't
             # necessarily execute code from the client, it doesn't seem necessary)
@@ -157,16 +257,86 @@ class ShinyComm:
             parent={},  # self.kernel.get_parent("shell")
         )
 
-        session = get_current_session()
-        if session is None:
-            raise RuntimeError(
-                "Cannot send an ipywidget messages to the client outside of a Shiny session context."
-            )
+        return CommMessageQueue.get(session).enqueue(msg_type, msg, buffers)
 
-        msg_txt = json_packer(msg)
+    # This is the method that ipywidgets.widgets.Widget uses to respond to client-side changes
+    def on_msg(self, callback: MsgCallback) -> None:
+        self._msg_callback = callback
 
-        async def _send():
-            await session.send_custom_message(msg_type, msg_txt)  # type: ignore
+    def on_close(self, callback: MsgCallback) -> None:
+        self._close_callback = callback
+
+    def handle_msg(self, msg: Dict[str, object]) -> None:
+        if self._msg_callback is not None:
+            self._msg_callback(msg)
+
+    def handle_close(self, msg: Dict[str, object]) -> None:
+        if self._close_callback is not None:
+            self._close_callback(msg)
+
+
+@dataclass
+class QueuedMessage:
+    msg_type: str
+    msg: Dict[str, object]
+    # Raw buffers (how they get encoded depends on the transport)
+    buffers: List[object]
+    # The JSON text of the message (None if it needs to be re-serialized)
+    msg_txt: Optional[str] = None
+
+    def nbytes(self) -> int:
+        n = len(self.msg_txt) if self.msg_txt is not None else 0
+        return n + sum(memoryview(b).nbytes for b in self.buffers)  # type: ignore[arg-type]
+
+
+# Every comm message produced during a reactive flush gets collected here (one queue per
+# session) and shipped to the client as a single 'shinywidgets_comm_batch' message per
+# flush phase. The client applies the messages of a batch in order.
+class CommMessageQueue:
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self._send_bytes = (
+            binary_sender(session) if SHINYWIDGETS_BINARY_BUFFERS else None
+        )
+        self._flush_queue: List[QueuedMessage] = []
+        self._flushed_queue: List[QueuedMessage] = []
+        self._flush_scheduled = False
+        self._flushed_scheduled = False
+        # comm_id -> pending state update that later updates can still be merged into
+        self._pending_updates: Dict[str, QueuedMessage] = {}
+        # (An upper bound on) the size of what's queued for each phase
+        self._flush_nbytes = 0
+        self._flushed_nbytes = 0
+        # The messages (and bytes) that have been handed to the transport, but not yet
+        # written (i.e., the remaining pieces of chunked batches)
+        self._sending_messages = 0
+        self._sending_nbytes = 0
+        self._drain_waiters: "List[asyncio.Future[None]]" = []
+        # comm_id -> state update held back by the "coalesce" overflow policy
+        self._held: Dict[str, QueuedMessage] = {}
+        # comm_id -> (an update to send the current state with, the traits to send)
+        # for the "drop" overflow policy
+        self._dropped: Dict[str, "tuple[QueuedMessage, Set[object]]"] = {}
+        self._chunk_ids = itertools.count()
+        self._chunk_tasks: "Set[asyncio.Task[None]]" = set()
+        # How often each overflow policy has fired for this session
+        self.overflow_counts: Dict[str, int] = {p: 0 for p in OVERFLOW_POLICIES}
+
+    @staticmethod
+    def get(session: Session) -> "CommMessageQueue":
+        session = session.root_scope()
+        queue = vars(session).get("__shinywidget_comm_queue")
+        if queue is None:
+            queue = CommMessageQueue(session)
+            vars(session)["__shinywidget_comm_queue"] = queue
+        return queue
+
+    def enqueue(
+        self, msg_type: str, msg: Dict[str, object], buffers: List[object]
+    ) -> QueuedMessage:
+        item = QueuedMessage(msg_type, msg, list(buffers))
+        # Serialize now so that un-serializable state errors out where it was produced
+        self._serialize(item)
 
         # N.B., if messages are sent immediately, run_coro_sync() could fail with
         # 'async function yielded control; it did not finish in one iteration.'
@@ -181,24 +351,456 @@ class ShinyComm:
             # widgets introduced by the update have already sent their comm_open
             # messages. Without that ordering, the browser can receive a parent update
             # that references child models it does not know about yet.
-            session.on_flushed(_send)
+            if self._coalesce(item) or self._hold(item):
+                return item
+            self._schedule_flushed()
+            self._flushed_queue.append(item)
+            self._flushed_nbytes += item.nbytes()
+            if _update_data(item) is not None:
+                self._pending_updates[_comm_id(item.msg)] = item
+        else:
+            if not self._flush_scheduled:
+                self._session.on_flush(self._send_flush)
+                self._flush_scheduled = True
+            self._flush_queue.append(item)
+            self._flush_nbytes += item.nbytes()
+
+        return item
+
+    def _schedule_flushed(self) -> None:
+        if not self._flushed_scheduled:
+            self._session.on_flushed(self._send_flushed)
+            self._flushed_scheduled = True
+
+    # Setting traits in a loop (or setting the same trait repeatedly) produces an
+    # 'update' message per assignment. Merge those into the comm's pending update
+    # (last write wins per trait), so long as nothing else (e.g., a custom message
+    # or a close) was queued in between; that keeps custom messages in order
+    # relative to the state updates around them.
+    def _coalesce(self, item: QueuedMessage) -> bool:
+        comm_id = _comm_id(item.msg)
+        update = _update_data(item)
+        if update is None:
+            # Anything that isn't a state update is a barrier for merging
+            self._pending_updates.clear()
+            return False
+
+        pending = self._pending_updates.get(comm_id)
+        if pending is None:
+            return False
+
+        merge_update(_update_data(pending), pending.buffers, update, item.buffers)  # type: ignore[arg-type]
+        pending.msg_txt = None
+        self._flushed_nbytes += item.nbytes()
+        return True
+
+    # Apply the overflow policy to a message that's about to be queued. Returns True
+    # if it got held back (or dropped).
+    def _hold(self, item: QueuedMessage) -> bool:
+        if SHINYWIDGETS_QUEUE_MAX_MESSAGES <= 0 and SHINYWIDGETS_QUEUE_MAX_BYTES <= 0:
+            return False
+        policy = SHINYWIDGETS_QUEUE_OVERFLOW
+        comm_id = _comm_id(item.msg)
+        data = _update_data(item)
+        if data is None:
+            # Keep messages in order relative to the widget's held back state (unless
+            # it's being closed anyway)
+            if item.msg_type == "shinywidgets_comm_close":
+                self._held.pop(comm_id, None)
+                self._dropped.pop(comm_id, None)
+            else:
+                self._release(comm_id)
+            return False
+
+        # Once a widget has updates held back, its later updates have to be too (lest
+        # they get overwritten by the earlier ones)
+        held = comm_id in self._held or comm_id in self._dropped
+        if policy == "block" or not (held or self._over_cap(1, item.nbytes())):
+            return False
+
+        self._record_overflow(policy)
+        # (Nor can they be merged into the update that's already queued)
+        self._pending_updates.pop(comm_id, None)
+        # (The end of the flush is the first chance to send them)
+        self._schedule_flushed()
+        if policy == "coalesce":
+            pending = self._held.get(comm_id)
+            if pending is None:
+                self._held[comm_id] = item
+            else:
+                merge_update(_update_data(pending), pending.buffers, data, item.buffers)  # type: ignore[arg-type]
+                pending.msg_txt = None
         else:
-            session.on_flush(_send)
+            # Keep the message (minus its state) around to send the current state with
+            _, traits = self._dropped.setdefault(comm_id, (item, set()))
+            new_traits = update_traits(data)
+            traits.update(new_traits)
+            remove_traits(data, item.buffers, new_traits)
+        return True
+
+    # Queue the held back (or dropped) state of a widget (ahead of whatever is about to
+    # be queued for it)
+    def _release(self, comm_id: str) -> None:
+        if comm_id not in self._held and comm_id not in self._dropped:
+            return
+        for x in self._take_held([comm_id]):
+            self._flushed_queue.append(x)
+            self._flushed_nbytes += x.nbytes()
+        self._schedule_flushed()
+
+    def _take_held(self, comm_ids: List[str]) -> List[QueuedMessage]:
+        items: List[QueuedMessage] = []
+        for comm_id in comm_ids:
+            held = self._held.pop(comm_id, None)
+            if held is not None:
+                if held.msg_txt is None:
+                    self._serialize(held)
+                items.append(held)
+            dropped = self._dropped.pop(comm_id, None)
+            if dropped is not None:
+                item = self._current_state(*dropped)
+                if item is not None:
+                    items.append(item)
+        return items
+
+    # An 'update' message with the current value of a widget's (dropped) traits
+    def _current_state(
+        self, item: QueuedMessage, traits: Set[object]
+    ) -> Optional[QueuedMessage]:
+        widget = ShinyCommManager.get(self._session).widgets.get(_comm_id(item.msg))
+        if widget is None:
+            return None
+        state, buffer_paths, buffers = _remove_buffers(
+            widget.get_state([t for t in traits if isinstance(t, str)])
+        )
+        data = {"method": "update", "state": state, "buffer_paths": buffer_paths}
+        content = dict(item.msg["content"], data=data)  # type: ignore[arg-type]
+        msg = dict(item.msg, content=content)
+        result = QueuedMessage(item.msg_type, msg, buffers)
+        self._serialize(result)
+        return result
+
+    # Send whatever's held back, if the session is under the caps again
+    async def _send_held(self) -> None:
+        if not (self._held or self._dropped) or self._over_cap():
+            return
+        comm_ids = list(dict.fromkeys([*self._held, *self._dropped]))
+        await self._send_batch(self._take_held(comm_ids))
+
+    def _over_cap(self, n: int = 0, nbytes: int = 0, queued: bool = True) -> bool:
+        n += self._sending_messages
+        nbytes += self._sending_nbytes
+        if queued:
+            n += len(self._flush_queue) + len(self._flushed_queue)
+            nbytes += self._flush_nbytes + self._flushed_nbytes
+        n_max = SHINYWIDGETS_QUEUE_MAX_MESSAGES
+        bytes_max = SHINYWIDGETS_QUEUE_MAX_BYTES
+        return (n_max > 0 and n > n_max) or (bytes_max > 0 and nbytes > bytes_max)
+
+    # With the "block" overflow policy, wait (before sending a flush's messages) until
+    # what's still being sent from previous flushes is under the caps
+    async def _wait_for_drain(self) -> None:
+        if SHINYWIDGETS_QUEUE_OVERFLOW != "block" or not self._over_cap(queued=False):
+            return
+        self._record_overflow("block")
+        loop = asyncio.get_running_loop()
+        while self._over_cap(queued=False):
+            waiter: "asyncio.Future[None]" = loop.create_future()
+            self._drain_waiters.append(waiter)
+            await waiter
+
+    def _sending(self, n: int, nbytes: int) -> None:
+        self._sending_messages += n
+        self._sending_nbytes += nbytes
+        if n < 0 or nbytes < 0:
+            waiters, self._drain_waiters = self._drain_waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _record_overflow(self, policy: str) -> None:
+        self.overflow_counts[policy] += 1
+        OVERFLOW_COUNTS[policy] += 1
+
+    def _is_binary(self, buffers: List[object]) -> bool:
+        return bool(buffers) and self._send_bytes is not None
+
+    def _serialize(self, item: QueuedMessage) -> str:
+        if self._is_binary(item.buffers):
+            # The client slices these (byte lengths) out of the binary frame
+            item.msg["buffers"] = [memoryview(b).nbytes for b in item.buffers]  # type: ignore[arg-type]
+        else:
+            # Shiny's custom messages are JSON text, so (unless we can write binary
+            # frames directly) we base64 encode buffers (and decode whenever it's received).
+            item.msg["buffers"] = [
+                b64encode(b).decode("ascii")  # type: ignore[arg-type]
+                for b in item.buffers
+            ]
+        item.msg_txt = json_packer(item.msg)
+        return item.msg_txt
+
+    async def _send_flush(self) -> None:
+        await self._wait_for_drain()
+        items, self._flush_queue = self._flush_queue, []
+        self._flush_scheduled = False
+        self._flush_nbytes = 0
+        await self._send_batch(items)
+
+    async def _send_flushed(self) -> None:
+        await self._wait_for_drain()
+        items, self._flushed_queue = self._flushed_queue, []
+        self._flushed_scheduled = False
+        self._pending_updates.clear()
+        self._flushed_nbytes = 0
+        await self._send_batch(items)
+        await self._send_held()
+
+    async def _send_batch(self, items: List[QueuedMessage]) -> None:
+        if not items:
+            return
 
-    # This is the method that ipywidgets.widgets.Widget uses to respond to client-side changes
-    def on_msg(self, callback: MsgCallback) -> None:
-        self._msg_callback = callback
+        # The messages are already serialized (unless they've since been merged with
+        # other updates), so just splice them together
+        entries: List[str] = []
+        buffers: List[object] = []
+        for x in self._bundle_opens(items):
+            msg_txt = x.msg_txt or self._serialize(x)
+            msg_bytes = msg_txt.encode("utf-8")
+            threshold = SHINYWIDGETS_COMPRESS_THRESHOLD
+            if threshold > 0 and len(msg_bytes) >= threshold:
+                # The 'deflate' field marks a compressed message. Its value is either
+                # base64 text or (for binary frames) the byte length of the frame
+                # buffer that precedes the message's own buffers.
+                deflated = zlib.compress(msg_bytes)
+                if self._is_binary([deflated]):
+                    buffers.append(deflated)
+                    payload = str(len(deflated))
+                else:
+                    payload = '"' + b64encode(deflated).decode("ascii") + '"'
+                entry = f'{{"type":"{x.msg_type}","deflate":{payload}}}'
+            else:
+                entry = f'{{"type":"{x.msg_type}","msg":{msg_txt}}}'
+            entries.append(entry)
+            if self._is_binary(x.buffers):
+                buffers.extend(x.buffers)
+
+        batch_txt = '{"messages":[' + ",".join(entries) + "]"
+
+        if buffers and self._send_bytes is not None:
+            # Top-level buffer lengths let the client slice all the buffers out of the
+            # frame, then each message takes as many as it has buffer lengths.
+            lengths = json_packer([memoryview(b).nbytes for b in buffers])  # type: ignore[arg-type]
+            batch_txt += ',"buffers":' + lengths + "}"
+            frame = pack_binary_frame("shinywidgets_comm_batch", batch_txt, buffers)
+            chunk_size = SHINYWIDGETS_CHUNK_SIZE
+            if 0 < chunk_size < len(frame):
+                # (What the client gets is the frame minus the message type prefix)
+                await self._send_chunks(items, memoryview(frame)[1 + frame[0] :])
+                return
+            self._sending(len(items), len(frame))
+            try:
+                await self._send_bytes(frame)
+            finally:
+                self._sending(-len(items), -len(frame))
+            return
 
-    def on_close(self, callback: MsgCallback) -> None:
-        self._close_callback = callback
+        batch_txt += ',"buffers":[]}'
+        chunk_size = SHINYWIDGETS_CHUNK_SIZE
+        if 0 < chunk_size < len(batch_txt):
+            await self._send_chunks(items, batch_txt)
+            return
 
-    def handle_msg(self, msg: Dict[str, object]) -> None:
-        if self._msg_callback is not None:
-            self._msg_callback(msg)
+        self._sending(len(items), len(batch_txt))
+        try:
+            await self._session.send_custom_message(
+                "shinywidgets_comm_batch",
+                batch_txt,  # type: ignore
+            )
+        finally:
+            self._sending(-len(items), -len(batch_txt))
+
+    # Consecutive opens (e.g., a widget and all of its children, which are already
+    # ordered children first) go out as one 'bulk' entry whose message is the list of
+    # open messages, so the client can create all of the models at once.
+    def _bundle_opens(self, items: List[QueuedMessage]) -> List[QueuedMessage]:
+        result: List[QueuedMessage] = []
+        run: List[QueuedMessage] = []
+
+        def end_run() -> None:
+            if len(run) > 1:
+                bulk = QueuedMessage(
+                    "shinywidgets_comm_open_bulk",
+                    # (Only used to label the entry)
+                    run[0].msg,
+                    [b for x in run if self._is_binary(x.buffers) for b in x.buffers],
+                    "[" + ",".join(x.msg_txt or self._serialize(x) for x in run) + "]",
+                )
+                result.append(bulk)
+            else:
+                result.extend(run)
+            run.clear()
+
+        for x in items:
+            if x.msg_type == "shinywidgets_comm_open":
+                run.append(x)
+            else:
+                end_run()
+                result.append(x)
+        end_run()
+        return result
+
+    # Send a large batch in pieces, followed by a batch that refers to them. The first
+    # piece goes out now (i.e., with the flush, so the client knows the batch is on its
+    # way before it gets the flush's output values), and the rest from a task (so
+    # that the flush, and with it the reactive lock, isn't held up while they go
+    # out), yielding to the event loop in between.
+    async def _send_chunks(
+        self, items: List[QueuedMessage], payload: "str | memoryview"
+    ) -> None:
+        chunk_size = SHINYWIDGETS_CHUNK_SIZE
+        chunk_id = f"chunk-{next(self._chunk_ids)}"
+        comm_ids = [_comm_id(x.msg) for x in items]
+        total = math.ceil(len(payload) / chunk_size)
+
+        async def _send_piece(index: int) -> None:
+            piece = payload[index * chunk_size : (index + 1) * chunk_size]
+            chunk: Dict[str, object] = {
+                "id": chunk_id,
+                "comm_ids": comm_ids,
+                "index": index,
+                "total": total,
+            }
+            if isinstance(piece, str):
+                await self._session.send_custom_message(
+                    "shinywidgets_comm_chunk", dict(chunk, data=piece)
+                )
+            elif self._send_bytes is not None:
+                header = json_packer(dict(chunk, buffers=[len(piece)]))
+                await self._send_bytes(
+                    pack_binary_frame("shinywidgets_comm_chunk", header, [piece])
+                )
+
+        async def _send_rest() -> None:
+            unsent = len(payload) - min(chunk_size, len(payload))
+            try:
+                for index in range(1, total):
+                    await asyncio.sleep(0)
+                    await _send_piece(index)
+                    piece_size = min(chunk_size, unsent)
+                    unsent -= piece_size
+                    self._sending(0, -piece_size)
+                await self._session.send_custom_message(
+                    "shinywidgets_comm_batch",
+                    f'{{"chunks":"{chunk_id}","buffers":[]}}',  # type: ignore
+                )
+            finally:
+                self._sending(-len(items), -unsent)
+            await self._send_held()
+
+        # (The pieces count towards the caps on pending traffic until they're sent)
+        self._sending(len(items), len(payload))
+        try:
+            await _send_piece(0)
+        except BaseException:
+            self._sending(-len(items), -len(payload))
+            raise
+        self._sending(0, -min(chunk_size, len(payload)))
+        task = asyncio.ensure_future(_send_rest())
+        self._chunk_tasks.add(task)
+        task.add_done_callback(self._chunk_tasks.discard)
 
-    def handle_close(self, msg: Dict[str, object]) -> None:
-        if self._close_callback is not None:
-            self._close_callback(msg)
+
+def _comm_id(msg: Dict[str, object]) -> str:
+    return msg["content"]["comm_id"]  # type: ignore[index]
+
+
+def _update_data(item: QueuedMessage) -> Optional[Dict[str, object]]:
+    if item.msg_type != "shinywidgets_comm_msg":
+        return None
+    data = item.msg["content"]["data"]  # type: ignore[index]
+    if not isinstance(data, dict) or data.get("method") != "update":
+        return None
+    return data
+
+
+def update_traits(data: Dict[str, object]) -> Set[object]:
+    """
+    The traits that an 'update' message sets.
+    """
+    # Buffers are pulled out of the state (see ipywidgets' _remove_buffers()), so a
+    # trait is being set if it's in the state or the root of a buffer path
+    state: Dict[str, object] = data.get("state", {})  # type: ignore[assignment]
+    paths: List[List[object]] = data.get("buffer_paths", [])  # type: ignore[assignment]
+    return set(state).union(p[0] for p in paths)
+
+
+def remove_traits(
+    data: Dict[str, object], buffers: List[object], traits: Set[object]
+) -> None:
+    """
+    Remove `traits` (and their buffers) from an 'update' message (in place).
+    """
+    state: Dict[str, object] = data.setdefault("state", {})  # type: ignore[assignment]
+    paths: List[List[object]] = data.setdefault("buffer_paths", [])  # type: ignore[assignment]
+    keep = [i for i, p in enumerate(paths) if p[0] not in traits]
+    paths[:] = [paths[i] for i in keep]
+    buffers[:] = [buffers[i] for i in keep]
+    for k in traits:
+        state.pop(k, None)  # type: ignore[call-overload]
+
+
+def merge_update(
+    data: Dict[str, object],
+    buffers: List[object],
+    new_data: Dict[str, object],
+    new_buffers: List[object],
+) -> None:
+    """
+    Merge the `new_data` 'update' message (and its buffers) into `data` (in place).
+    """
+    remove_traits(data, buffers, update_traits(new_data))
+    data["state"].update(new_data.get("state", {}))  # type: ignore[attr-defined]
+    data["buffer_paths"].extend(new_data.get("buffer_paths", []))  # type: ignore[attr-defined]
+    buffers.extend(new_buffers)
+
+
+def binary_sender(session: Session) -> Optional[Callable[[bytes], Awaitable[None]]]:
+    """
+    Get a function that sends a binary WebSocket frame to the session's client.
+
+    Shiny's public API only knows how to send text, so this is the one place that
+    reaches into its privates: in a real app, the (root) session's `_conn` is a
+    `shiny._connection.StarletteConnection`, whose `conn` is the Starlette WebSocket
+    (which has `send_bytes()`), and whose `_is_closed()`/`close()` we use the same
+    way `Connection.send()` does. Client-side, Shiny dispatches a binary frame to the
+    custom message handler named by the frame's length-prefixed header (see
+    `pack_binary_frame()`).
+
+    Returns `None` (with a warning, since the caller falls back to base64) if the
+    session's transport doesn't look like that.
+    """
+    conn = getattr(session.root_scope(), "_conn", None)
+    send_bytes = getattr(getattr(conn, "conn", None), "send_bytes", None)
+    if conn is None or not callable(send_bytes):
+        warnings.warn(
+            "SHINYWIDGETS_BINARY_BUFFERS is enabled, but the session's connection "
+            f"({type(conn).__name__}) can't send binary WebSocket frames. "
+            "Falling back to sending buffers as base64 text.",
+            stacklevel=2,
+        )
+        return None
+
+    async def _send(frame: bytes) -> None:
+        is_closed = getattr(conn, "_is_closed", None)
+        if callable(is_closed) and is_closed():
+            return
+        # Same contract as Connection.send(): never throw, close the socket instead
+        try:
+            await send_bytes(frame)
+        except Exception:
+            await conn.close(1008, "Send failure")
+
+    return _send
 
 
 @dataclass
@@ -226,3 +828,38 @@ class OrphanedShinyComm:
 
     def on_msg(self, callback: MsgCallback) -> None:
         pass
+
+
+@dataclass
+class SharedModelComm:
+    """
+    A stand-in `ShinyComm` for a widget whose model is shared with other (identical)
+    widgets. The first time the widget tries to send anything (i.e., one of its traits
+    changed), `on_write` gets called, which should give the widget its own comm. When
+    the widget gets closed, `on_close` gets called (so the shared model can be closed
+    once no widget uses it).
+    """
+
+    comm_id: str
+    on_write: Callable[[], None]
+    on_close: Callable[[], None]
+    # The widgets whose state references this one (and so need to be told about the
+    # widget's new model once it has its own)
+    parents: "WeakSet[Any]" = field(default_factory=WeakSet)
+
+    def send(
+        self,
+        *args: object,
+        **kwargs: object,
+    ) -> None:
+        self.on_write()
+
+    def close(
+        self,
+        *args: object,
+        **kwargs: object,
+    ) -> None:
+        self.on_close()
+
+    def on_msg(self, callback: MsgCallback) -> None:
+        pass
@@ -5,7 +5,7 @@ import re
 import tempfile
 import warnings
 from types import ModuleType
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import packaging.version
 from htmltools import HTMLDependency, tags
@@ -18,6 +18,7 @@ from jupyter_core.paths import jupyter_path
 from shiny import Session, ui
 
 from . import __version__
+from ._render_cache import CachedWidget
 
 
 # TODO: scripts/static_download.R should produce/update these
@@ -67,7 +68,8 @@ def require_dependency(
     # The relevant npm package should be specified as an attribute on the widget
     # instance. If the widget is installed as a jupyter extension, in most cases, that
     # name will registered at the extension name/directory
-    module_attr = "_view_module" if isinstance(w, DOMWidget) else "_model_module"
+    cls = widget_type(w)
+    module_attr = "_view_module" if issubclass(cls, DOMWidget) else "_model_module"
     module_name: str = getattr(w, module_attr, widget_pkg(w))
 
     # ipywidgets (i.e., @jupyter-widgets) come pre-bundled in libembed-amd.js
@@ -75,6 +77,25 @@ def require_dependency(
     if module_name.startswith("@jupyter-widgets/"):
         return None
 
+    # Resolving the dependency means scanning the filesystem (and possibly importing
+    # the widget's package), so only do it once per kind of widget
+    key = (
+        cls,
+        module_name,
+        str(getattr(w, "_model_module_version", "1.0")),
+        session.app.lib_prefix,
+    )
+    if key not in _DEPENDENCY_CACHE:
+        _DEPENDENCY_CACHE[key] = _require_dependency(
+            w, module_name, session.app.lib_prefix, warn_if_missing
+        )
+    return _DEPENDENCY_CACHE[key]
+
+
+def _require_dependency(
+    w: Widget, module_name: str, lib_prefix: str, warn_if_missing: bool
+) -> Optional[HTMLDependency]:
+
     # It's technically possible for the npm package name to be different from the actual
     # extension path (defined by `_jupyter_nbextension_paths` in __init__.py), but we
     # also don't have a fool-proof way to discovering the relevant __init__.py file,
@@ -88,7 +109,7 @@ def require_dependency(
                     f"Couldn't find local path to widget extension for {type(w)}."
                     + " Since a CDN fallback is provided, the widget will still render if an internet connection is available."
                     + " To avoid depending on a CDN, make sure the widget is installed as a jupyter extension.",
-                    stacklevel=2,
+                    stacklevel=3,
                 )
             return None
 
@@ -98,7 +119,7 @@ def require_dependency(
     dep = HTMLDependency(module_name, version, source=source)
     # Get the location where the dependency files will be mounted by the shiny app
     # and use that to inform the requirejs import path
-    href = dep.source_path_map(lib_prefix=session.app.lib_prefix)["href"]
+    href = dep.source_path_map(lib_prefix=lib_prefix)["href"]
     config = {"paths": {module_name: os.path.join(href, "index")}}
     # Basically our equivalent of the extension.js file provided by the cookiecutter
     # https://github.com/jupyter-widgets/widget-cookiecutter/blob/master/%7B%7Bcookiecutter.github_project_name%7D%7D/js/lib/extension.js
@@ -118,7 +139,35 @@ def bokeh_dependency() -> HTMLDependency:
     return ui.head_content(ui.HTML(resources))
 
 
+# (widget class, module name, module version, lib_prefix) -> dependency
+_DEPENDENCY_CACHE: Dict[Tuple[type, str, str, str], Optional[HTMLDependency]] = {}
+# module name -> nbextension directory (or None if it isn't installed)
+_EXTENSION_PATH_CACHE: Dict[str, Optional[str]] = {}
+# package name -> nbextension destination
+_EXTENSION_DESTINATION_CACHE: Dict[str, str] = {}
+
+
+def clear_dependency_cache() -> None:
+    """
+    Clear cached widget dependency information.
+
+    shinywidgets looks up where a widget's JavaScript lives (i.e., its jupyter
+    nbextension directory) once per widget class, and remembers the answer for the
+    life of the process. Call this if widget extensions get installed, upgraded, or
+    removed while the app is running.
+    """
+    _DEPENDENCY_CACHE.clear()
+    _EXTENSION_PATH_CACHE.clear()
+    _EXTENSION_DESTINATION_CACHE.clear()
+
+
 def jupyter_extension_path(module_name: str) -> Optional[str]:
+    if module_name not in _EXTENSION_PATH_CACHE:
+        _EXTENSION_PATH_CACHE[module_name] = _jupyter_extension_path(module_name)
+    return _EXTENSION_PATH_CACHE[module_name]
+
+
+def _jupyter_extension_path(module_name: str) -> Optional[str]:
     paths: List[str] = jupyter_path()
     module_dir = None
     for x in paths:
@@ -146,6 +195,13 @@ def jupyter_extension_path(module_name: str) -> Optional[str]:
 # plotly's FigureWidget() pointing to the plotly package, but the actual
 # dependencies actually live in a separate jupyterlab_plotly package.
 def jupyter_extension_destination(w: Widget) -> str:
+    pkg = widget_pkg(w)
+    if pkg not in _EXTENSION_DESTINATION_CACHE:
+        _EXTENSION_DESTINATION_CACHE[pkg] = _jupyter_extension_destination(w)
+    return _EXTENSION_DESTINATION_CACHE[pkg]
+
+
+def _jupyter_extension_destination(w: Widget) -> str:
     with tempfile.TemporaryDirectory():
         mod: ModuleType = importlib.import_module(".", package=widget_pkg(w))
 
@@ -159,7 +215,17 @@ def jupyter_extension_destination(w: Widget) -> str:
 
 
 def widget_pkg(w: object) -> str:
-    return w.__module__.split(".")[0]
+    return widget_type(w).__module__.split(".")[0]
+
+
+def widget_type(w: object) -> type:
+    """
+    The type of `w`, or, for a widget recreated from a cached render (see
+    `render_widget(cache_key=...)`), the type of the widget it was captured from.
+    """
+    if isinstance(w, CachedWidget):
+        return w.widget_type
+    return type(w)
 
 
 def parse_version(v: str) -> str:
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import copy
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+
+import ipywidgets
+
+from ._serialization import json_packer
+from ._utils import child_widgets
+
+Widget = ipywidgets.widgets.Widget
+_put_buffers = ipywidgets.widgets.widget._put_buffers
+_remove_buffers = ipywidgets.widgets.widget._remove_buffers
+
+__all__ = (
+    "CachedRender",
+    "CachedWidget",
+    "RenderCache",
+    "RENDER_CACHE",
+    "capture_on_open",
+    "widget_opened",
+)
+
+# How many bytes (roughly) of widget state render_widget(cache_key=...) may keep around
+# (across all sessions in this process)
+SHINYWIDGETS_RENDER_CACHE_BYTES = int(
+    os.getenv("SHINYWIDGETS_RENDER_CACHE_BYTES", str(64 * 1024 * 1024))
+)
+
+
+@dataclass
+class _CachedState:
+    model_id: str
+    # The type of the captured widget (which determines its HTML dependency)
+    widget_type: type
+    state: dict[str, Any]
+    buffer_paths: list[Any]
+    buffers: list[bytes]
+    nbytes: int
+
+    @staticmethod
+    def capture(
+        w: Widget,
+        state: dict[str, Any],
+        buffer_paths: list[Any],
+        buffers: list[Any],
+        nbytes: Optional[int] = None,
+    ) -> "_CachedState":
+        # Own the buffers (they may be views of, e.g., the user's numpy arrays)
+        buffers = [bytes(b) for b in buffers]
+        if nbytes is None:
+            nbytes = len(json_packer(state)) + sum(len(b) for b in buffers)
+        return _CachedState(
+            str(w.model_id), type(w), state, buffer_paths, buffers, nbytes
+        )
+
+
+@dataclass
+class CachedRender:
+    """
+    What a render function produced: the state of every widget in the rendered
+    widget's tree (children before parents, the rendered widget last), plus the bits
+    of the render output that don't come from the state.
+    """
+
+    widgets: list[_CachedState]
+    fill: bool
+    widget_pkg: str
+    nbytes: int
+
+    def replay(self) -> Widget:
+        """
+        Create (in the current session) a stand-in for every widget in the tree, with
+        new model ids.
+        """
+        ids = {x.model_id: uuid4().hex for x in self.widgets}
+        w: Optional[Widget] = None
+        for x in self.widgets:
+            w = CachedWidget(
+                ids[x.model_id],
+                _replace_model_refs(x.state, ids),
+                x.buffer_paths,
+                x.buffers,
+                x.widget_type,
+            )
+        assert w is not None
+        return w
+
+
+class CachedWidget(Widget):
+    """
+    A widget whose state was captured from a widget rendered earlier (possibly in
+    another session). It reproduces that widget's model in the browser, but doesn't
+    have any of the original widget's Python-side behavior.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        state: dict[str, Any],
+        buffer_paths: list[Any],
+        buffers: list[bytes],
+        widget_type: type,
+    ):
+        self._cached_state = (state, buffer_paths, buffers)
+        # What the widget's HTML dependency gets resolved from (see widget_type())
+        self.widget_type = widget_type
+        # These determine the widget's HTML dependency, too (N.B. they're read-only
+        # traits, and need to be in place before the widget's construction callback
+        # runs)
+        for name in _MODULE_TRAITS:
+            if name in state:
+                self._trait_values[name] = state[name]
+        super().__init__(model_id=model_id)
+
+    def get_state(self, key: Any = None, drop_defaults: bool = False) -> dict[str, Any]:
+        state, buffer_paths, buffers = self._cached_state
+        state = copy.deepcopy(state)
+        _put_buffers(state, buffer_paths, buffers)
+        if key is None:
+            return state
+        keys = [key] if isinstance(key, str) else key
+        return {k: state[k] for k in keys if k in state}
+
+
+_MODULE_TRAITS = (
+    "_model_module",
+    "_model_module_version",
+    "_model_name",
+    "_view_module",
+    "_view_module_version",
+    "_view_name",
+)
+
+
+# A least-recently-used cache of CachedRender()s, limited by (approximate) size
+class RenderCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.counts: dict[str, int] = {"hit": 0, "miss": 0, "evict": 0}
+        self._entries: OrderedDict[Hashable, CachedRender] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[CachedRender]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.counts["miss"] += 1
+        else:
+            self.counts["hit"] += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def put(self, key: Hashable, entry: CachedRender) -> None:
+        if entry.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._entries[key] = entry
+        self.nbytes += entry.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.counts["evict"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+
+RENDER_CACHE = RenderCache(SHINYWIDGETS_RENDER_CACHE_BYTES)
+
+
+# A rendered widget (tree) that's waiting for its comm(s) to be opened, so it can be
+# captured from the very state that they're opened with (rather than serializing it
+# all over again). N.B. it doesn't reference the widgets, since it's referenced by them
+class _Capture:
+    def __init__(
+        self,
+        model_id: str,
+        fill: bool,
+        widget_pkg: str,
+        on_capture: Callable[[CachedRender], None],
+    ) -> None:
+        self.model_id = model_id
+        self.fill = fill
+        self.widget_pkg = widget_pkg
+        self.on_capture = on_capture
+        self.states: dict[str, _CachedState] = {}
+
+    # Called once the rendered widget has been opened (which is after the widgets it
+    # references)
+    def finish(self, w: Widget) -> None:
+        widgets: list[_CachedState] = []
+        for x in _widget_tree(w):
+            if _CAPTURES.get(x) is self:
+                del _CAPTURES[x]
+            captured = self.states.get(str(x.model_id))
+            if captured is None:
+                # A widget whose comm was already open (e.g., one shared by renders)
+                captured = _CachedState.capture(x, *_remove_buffers(x.get_state()))
+            widgets.append(captured)
+        nbytes = sum(x.nbytes for x in widgets)
+        self.on_capture(CachedRender(widgets, self.fill, self.widget_pkg, nbytes))
+
+
+# The widgets of renders waiting to be captured
+_CAPTURES: WeakKeyDictionary[Widget, _Capture] = WeakKeyDictionary()
+
+
+def capture_on_open(
+    w: Widget,
+    fill: bool,
+    widget_pkg: str,
+    on_capture: Callable[[CachedRender], None],
+) -> None:
+    """
+    Capture a rendered widget (and the widgets it references) as a `CachedRender` once
+    its comm gets opened (see `widget_opened()`), and hand that to `on_capture`.
+    """
+    capture = _Capture(str(w.model_id), fill, widget_pkg, on_capture)
+    for x in _widget_tree(w):
+        _CAPTURES[x] = capture
+
+
+def widget_opened(
+    w: Widget,
+    state: dict[str, Any],
+    buffer_paths: list[Any],
+    buffers: list[Any],
+    nbytes: int,
+) -> None:
+    """
+    Let a pending capture (see `capture_on_open()`) know what a widget's comm was just
+    opened with (`nbytes` being the size of the comm_open message).
+    """
+    capture = _CAPTURES.pop(w, None)
+    if capture is None:
+        return
+    captured = _CachedState.capture(w, state, buffer_paths, buffers, nbytes)
+    capture.states[captured.model_id] = captured
+    if captured.model_id == capture.model_id:
+        capture.finish(w)
+
+
+# The widgets in a widget's tree, children before parents
+def _widget_tree(w: Widget) -> list[Widget]:
+    result: list[Widget] = []
+    seen: set[int] = set()
+
+    def visit(x: Widget) -> None:
+        if id(x) in seen:
+            return
+        seen.add(id(x))
+        for child in child_widgets(x):
+            visit(child)
+        result.append(x)
+
+    visit(w)
+    return result
+
+
+# Point references to other widgets ("IPY_MODEL_<model_id>") at their new model ids
+def _replace_model_refs(x: Any, ids: dict[str, str]) -> Any:
+    if isinstance(x, str) and x.startswith("IPY_MODEL_"):
+        model_id = x[len("IPY_MODEL_") :]
+        return "IPY_MODEL_" + ids.get(model_id, model_id)
+    if isinstance(x, dict):
+        return {k: _replace_model_refs(v, ids) for k, v in x.items()}
+    if isinstance(x, list):
+        return [_replace_model_refs(v, ids) for v in x]
+    return x
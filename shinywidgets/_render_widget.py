@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import copy
+import json
+from typing import TYPE_CHECKING, Any
 
 from htmltools import Tag
 
@@ -13,7 +15,7 @@ else:
     JupyterChart = BokehModel = FigureWidget = DeckGLWidget = object
 
 from ._dependencies import bokeh_dependency
-from ._render_widget_base import ValueT, WidgetT, render_widget_base
+from ._render_widget_base import ValueT, WidgetT, render_widget_base, values_equal
 
 __all__ = (
     "render_widget",
@@ -31,7 +33,18 @@ class render_widget(render_widget_base[WidgetT, WidgetT]): ...
 
 # Package specific renderers that require coercion (via as_widget())
 # NOTE: the types on these classes should mirror what as_widget() does
-class render_altair(render_widget_base[ValueT, JupyterChart]): ...
+class render_altair(render_widget_base[ValueT, JupyterChart]):
+    # With reuse=True, when only the chart's datasets and/or param values changed,
+    # push those through the existing chart's data/param channels rather than
+    # re-sending (and re-embedding) the whole spec
+    def _update_widget(self, old: JupyterChart, new: JupyterChart) -> bool:
+        import altair as alt
+
+        if not isinstance(old, alt.JupyterChart) or not isinstance(
+            new, alt.JupyterChart
+        ):
+            return super()._update_widget(old, new)
+        return _update_chart(old, new)
 
 
 class render_bokeh(render_widget_base[ValueT, BokehModel]):
@@ -42,7 +55,136 @@ class render_bokeh(render_widget_base[ValueT, BokehModel]):
 
 
 class render_plotly(render_widget_base[ValueT, FigureWidget]):  # pyright: ignore[reportInvalidTypeArguments]
-    ...
+    # With reuse=True, apply the difference between figures as a (single) plotly.js
+    # update, rather than re-sending the whole figure
+    def _update_widget(self, old: FigureWidget, new: FigureWidget) -> bool:
+        from plotly.basewidget import BaseFigureWidget
+
+        if not isinstance(old, BaseFigureWidget) or not isinstance(
+            new, BaseFigureWidget
+        ):
+            return super()._update_widget(old, new)
+        return _update_figure(old, new)
 
 
 class render_pydeck(render_widget_base[ValueT, DeckGLWidget]): ...
+
+
+def _update_figure(old: FigureWidget, new: FigureWidget) -> bool:
+    old_traces: list[dict[str, Any]] = old._data  # type: ignore[attr-defined]
+    new_traces: list[dict[str, Any]] = new._data  # type: ignore[attr-defined]
+    n = min(len(old_traces), len(new_traces))
+
+    # A trace's type can't be changed in place
+    if any(old_traces[i].get("type") != new_traces[i].get("type") for i in range(n)):
+        return False
+
+    # Under batch_update(), these property assignments go out as one plotly_update
+    with old.batch_update():  # type: ignore[attr-defined]
+        for i in range(n):
+            # (Every FigureWidget trace gets a random uid, which isn't worth changing)
+            delta = _delta(old_traces[i], new_traces[i], skip=("uid",))
+            for path, value in delta.items():
+                old.data[i][path] = value  # type: ignore[attr-defined]
+        delta = _delta(old._layout, new._layout)  # type: ignore[attr-defined]
+        for path, value in delta.items():
+            old.layout[path] = value  # type: ignore[attr-defined]
+
+    if len(new_traces) < len(old_traces):
+        old.data = old.data[:n]  # type: ignore[attr-defined]
+    elif len(new_traces) > n:
+        old.add_traces(copy.deepcopy(new_traces[n:]))  # type: ignore[attr-defined]
+
+    if old._config != new._config:  # type: ignore[attr-defined]
+        old._config = new._config  # type: ignore[attr-defined]
+
+    return True
+
+
+# The (dotted) property paths whose values differ between two plotly JSON objects
+# (None meaning the property got removed)
+def _delta(
+    old: dict[str, Any], new: dict[str, Any], skip: tuple[str, ...] = ()
+) -> dict[str, Any]:
+    delta: dict[str, Any] = {}
+    for key in [*new, *(k for k in old if k not in new)]:
+        if key in skip:
+            continue
+        if key not in new:
+            delta[key] = None
+        elif key not in old:
+            delta[key] = new[key]
+        elif isinstance(old[key], dict) and isinstance(new[key], dict):
+            for path, value in _delta(old[key], new[key]).items():
+                delta[f"{key}.{path}"] = value
+        elif not values_equal(old[key], new[key]):
+            delta[key] = new[key]
+    return delta
+
+
+def _update_chart(old: JupyterChart, new: JupyterChart) -> bool:
+    # VegaFusion charts keep their data server-side (in a chart state of their own)
+    if old._chart_state is not None or new._chart_state is not None:  # type: ignore[attr-defined]
+        return False
+
+    old_spec: dict[str, Any] | None = old.spec  # type: ignore[attr-defined]
+    new_spec: dict[str, Any] | None = new.spec  # type: ignore[attr-defined]
+    if old_spec is None or new_spec is None:
+        return False
+
+    # Datasets are named after a hash of their values, so line up the new names with
+    # the old ones (which is what the client's view knows them by)
+    old_datasets: dict[str, Any] = old_spec.get("datasets", {})
+    new_datasets: dict[str, Any] = new_spec.get("datasets", {})
+    if len(old_datasets) != len(new_datasets):
+        return False
+    names = dict(zip(new_datasets, old_datasets))
+    spec_txt = json.dumps({k: v for k, v in new_spec.items() if k != "datasets"})
+    for new_name, old_name in names.items():
+        spec_txt = spec_txt.replace(json.dumps(new_name), json.dumps(old_name))
+    spec: dict[str, Any] = json.loads(spec_txt)
+
+    # Param values can change, but not the params themselves
+    old_params = old_spec.get("params", [])
+    new_params = spec.get("params", [])
+    if _without_values(old_params) != _without_values(new_params):
+        return False
+    old_rest = {k: v for k, v in old_spec.items() if k not in ("datasets", "params")}
+    new_rest = {k: v for k, v in spec.items() if k not in ("datasets", "params")}
+    if old_rest != new_rest:
+        return False
+
+    data_updates = [
+        {"namespace": "data", "name": names[name], "scope": [], "value": values}
+        for name, values in new_datasets.items()
+        if not values_equal(old_datasets[names[name]], values)
+    ]
+    old_values = {p["name"]: p.get("value") for p in old_params}
+    param_updates = {
+        p["name"]: p.get("value")
+        for p in new_params
+        if "select" not in p and p.get("value") != old_values[p["name"]]
+    }
+
+    with old.hold_sync():
+        if data_updates:
+            old._py_to_js_updates = data_updates  # type: ignore[attr-defined]
+        if param_updates:
+            old._params = {**old._params, **param_updates}  # type: ignore[attr-defined]
+
+    # Quietly bring the rest of the (server-side) chart up to date. Setting these
+    # traits for real would re-send (and re-embed) the spec.
+    trait_values = old._trait_values  # type: ignore[attr-defined]
+    trait_values["spec"] = {
+        **spec,
+        "datasets": {names[k]: v for k, v in new_datasets.items()},
+    }
+    trait_values["chart"] = new.chart  # type: ignore[attr-defined]
+    # (So the same updates, if they ever come up again, still get sent)
+    trait_values["_py_to_js_updates"] = None
+
+    return True
+
+
+def _without_values(params: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [{k: v for k, v in p.items() if k != "value"} for p in params]
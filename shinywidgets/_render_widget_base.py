@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import warnings
-from typing import Generic, Optional, Tuple, TypeVar, cast
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar, cast
 
 from htmltools import Tag
 from ipywidgets.widgets import DOMWidget, Layout, Widget
 from shiny import req
-from shiny.reactive import Context
+from shiny.reactive import Context, flush, lock
 from shiny.reactive._core import (
     get_current_context,  # pyright: ignore[reportPrivateImportUsage]
 )
@@ -14,8 +18,11 @@ from shiny.render.renderer import Jsonifiable, Renderer, ValueFn
 from shiny.session import require_active_session
 
 from ._as_widget import as_widget
+from ._comm import OrphanedShinyComm
 from ._dependencies import widget_pkg
 from ._output_widget import output_widget
+from ._render_cache import RENDER_CACHE, CachedRender, CachedWidget, capture_on_open
+from ._utils import child_widgets
 
 __all__ = (
     "render_widget_base",
@@ -37,9 +44,76 @@ The type of the widget created from the renderer's ValueT
 """
 T = TypeVar("T", bound=object)
 
+# While set, widgets constructed (in a session) don't get tied to the session right
+# away. Instead, the widget (and the callback that does so) gets collected here.
+DeferredInits = list[tuple[Widget, Callable[[], None]]]
+deferred_widget_inits: contextvars.ContextVar[Optional[DeferredInits]] = (
+    contextvars.ContextVar("deferred_widget_inits", default=None)
+)
+
+
+# A render_widget(background=True) render whose widget is being constructed (or is
+# done, but not shown yet)
+@dataclass
+class _BackgroundRender:
+    # Collects the reactive dependencies of the render function
+    ctx: Context
+    inits: DeferredInits
+    # Converts the function's value to a widget (None until the function has run)
+    task: Optional[asyncio.Future[tuple[Any, Optional[Widget]]]] = None
+    superseded: bool = False
+    consumed: bool = False
+
+    def discard(self) -> None:
+        self.superseded = True
+        if self.consumed:
+            return
+        if self.task is None:
+            self.close_widgets()
+            return
+        # The widgets the render constructed were never tied to the session (so
+        # nothing was ever sent for them); close them once it's done constructing them
+        # (a thread can't be interrupted)
+        self.task.add_done_callback(lambda _: self.close_widgets())
+
+    def close_widgets(self) -> None:
+        for w, _ in self.inits:
+            w.close()
+        self.inits.clear()
+
 
 class render_widget_base(Renderer[ValueT], Generic[ValueT, WidgetT]):
-    """ """
+    """
+    Parameters
+    ----------
+    cache_key
+        A function of the reactive values the output depends on. The state of the
+        widget(s) rendered for each key is cached (across sessions) as it's sent to the
+        browser, and rendering an already cached key recreates the widget(s) from that
+        state without running the render function. The recreated widget is a stand-in
+        that only reproduces the model in the browser, so its `.widget` (and `.value`)
+        has none of the original widget's Python-side behavior: setting its traits or
+        observing it does nothing (hence a warning when they're accessed). Don't use
+        `cache_key` for outputs whose widget is updated or read from elsewhere in the
+        app.
+    executor
+        A `concurrent.futures` thread pool to run a (synchronous) render function, and
+        the conversion of its value to a widget, in. The resulting widgets get tied to
+        the session back on the event loop. The reactive flush waits for the function
+        (holding Shiny's reactive lock), so the function can read reactive values as
+        usual, but other sessions' reactive updates wait too. With `background=True`,
+        only the conversion runs in the executor. A `ProcessPoolExecutor` isn't
+        supported, since neither the render function nor its widgets can be pickled.
+    background
+        Convert the render function's value to a widget (e.g., a plotly figure to a
+        `FigureWidget`) in the background, i.e., in `executor` (or asyncio's default
+        thread pool), without holding up the reactive flush, and show progress until
+        it's done. The render function itself still runs in the reactive flush, so it
+        can read any reactive value (`reactive.calc`s included). If its dependencies
+        change meanwhile, the conversion's result is discarded (its widgets are closed
+        without anything ever being sent for them), and only the latest render gets
+        displayed.
+    """
 
     def auto_output_ui(self) -> Tag:
         return output_widget(
@@ -58,23 +132,96 @@ class render_widget_base(Renderer[ValueT], Generic[ValueT, WidgetT]):
         height: Optional[str] = None,
         fill: Optional[bool] = None,
         fillable: Optional[bool] = None,
+        reuse: bool = False,
+        cache_key: Optional[Callable[[], Hashable]] = None,
+        executor: Optional[Executor] = None,
+        background: bool = False,
     ):
         super().__init__(_fn)
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError(
+                "render_widget(executor=...) doesn't support a ProcessPoolExecutor, "
+                "since neither the render function nor its widgets can be pickled. "
+                "Use a ThreadPoolExecutor instead."
+            )
         self.width = width
         self.height = height
         self.fill = fill
         self.fillable = fillable
+        self.reuse = reuse
+        self.cache_key = cache_key
+        self.executor = executor
+        self.background = background
 
         self._value: ValueT | None = None
         self._widget: WidgetT | None = None
         self._contexts: set[Context] = set()
+        # With reuse=True (or background=True), the close callbacks of the widgets
+        # created by the current (and, while rendering, the previous) render, keyed by
+        # model id
+        self._closers: dict[str, Callable[[], None]] = {}
+        self._stale_closers: dict[str, Callable[[], None]] = {}
+        # With background=True, the latest render (and the output Context to
+        # invalidate once it's done)
+        self._background: _BackgroundRender | None = None
+        self._output_ctx: Context | None = None
+        self._background_reruns: set[asyncio.Task[None]] = set()
 
     async def render(self) -> Jsonifiable | None:
-        with WidgetRenderContext(self.output_id):
-            return await self._render()
-
-    async def _render(self) -> Jsonifiable | None:
-        value = await self.fn()
+        computed = await self._render_background() if self.background else None
+
+        if not self.reuse and not self.background:
+            with WidgetRenderContext(self.output_id):
+                return await self._render(computed)
+
+        # Instead of closing the previous render's widgets as soon as the output is
+        # invalidated, keep them around until this render decides whether it can
+        # update them in place (or, with background=True, until there's a new render
+        # to replace them with, since the output is invalidated while it's in flight)
+        self._stale_closers, self._closers = self._closers, {}
+        try:
+            with WidgetRenderContext(self.output_id, closers=self._closers):
+                return await self._render(computed)
+        finally:
+            stale, self._stale_closers = self._stale_closers, {}
+            for close in stale.values():
+                close()
+
+    async def _render(
+        self, computed: Optional[_BackgroundRender] = None
+    ) -> Jsonifiable | None:
+        key = self._get_cache_key()
+        if computed is not None:
+            # Now that it's going to be displayed, tie what the background render
+            # constructed to the session
+            value, widget = computed.task.result()
+            for _, init in computed.inits:
+                init()
+        else:
+            # If the function has already rendered (in any session) with this cache
+            # key, recreate the widget(s) from the state they had then
+            cached = None if key is None else RENDER_CACHE.get(key)
+            if cached is not None:
+                return self._render_cached(cached)
+
+            if self.executor is None:
+                value = await self.fn()
+                widget = None
+            else:
+                if self.fn.is_async():
+                    raise TypeError(
+                        "render_widget(executor=...) requires a synchronous render "
+                        "function."
+                    )
+                value, widget = await self._run_in_executor(self.fn.get_sync_fn())
+
+        # If the function returned the (still open) widget it returned last time (e.g.,
+        # a long-lived widget), there's nothing to do
+        old_widget = self._widget
+        if value is not None and value is old_widget and _is_open(old_widget):
+            self._value = value
+            self._keep_alive(old_widget)
+            req(False, cancel_output=True)
 
         # Attach value/widget attributes to user func so they can be accessed (in other reactive contexts)
         self._value = value
@@ -87,23 +234,213 @@ class render_widget_base(Renderer[ValueT], Generic[ValueT, WidgetT]):
             return None
 
         # Ensure we have a widget & smart layout defaults
-        widget = as_widget(value)
+        if widget is None:
+            widget = as_widget(value)
         widget, fill = set_layout_defaults(widget)
 
+        if self.reuse and self._reuse_widget(old_widget, widget):
+            self._widget = old_widget
+            # The client already has a view of the (now updated) widget, so leave the
+            # output alone
+            req(False, cancel_output=True)
+
         self._widget = cast(WidgetT, widget)
 
         # Don't actually display anything unless this is a DOMWidget
         if not isinstance(widget, DOMWidget):
             return None
 
+        if key is not None:
+            # (Captured from the state the widget's comm gets opened with)
+            capture_on_open(
+                widget,
+                fill,
+                widget_pkg(widget),
+                lambda entry: RENDER_CACHE.put(key, entry),
+            )
+
         return {
             "model_id": str(widget.model_id),
             "fill": fill,
             "widget_pkg": widget_pkg(widget),
         }
 
+    # Run the (synchronous) function, and convert its value to a widget, in the
+    # executor, so the event loop (and thus other sessions) can carry on meanwhile
+    async def _run_in_executor(
+        self, fn: Callable[[], ValueT | None]
+    ) -> tuple[ValueT | None, Widget | None]:
+        loop = asyncio.get_running_loop()
+
+        # Run in a copy of the current context, so the function can read reactive
+        # values (and see the session), but tie the widgets it constructs to the
+        # session back here, on the event loop (or, with background=True, once the
+        # render gets displayed)
+        outer = deferred_widget_inits.get()
+        inits: DeferredInits = [] if outer is None else outer
+
+        def run() -> tuple[ValueT | None, Widget | None]:
+            deferred_widget_inits.set(inits)
+            value = fn()
+            return value, (None if value is None else as_widget(value))
+
+        ctx = contextvars.copy_context()
+        try:
+            return await loop.run_in_executor(self.executor, ctx.run, run)
+        finally:
+            if outer is None:
+                for _, init in inits:
+                    init()
+
+    # With background=True, the function runs (in the reactive flush) under its own
+    # reactive Context, and its value gets converted to a widget in a thread, which
+    # doesn't hold up the flush (and thus the session's inputs); the output shows
+    # progress until that's done. If the function's dependencies change meanwhile, the
+    # render is superseded (whatever widgets it constructed are closed before they're
+    # ever opened) by a new one, so only the latest render gets displayed.
+    async def _render_background(self) -> Optional[_BackgroundRender]:
+        self._output_ctx = get_current_context()
+
+        bg = self._background
+        if (
+            bg is not None
+            and bg.task is not None
+            and not bg.superseded
+            and not bg.consumed
+        ):
+            if not bg.task.done():
+                req(False, cancel_output="progress")
+            bg.consumed = True
+            return bg
+
+        if bg is not None:
+            bg.discard()
+        self._background = None
+
+        # A cache hit renders right away
+        key = self._get_cache_key()
+        if key is not None and key in RENDER_CACHE:
+            return None
+
+        bg = self._background = _BackgroundRender(ctx=Context(), inits=[])
+
+        # When a dependency changes, re-render (superseding this render)
+        def on_invalidate() -> None:
+            if self._background is bg and not bg.superseded:
+                bg.superseded = True
+                self._invalidate_output()
+
+        bg.ctx.on_invalidate(on_invalidate)
+
+        # Run the function here, under the reactive lock (so it can read calcs), but
+        # with its dependencies (and the widgets it constructs) collected by the render
+        token = deferred_widget_inits.set(bg.inits)
+        try:
+            with bg.ctx():
+                value = await self.fn()
+        finally:
+            deferred_widget_inits.reset(token)
+
+        # There's nothing to construct (in the background)
+        if value is None or isinstance(value, Widget):
+            bg.task = asyncio.get_running_loop().create_future()
+            bg.task.set_result((value, value))
+            bg.consumed = True
+            return bg
+
+        async def convert() -> tuple[ValueT | None, Widget | None]:
+            # (This runs in a copy of the current contextvars.Context)
+            deferred_widget_inits.set(bg.inits)
+            return await self._run_in_executor(lambda: value)
+
+        bg.task = asyncio.ensure_future(convert())
+
+        # When done, re-render (displaying the result)
+        def on_done(task: asyncio.Future[Any]) -> None:
+            if self._background is bg and not bg.superseded and not task.cancelled():
+                self._invalidate_output(flush_now=True)
+
+        bg.task.add_done_callback(on_done)
+        req(False, cancel_output="progress")
+
+    def _invalidate_output(self, flush_now: bool = False) -> None:
+        ctx = self._output_ctx
+        if ctx is None:
+            return
+        if not flush_now:
+            ctx.invalidate()
+            return
+
+        # Outside of a flush (i.e., from a task's done callback), invalidating needs
+        # to be followed by a flush
+        async def rerun() -> None:
+            async with lock():
+                ctx.invalidate()
+                await flush()
+
+        task = asyncio.create_task(rerun())
+        self._background_reruns.add(task)
+        task.add_done_callback(self._background_reruns.discard)
+
+    def _get_cache_key(self) -> Hashable | None:
+        if self.cache_key is None:
+            return None
+        # (Evaluating the key takes a reactive dependency on whatever it reads)
+        key = self.cache_key()
+        fn = getattr(self.fn, "_orig_fn", self.fn)
+        return (fn.__module__, fn.__qualname__, self.output_id, key)
+
+    def _render_cached(self, cached: CachedRender) -> Jsonifiable:
+        # N.B. the stand-in has the rendered widget's state, but none of its behavior
+        widget = cached.replay()
+        self._value = cast(ValueT, widget)
+        self._widget = cast(WidgetT, widget)
+        self._invalidate_contexts()
+        return {
+            "model_id": str(widget.model_id),
+            "fill": cached.fill,
+            "widget_pkg": cached.widget_pkg,
+        }
+
+    def _reuse_widget(self, old: WidgetT | None, new: Widget) -> bool:
+        if old is None or type(old) is not type(new):
+            return False
+        old_id = getattr(old, "_model_id", None)
+        if old_id not in self._stale_closers:
+            return False
+        if not self._update_widget(old, cast(WidgetT, new)):
+            return False
+
+        # Keep the old widget (and whatever it now references) alive, and close what
+        # this render created for the new widget that's no longer needed (e.g., the new
+        # widget itself)
+        live = self._keep_alive(old)
+        for model_id in _widget_tree_ids(new) - live:
+            close = self._closers.pop(model_id, None)
+            if close is not None:
+                close()
+        return True
+
+    # With reuse=True, carry the cleanup of a widget (tree) from the previous render
+    # over to this one
+    def _keep_alive(self, w: Widget) -> set[str]:
+        live = _widget_tree_ids(w)
+        for model_id in list(self._stale_closers):
+            if model_id in live:
+                self._closers[model_id] = self._stale_closers.pop(model_id)
+        return live
+
+    def _update_widget(self, old: WidgetT, new: WidgetT) -> bool:
+        """
+        Update the previously rendered widget (`old`) in place so it matches a newly
+        rendered one of the same type (`new`). Returns `False` if that isn't possible,
+        in which case `new` replaces `old`.
+        """
+        return update_widget(old, new)
+
     @property
     def value(self) -> ValueT | None:
+        self._warn_if_cached("value")
         return self._get_reactive_obj(self._value)
 
     @value.setter
@@ -114,6 +451,7 @@ class render_widget_base(Renderer[ValueT], Generic[ValueT, WidgetT]):
 
     @property
     def widget(self) -> WidgetT | None:
+        self._warn_if_cached("widget")
         return self._get_reactive_obj(self._widget)
 
     @widget.setter
@@ -122,6 +460,15 @@ class render_widget_base(Renderer[ValueT], Generic[ValueT, WidgetT]):
             "The `widget` attribute of a @render_widget function is read only."
         )
 
+    def _warn_if_cached(self, attr: str) -> None:
+        if isinstance(self._widget, CachedWidget):
+            warnings.warn(
+                f"The `{attr}` of @render_widget(cache_key=...) was recreated from a "
+                "cached render, so it doesn't have the original widget's Python-side "
+                "behavior (e.g., changing or observing its traits does nothing).",
+                stacklevel=3,
+            )
+
     def _get_reactive_obj(self, x: T) -> T | None:
         self._register_current_context()
         if x is not None:
@@ -142,6 +489,65 @@ class render_widget_base(Renderer[ValueT], Generic[ValueT, WidgetT]):
         self._contexts.add(get_current_context())
 
 
+def update_widget(old: Widget, new: Widget) -> bool:
+    """
+    Update `old` in place with the (synced) trait values of `new` that differ, sending
+    them to the client as a single state update. Widget-valued traits (e.g., `layout`)
+    of the same type are updated in place as well.
+    """
+    if type(old) is not type(new):
+        return False
+
+    changes: dict[str, object] = {}
+    for name in new.keys:
+        old_value = getattr(old, name, None)
+        new_value = getattr(new, name, None)
+        if old_value is new_value:
+            continue
+        if isinstance(old_value, Widget) and update_widget(old_value, new_value):
+            continue
+        if not values_equal(old_value, new_value):
+            changes[name] = new_value
+
+    with old.hold_sync():
+        for name, value in changes.items():
+            old.set_trait(name, value)
+    return True
+
+
+def values_equal(x: object, y: object) -> bool:
+    try:
+        return bool(x == y)
+    except Exception:
+        pass
+    # e.g., numpy arrays, whose == is elementwise
+    try:
+        import numpy as np
+
+        return bool(np.array_equal(x, y))  # type: ignore[arg-type]
+    except Exception:
+        return False
+
+
+def _is_open(w: Widget) -> bool:
+    # (A widget's comm gets orphaned once it's closed)
+    comm = getattr(w, "comm", None)
+    return comm is not None and not isinstance(comm, OrphanedShinyComm)
+
+
+def _widget_tree_ids(w: Widget) -> set[str]:
+    ids: set[str] = set()
+    stack = [w]
+    while stack:
+        x = stack.pop()
+        model_id = getattr(x, "_model_id", None)
+        if model_id is None or model_id in ids:
+            continue
+        ids.add(model_id)
+        stack.extend(child_widgets(x))
+    return ids
+
+
 def has_current_context() -> bool:
     try:
         get_current_context()
@@ -238,22 +644,32 @@ class WidgetRenderContext:
     register cleanup callbacks on the correct Context, even if the widget is
     constructed inside a reactive.isolate() block (which temporarily replaces the
     current Context with a short-lived temporary one).
+
+    If `closers` is given (i.e., `reuse=True` or `background=True`), widgets hand their
+    cleanup callback to it instead of registering it with the render Context, so the
+    renderer decides when (and whether) they get closed.
     """
 
-    def __init__(self, output_id):
+    def __init__(
+        self, output_id, closers: Optional[dict[str, Callable[[], None]]] = None
+    ):
         self.session = require_active_session(None)
         self.output_id = output_id
+        self.closers = closers
         self._old_id = vars(self.session).get("__shinywidget_current_output_id")
         self._old_ctx = vars(self.session).get("__shinywidget_render_context")
+        self._old_closers = vars(self.session).get("__shinywidget_render_closers")
 
     def __enter__(self):
         vars(self.session)["__shinywidget_current_output_id"] = self.output_id
         vars(self.session)["__shinywidget_render_context"] = get_current_context()
+        vars(self.session)["__shinywidget_render_closers"] = self.closers
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         vars(self.session)["__shinywidget_current_output_id"] = self._old_id
         vars(self.session)["__shinywidget_render_context"] = self._old_ctx
+        vars(self.session)["__shinywidget_render_closers"] = self._old_closers
         return False
 
     @staticmethod
@@ -273,3 +689,10 @@ class WidgetRenderContext:
         if ctx is None:
             raise RuntimeError("Not currently rendering a widget")
         return ctx
+
+    @staticmethod
+    def get_render_closers(session) -> Optional[dict[str, Callable[[], None]]]:
+        """
+        Get where the widget's cleanup callback should go (if not the render Context).
+        """
+        return vars(session).get("__shinywidget_render_closers")
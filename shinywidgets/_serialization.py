@@ -1,10 +1,11 @@
 import decimal
 import json
 import numbers
+import struct
 import warnings
 from binascii import b2a_base64
 from datetime import date, datetime
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from dateutil.tz import tzlocal
 
@@ -26,6 +27,33 @@ def json_packer(obj: object) -> str:
     )
 
 
+# Shiny (client-side) dispatches a binary WebSocket frame as a custom message when the
+# frame starts with a (1 byte) length-prefixed message type. The remainder of the frame
+# is what the custom message handler receives (as an ArrayBuffer), which we lay out as:
+#
+#   [4 byte big-endian header length][JSON header][buffer 0][buffer 1]...
+#
+# where the JSON header's `buffers` field holds the byte length of each buffer (so the
+# client can slice them back out of the frame without copying).
+# (see ShinyApp.dispatchMessage() in shiny's shinyapp.ts)
+def pack_binary_frame(msg_type: str, header: str, buffers: Sequence[object]) -> bytes:
+    type_bytes = msg_type.encode("ascii")
+    if len(type_bytes) > 255:
+        raise ValueError(f"Message type {msg_type!r} is too long for a binary frame")
+
+    header_bytes = header.encode("utf-8")
+
+    return b"".join(
+        [
+            struct.pack("B", len(type_bytes)),
+            type_bytes,
+            struct.pack(">I", len(header_bytes)),
+            header_bytes,
+            *[memoryview(b).cast("B") for b in buffers],  # type: ignore[arg-type]
+        ]
+    )
+
+
 def json_default(obj: object) -> object:
     if isinstance(obj, datetime):
         obj = _ensure_tzinfo(obj)
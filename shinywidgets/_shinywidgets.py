@@ -5,7 +5,8 @@ import json
 import os
 from base64 import b64decode
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any, Optional, Sequence, Union, cast
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence, Union, cast
 from uuid import uuid4
 from weakref import WeakSet
 
@@ -16,9 +17,10 @@ from ._render_widget import render_widget
 __protocol_version__ = ipywidgets._version.__protocol_version__
 DOMWidget = ipywidgets.widgets.DOMWidget
 Layout = ipywidgets.widgets.Layout
+Style = ipywidgets.widgets.widget_style.Style
 Widget = ipywidgets.widgets.Widget
 _remove_buffers = ipywidgets.widgets.widget._remove_buffers
-from htmltools import TagList
+from htmltools import HTMLDependency, TagList
 from shiny import Session, reactive
 from shiny.http_staticfiles import StaticFiles
 from shiny.reactive._core import (
@@ -28,16 +30,29 @@ from shiny.session import get_current_session, require_active_session, session_c
 
 from ._as_widget import as_widget
 from ._cdn import SHINYWIDGETS_CDN_ONLY, SHINYWIDGETS_EXTENSION_WARNING
-from ._comm import BufferType, OrphanedShinyComm, ShinyComm, ShinyCommManager
+from ._comm import (
+    BufferType,
+    OrphanedShinyComm,
+    SharedModelComm,
+    ShinyComm,
+    ShinyCommManager,
+)
 from ._dependencies import require_dependency
-from ._render_widget_base import WidgetRenderContext
-from ._utils import package_dir
+from ._render_cache import widget_opened
+from ._render_widget_base import WidgetRenderContext, deferred_widget_inits
+from ._trait_observers import TraitObserver
+from ._utils import child_widgets, package_dir
 
 __all__ = (
     "register_widget",
     "reactive_read",
 )
 
+# Opt-in to sharing a single model between identical Layout/Style widgets (in a session)
+SHINYWIDGETS_SHARED_LAYOUTS = (
+    os.getenv("SHINYWIDGETS_SHARED_LAYOUTS", "false").lower() == "true"
+)
+
 if TYPE_CHECKING:
     from typing import TypeGuard
 
@@ -63,15 +78,41 @@ def init_shiny_widget(w: Widget):
     # will be some module-specific copy.
     session = session.root_scope()
 
+    # By the time we get here, the user has already had an opportunity to specify a model_id,
+    # so it isn't yet populated, generate a random one so we can assign the same id to the comm
+    if getattr(w, "_model_id", None) is None:
+        w._model_id = uuid4().hex
+
+    id = cast(str, w._model_id)
+
+    # Since the actual ShinyComm() is initialized _after_ the Widget is initialized,
+    # and Widget.__init__() includes a call to Widget.open() which opens an unnecessary
+    # comm, we just set the comm to a dummy comm for now (to avoid unnecessary work)
+    w.comm = OrphanedShinyComm(id)
+
+    # Widgets constructed off of the event loop (i.e., render_widget(executor=...))
+    # get tied to the session once the render is back on the loop
+    deferred = deferred_widget_inits.get()
+    if deferred is not None:
+        deferred.append((w, lambda: _init_session_widget(session, w, id)))
+        return
+
+    _init_session_widget(session, w, id)
+
+
+def _init_session_widget(session: Session, w: Widget, id: str) -> None:
+    comm_manager = ShinyCommManager.get(session)
+
     # If this is the first time we've seen this session, initialize some things
     if session not in SESSIONS:
         SESSIONS.add(session)
 
         # Somewhere inside ipywidgets, it makes requests for static files
         # under the publicPath set by the webpack.config.js file.
-        session.app._dependency_handler.mount(
+        mount_static_files(
+            session,
             "/dist/",
-            StaticFiles(directory=os.path.join(package_dir("shinywidgets"), "static")),
+            os.path.join(package_dir("shinywidgets"), "static"),
             name="shinywidgets-static-resources",
         )
 
@@ -82,19 +123,18 @@ def init_shiny_widget(w: Widget):
         def _():
             msg_txt = session.input.shinywidgets_comm_send()
             msg = _decode_comm_buffers(json.loads(msg_txt))
-            comm_id = msg["content"]["comm_id"]
-            if comm_id in COMM_MANAGER.comms:
-                comm: ShinyComm = COMM_MANAGER.comms[comm_id]
+            comm = comm_manager.comms.get(msg["content"]["comm_id"])
+            if comm is not None:
                 comm.handle_msg(msg)
 
         def _cleanup_session_state():
             SESSIONS.remove(session)
             # Cleanup any widgets that were created in this session
-            for id in SESSION_WIDGET_ID_MAP[session.id]:
-                widget = WIDGET_INSTANCE_MAP.get(id)
-                if widget:
-                    widget.close()
-            del SESSION_WIDGET_ID_MAP[session.id]
+            pending_opens(session).clear()
+            for id, widget in list(comm_manager.widgets.items()):
+                widget.close()
+                WIDGET_INSTANCE_MAP.pop(id, None)
+            comm_manager.widgets.clear()
 
         session.on_ended(_cleanup_session_state)
 
@@ -106,47 +146,10 @@ def init_shiny_widget(w: Widget):
     else:
         widget_dep = require_dependency(w, session, SHINYWIDGETS_EXTENSION_WARNING)
 
-    # By the time we get here, the user has already had an opportunity to specify a model_id,
-    # so it isn't yet populated, generate a random one so we can assign the same id to the comm
-    if getattr(w, "_model_id", None) is None:
-        w._model_id = uuid4().hex
-
-    id = cast(str, w._model_id)
-
-    # Since the actual ShinyComm() is initialized _after_ the Widget is initialized,
-    # and Widget.__init__() includes a call to Widget.open() which opens an unnecessary
-    # comm, we just set the comm to a dummy comm for now (to avoid unnecessary work)
-    w.comm = OrphanedShinyComm(id)
-
     # Schedule the opening of the comm to happen sometime after this init function.
     # This is important for widgets like plotly that do additional initialization that
     # is required to get a valid widget state.
-    @reactive.effect(priority=99999)
-    def _open_shiny_comm():
-
-        # Call _repr_mimebundle_() before get_state() since it may modify the widget
-        # in an important way (unfortunately, it does for plotly)
-        # # https://github.com/plotly/plotly.py/blob/0089f32/packages/python/plotly/plotly/basewidget.py#L734-L738
-        if hasattr(w, "_repr_mimebundle_") and callable(w._repr_mimebundle_):
-            w._repr_mimebundle_()
-
-        # Now, get the state
-        state, buffer_paths, buffers = _remove_buffers(w.get_state())
-
-        # Initialize the comm -- this sends widget state to the frontend
-        with widget_comm_patch():
-            w.comm = ShinyComm(
-                comm_id=id,
-                comm_manager=COMM_MANAGER,
-                target_name="jupyter.widget",
-                data={"state": state, "buffer_paths": buffer_paths},
-                buffers=cast(BufferType, buffers),
-                # TODO: should this be hard-coded?
-                metadata={"version": __protocol_version__},
-                html_deps=session._process_ui(TagList(widget_dep))["deps"],
-            )
-
-        _open_shiny_comm.destroy()
+    schedule_open(session, w, widget_dep)
 
     # If the widget initialized in a reactive _output_ context, then cleanup the widget
     # when the context gets invalidated. Use the render output's Context (captured by
@@ -158,6 +161,8 @@ def init_shiny_widget(w: Widget):
 
         def on_close():
             with session_context(session):
+                # If the widget never got a chance to open, don't bother
+                cancel_open(session, id)
                 w.close()
                 # By closing the widget, we also close the comm, which sets w.comm to
                 # None. Unfortunately, the w.model_id property looks up w.comm.comm_id
@@ -169,11 +174,17 @@ def init_shiny_widget(w: Widget):
                 if id in WIDGET_INSTANCE_MAP:
                     del WIDGET_INSTANCE_MAP[id]
 
-        ctx.on_invalidate(on_close)
+        closers = WidgetRenderContext.get_render_closers(session)
+        if closers is None:
+            ctx.on_invalidate(on_close)
+        else:
+            # render_widget(reuse=True/background=True) may keep the widget around
+            # after invalidation
+            closers[id] = on_close
 
     # Keep track of what session this widget belongs to (so we can close it when the
     # session ends)
-    SESSION_WIDGET_ID_MAP.setdefault(session.id, []).append(id)
+    comm_manager.widgets[id] = w
 
     # Some widget's JS make external requests for static files (e.g.,
     # ipyleaflet markers) under this resource path. Note that this assumes that
@@ -183,9 +194,10 @@ def init_shiny_widget(w: Widget):
     if widget_dep and widget_dep.source:
         src_dir = widget_dep.source.get("subdir", "")
         if src_dir:
-            session.app._dependency_handler.mount(
+            mount_static_files(
+                session,
                 f"/nbextensions/{widget_dep.name}",
-                StaticFiles(directory=src_dir),
+                src_dir,
                 name=f"{widget_dep.name}-nbextension-static-resources",
             )
 
@@ -195,7 +207,218 @@ Widget.on_widget_constructed(init_shiny_widget)  # type: ignore
 
 # Use WeakSet() over Set() so that the session can be garbage collected
 SESSIONS: WeakSet[Session] = WeakSet()
-COMM_MANAGER = ShinyCommManager()
+
+
+# Widgets (created in a session) that are waiting for their comm to be opened
+def pending_opens(
+    session: Session,
+) -> dict[str, tuple[Widget, Optional[HTMLDependency]]]:
+    return vars(session).setdefault("__shinywidget_pending_opens", {})
+
+
+def schedule_open(
+    session: Session, w: Widget, widget_dep: Optional[HTMLDependency]
+) -> None:
+    pending = pending_opens(session)
+    pending[cast(str, w._model_id)] = (w, widget_dep)
+    if vars(session).get("__shinywidget_open_scheduled"):
+        return
+    vars(session)["__shinywidget_open_scheduled"] = True
+
+    # A single effect opens every widget that gets created before it runs (e.g., all
+    # the markers of a map), rather than every widget scheduling its own effect
+    @reactive.effect(priority=99999)
+    def _open_shiny_comm():
+        try:
+            # Widgets may get created while we're opening others, so keep going until
+            # there's nothing left
+            while pending:
+                id = next(iter(pending))
+                _open_widget_tree(session, id, pending)
+        finally:
+            # (If opening a widget failed, whatever's left gets opened by the effect
+            # that the next widget schedules)
+            vars(session)["__shinywidget_open_scheduled"] = False
+            _open_shiny_comm.destroy()
+
+
+def cancel_open(session: Session, id: str) -> None:
+    pending_opens(session).pop(id, None)
+
+
+# Open children (i.e., widgets referenced by the widget's traits) before their parents,
+# so that the parent's state never references a model the client doesn't know about.
+def _open_widget_tree(
+    session: Session,
+    id: str,
+    pending: dict[str, tuple[Widget, Optional[HTMLDependency]]],
+) -> None:
+    w, widget_dep = pending.pop(id)
+
+    # Call _repr_mimebundle_() before get_state() since it may modify the widget
+    # in an important way (unfortunately, it does for plotly)
+    # # https://github.com/plotly/plotly.py/blob/0089f32/packages/python/plotly/plotly/basewidget.py#L734-L738
+    if hasattr(w, "_repr_mimebundle_") and callable(w._repr_mimebundle_):
+        w._repr_mimebundle_()
+
+    children = child_widgets(w)
+    for child in children:
+        child_id = getattr(child, "_model_id", None)
+        if child_id in pending:
+            _open_widget_tree(session, child_id, pending)
+
+    # Now, get the state
+    state, buffer_paths, buffers = _remove_buffers(w.get_state())
+
+    if SHINYWIDGETS_SHARED_LAYOUTS and isinstance(w, (Layout, Style)) and not buffers:
+        _share_model(session, w, id, state)
+    else:
+        _open_comm(session, w, id, state, buffer_paths, buffers, widget_dep)
+
+    # If it's part of a render_widget(cache_key=...) render, that gets captured from
+    # this very state
+    nbytes = getattr(w.comm, "open_nbytes", 0)
+    widget_opened(w, state, buffer_paths, buffers, nbytes)
+
+    for child in children:
+        if isinstance(child.comm, SharedModelComm):
+            child.comm.parents.add(w)
+
+
+def _open_comm(
+    session: Session,
+    w: Widget,
+    id: str,
+    state: dict[str, Any],
+    buffer_paths: list[Any],
+    buffers: list[Any],
+    widget_dep: Optional[HTMLDependency],
+) -> None:
+    html_deps = html_dependencies(session, widget_dep)
+
+    # Initialize the comm -- this sends widget state to the frontend
+    with widget_comm_patch():
+        w.comm = ShinyComm(
+            comm_id=id,
+            comm_manager=ShinyCommManager.get(session),
+            target_name="jupyter.widget",
+            data={"state": state, "buffer_paths": buffer_paths},
+            buffers=cast(BufferType, buffers),
+            # TODO: should this be hard-coded?
+            metadata={"version": __protocol_version__},
+            html_deps=html_deps,
+        )
+
+    # Only now that the comm_open carrying it is queued is the client sure to get it
+    if html_deps and widget_dep is not None:
+        sent_dependencies(session).add(_dependency_key(widget_dep))
+
+
+@dataclass
+class _SharedModel:
+    comm: ShinyComm
+    # How many widgets point at the model
+    refs: int = 0
+
+
+# Most widgets come with a Layout (and often a Style) that are identical to many others
+# in the session, so (when SHINYWIDGETS_SHARED_LAYOUTS is enabled) point them all at a
+# single model. The shared model isn't owned by any one widget; instead, the first time
+# a widget modifies its Layout/Style, it gets a model of its own (copy-on-write), and
+# any parents that reference it resend their reference. The model gets closed once no
+# widget points at it anymore.
+def _share_model(session: Session, w: Widget, id: str, state: dict[str, Any]) -> None:
+    shared: dict[str, _SharedModel] = vars(session).setdefault(
+        "__shinywidget_shared_models", {}
+    )
+    key = json.dumps([type(w).__qualname__, state], sort_keys=True, default=str)
+    model = shared.get(key)
+    if model is None:
+        comm = ShinyComm(
+            comm_id=uuid4().hex,
+            comm_manager=ShinyCommManager.get(session),
+            target_name="jupyter.widget",
+            data={"state": state, "buffer_paths": []},
+            metadata={"version": __protocol_version__},
+            html_deps=[],
+        )
+        # No one widget can handle what the client sends it (which, for a Layout or
+        # Style, there's nothing to do about anyway)
+        comm.on_msg(lambda msg: None)
+        model = shared[key] = _SharedModel(comm)
+    model.refs += 1
+
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if released:
+            return
+        released = True
+        model.refs -= 1
+        if model.refs == 0:
+            if shared.get(key) is model:
+                del shared[key]
+            model.comm.close()
+
+    def split() -> None:
+        ref = cast(SharedModelComm, w.comm)
+        _open_comm(session, w, id, *_remove_buffers(w.get_state()), None)
+        for parent in list(ref.parents):
+            names = [x for x in parent.keys if getattr(parent, x, None) is w]
+            if names:
+                parent.send_state(names)
+        release()
+
+    # N.B. bypass the comm trait's observer, which would otherwise register the
+    # widget (in Widget.widgets) under the shared model's id
+    w._trait_values["comm"] = SharedModelComm(model.comm.comm_id, split, release)
+
+
+def html_dependencies(session: Session, dep: Optional[HTMLDependency]) -> list[Any]:
+    """
+    The rendered `dep` to ship along with a comm_open, if the client hasn't seen it.
+
+    Every widget of a given kind shares the same dependency, so keep a ledger of what
+    each session has already been sent (see `sent_dependencies()`, which the caller
+    updates once the comm_open is queued) and memoize the rendering of each dependency
+    per app, since that's where it gets registered.
+    """
+    if dep is None:
+        return []
+    key = _dependency_key(dep)
+    if key in sent_dependencies(session):
+        return []
+    rendered: dict[tuple[str, str], list[Any]] = vars(session.app).setdefault(
+        "__shinywidget_rendered_deps", {}
+    )
+    if key not in rendered:
+        rendered[key] = session._process_ui(TagList(dep))["deps"]
+    return rendered[key]
+
+
+def sent_dependencies(session: Session) -> set[tuple[str, str]]:
+    return vars(session).setdefault("__shinywidget_sent_deps", set())
+
+
+def _dependency_key(dep: HTMLDependency) -> tuple[str, str]:
+    return (dep.name, str(dep.version))
+
+
+def mount_static_files(session: Session, path: str, directory: str, name: str) -> None:
+    """
+    Serve a directory of static files at `path`, unless the app already serves it.
+
+    Mounts belong to the app (not the session), so this keeps a registry of what's
+    been mounted on the app itself, which keeps the route table (and session startup
+    cost) from growing with the number of sessions.
+    """
+    app = session.app
+    mounted: dict[str, str] = vars(app).setdefault("__shinywidget_mounts", {})
+    if mounted.get(path) == directory:
+        return
+    app._dependency_handler.mount(path, StaticFiles(directory=directory), name=name)
+    mounted[path] = directory
 
 
 def _decode_comm_buffers(msg: dict[str, Any]) -> dict[str, Any]:
@@ -214,10 +437,6 @@ def _decode_comm_buffers(msg: dict[str, Any]) -> dict[str, Any]:
     return msg
 
 
-# Dictionary mapping session id to widget ids
-# The key is the session id, and the value is a list of widget ids
-SESSION_WIDGET_ID_MAP: dict[str, list[str]] = {}
-
 # Dictionary of all "active" widgets (ipywidgets automatically adds to this dictionary as
 # new widgets are created, but they won't get removed until the widget is explictly closed)
 WIDGET_INSTANCE_MAP = cast(dict[str, Widget], Widget.widgets)
@@ -227,11 +446,40 @@ WIDGET_INSTANCE_MAP = cast(dict[str, Widget], Widget.widgets)
 # --------------------------------------
 
 
-def reactive_read(widget: Widget, names: Union[str, Sequence[str]]) -> Any:
+def reactive_read(
+    widget: Widget,
+    names: Union[str, Sequence[str]],
+    *,
+    debounce: Optional[float] = None,
+    throttle: Optional[float] = None,
+    atol: Optional[float] = None,
+    rtol: Optional[float] = None,
+    equals: Optional[Callable[[Any, Any], bool]] = None,
+) -> Any:
     """
     Reactively read a widget trait
+
+    To keep high-frequency changes (e.g., a map's bounds while it's being panned)
+    from invalidating the reactive context every time, give either `debounce` (only
+    invalidate once the trait(s) haven't changed for that many seconds) or
+    `throttle` (invalidate at most once every that many seconds).
+
+    To ignore insignificant changes (e.g., sub-pixel moves of a map's center), give
+    `atol` and/or `rtol` (numbers, also within lists/tuples/dicts, that are within
+    this absolute/relative tolerance of what was read count as unchanged) or `equals`
+    (a function that's given the value that was read and the new value, and returns
+    whether they're equal). These only apply to the reading context, so it's fine
+    for `equals` to be a lambda that's created anew on every read.
     """
-    reactive_depend(widget, names)
+    reactive_depend(
+        widget,
+        names,
+        debounce=debounce,
+        throttle=throttle,
+        atol=atol,
+        rtol=rtol,
+        equals=equals,
+    )
     if isinstance(names, str):
         return getattr(widget, names)
     else:
@@ -242,6 +490,12 @@ def reactive_depend(
     widget: Widget,
     names: Union[str, Sequence[str]],
     type: str = "change",
+    *,
+    debounce: Optional[float] = None,
+    throttle: Optional[float] = None,
+    atol: Optional[float] = None,
+    rtol: Optional[float] = None,
+    equals: Optional[Callable[[Any, Any], bool]] = None,
 ) -> None:
     """
     Take a reactive dependency on a widget trait
@@ -252,6 +506,11 @@ def reactive_depend(
     except RuntimeError:
         raise RuntimeError("reactive_read() must be called within a reactive context")
 
+    if debounce is not None and throttle is not None:
+        raise ValueError("Only one of `debounce` and `throttle` may be specified.")
+    if equals is not None and (atol is not None or rtol is not None):
+        raise ValueError("`equals` can't be combined with `atol`/`rtol`.")
+
     if isinstance(names, str):
         names = [names]
 
@@ -263,15 +522,9 @@ def reactive_depend(
                 "For a list of widget traits, call `.trait_names()` on the widget."
             )
 
-    def invalidate(change: object):
-        ctx.invalidate()
-
-    widget.observe(invalidate, names, type)  # type: ignore
-
-    def _():
-        widget.unobserve(invalidate, names, type)  # type: ignore
-
-    ctx.on_invalidate(_)
+    for name in names:
+        observer = TraitObserver.get(widget, name, type, debounce, throttle)
+        observer.add(ctx, atol, rtol, equals)
 
 
 def register_widget(
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+import weakref
+from typing import Any, Callable, Hashable, Optional
+from weakref import WeakKeyDictionary
+
+import ipywidgets
+from shiny.reactive import Context, flush, lock
+
+Widget = ipywidgets.widgets.Widget
+
+__all__ = ("TraitObserver",)
+
+_UNSET = object()
+
+
+class TraitObserver:
+    """
+    Invalidates the reactive contexts that depend on a widget's trait.
+
+    There's (at most) one of these, and thus one traitlets observer, per widget, trait,
+    type of notification, and rate policy. It stays installed for the widget's
+    lifetime, and fans out to a weak mapping of dependent contexts, so taking (and
+    dropping) a dependency doesn't touch the widget's observers. A context leaves the
+    mapping as soon as it's invalidated (by this observer or anything else it depends
+    on), or once it's garbage collected.
+
+    With `debounce`, contexts get invalidated once the trait has stopped changing for
+    that many seconds. With `throttle`, they get invalidated at most once every that
+    many seconds (right away, if it's been that long since last time).
+
+    With `atol`/`rtol` (numbers, possibly nested in lists/tuples/dicts, within that
+    absolute/relative tolerance are considered equal) or `equals` (a function of the
+    old and new value), a dependent context is left alone by changes that leave the
+    value equal to what it read. These filters are kept per context (along with the
+    value it read), rather than being part of what the observer is shared by, so
+    reads with a function that's created anew every time (e.g., a lambda) don't each
+    install an observer of their own.
+    """
+
+    def __init__(
+        self,
+        widget: Widget,
+        name: str,
+        type: str,
+        debounce: Optional[float] = None,
+        throttle: Optional[float] = None,
+    ) -> None:
+        self.debounce = debounce
+        self.throttle = throttle
+        self._widget = weakref.ref(widget)
+        self._name = name
+        # Each dependent context, along with the `(equals, value read)` filter (if
+        # any) of each of its reads
+        self._contexts: WeakKeyDictionary[Context, list[Optional[_Filter]]] = (
+            WeakKeyDictionary()
+        )
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_invalidated = float("-inf")
+        self._flushes: set[asyncio.Task[None]] = set()
+        widget.observe(self._on_change, name, type)  # type: ignore
+
+    @staticmethod
+    def get(
+        widget: Widget,
+        name: str,
+        type: str,
+        debounce: Optional[float] = None,
+        throttle: Optional[float] = None,
+    ) -> "TraitObserver":
+        key = (name, type, debounce, throttle)
+        observers = _OBSERVERS.get(widget)
+        if observers is None:
+            observers = _OBSERVERS[widget] = {}
+        observer = observers.get(key)
+        if observer is None:
+            observer = observers[key] = TraitObserver(
+                widget, name, type, debounce, throttle
+            )
+        return observer
+
+    def add(
+        self,
+        ctx: Context,
+        atol: Optional[float] = None,
+        rtol: Optional[float] = None,
+        equals: Optional[Callable[[Any, Any], bool]] = None,
+    ) -> None:
+        if atol is not None or rtol is not None:
+            equals = _within_tolerance(atol or 0, rtol or 0)
+        read: Optional[_Filter] = None
+        widget = self._widget()
+        if equals is not None and widget is not None:
+            read = (equals, getattr(widget, self._name))
+        reads = self._contexts.get(ctx)
+        if reads is None:
+            reads = self._contexts[ctx] = []
+            # Drop the context when it's invalidated for whatever reason, so its
+            # filters stop running on every change
+            ctx.on_invalidate(lambda: self._contexts.pop(ctx, None))
+        reads.append(read)
+
+    def _on_change(self, change: Any) -> None:
+        if not self._contexts:
+            return
+
+        new = change.get("new", _UNSET)
+        if not self._changed_for(new):
+            return
+
+        if self.debounce is None and self.throttle is None:
+            self._invalidate(new)
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No timers to be had (e.g., a change made from another thread)
+            self._invalidate(new)
+            return
+
+        if self.debounce is not None:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = loop.call_later(self.debounce, self._on_timer)
+            return
+
+        if self._timer is not None:
+            return
+        wait = self._last_invalidated + (self.throttle or 0) - time.monotonic()
+        if wait <= 0:
+            self._invalidate(new)
+        else:
+            self._timer = loop.call_later(wait, self._on_timer)
+
+    # Outside of a flush (i.e., from a timer), invalidating needs to be followed by one
+    def _on_timer(self) -> None:
+        self._timer = None
+
+        async def invalidate() -> None:
+            async with lock():
+                self._invalidate(self._current())
+                await flush()
+
+        task = asyncio.ensure_future(invalidate())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def _current(self) -> Any:
+        widget = self._widget()
+        return _UNSET if widget is None else getattr(widget, self._name, _UNSET)
+
+    # Whether any dependent context considers `new` a change from what it read
+    def _changed_for(self, new: Any) -> bool:
+        return any(_is_change(reads, new) for reads in list(self._contexts.values()))
+
+    def _invalidate(self, new: Any) -> None:
+        contexts = [
+            ctx for ctx, reads in list(self._contexts.items()) if _is_change(reads, new)
+        ]
+        if not contexts:
+            return
+        self._last_invalidated = time.monotonic()
+        for ctx in contexts:
+            self._contexts.pop(ctx, None)
+        for ctx in contexts:
+            ctx.invalidate()
+
+
+_Filter = tuple[Callable[[Any, Any], bool], Any]
+
+
+def _is_change(reads: list[Optional[_Filter]], new: Any) -> bool:
+    if new is _UNSET:
+        return True
+    return any(read is None or not read[0](read[1], new) for read in reads)
+
+
+_OBSERVERS: WeakKeyDictionary[Widget, dict[Hashable, TraitObserver]] = (
+    WeakKeyDictionary()
+)
+
+
+def _within_tolerance(atol: float, rtol: float) -> Callable[[Any, Any], bool]:
+    def equals(x: Any, y: Any) -> bool:
+        if _is_number(x) and _is_number(y):
+            return math.isclose(x, y, rel_tol=rtol, abs_tol=atol)
+        if isinstance(x, (list, tuple)) and isinstance(y, (list, tuple)):
+            return len(x) == len(y) and all(equals(a, b) for a, b in zip(x, y))
+        if isinstance(x, dict) and isinstance(y, dict):
+            return x.keys() == y.keys() and all(equals(x[k], y[k]) for k in x)
+        try:
+            return bool(x == y)
+        except Exception:
+            return False
+
+    return equals
+
+
+def _is_number(x: Any) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
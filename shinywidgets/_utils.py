@@ -2,6 +2,8 @@ import importlib
 import os
 import tempfile
 
+from ipywidgets.widgets import Widget
+
 
 # similar to base::system.file()
 def package_dir(package: str) -> str:
@@ -10,3 +12,22 @@ def package_dir(package: str) -> str:
         if pkg_file is None:
             raise ImportError(f"Couldn't load package {package}")
         return os.path.dirname(pkg_file)
+
+
+# The widgets referenced by a widget's (synced) traits, e.g., its Layout or children
+def child_widgets(w: Widget) -> list[Widget]:
+    children: list[Widget] = []
+
+    def collect(x: object) -> None:
+        if isinstance(x, Widget):
+            children.append(x)
+        elif isinstance(x, (list, tuple)):
+            for y in x:
+                collect(y)
+        elif isinstance(x, dict):
+            for y in x.values():
+                collect(y)
+
+    for name in getattr(w, "keys", []):
+        collect(getattr(w, name, None))
+    return children
@@ -36,7 +36,7 @@ eval("__webpack_require__.r(__webpack_exports__);\n/* harmony export */ __webpac
   \***********************/
 /***/ ((__unused_webpack_module, __webpack_exports__, __webpack_require__) => {
 
-eval("__webpack_require__.r(__webpack_exports__);\n/* harmony import */ var _jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__ = __webpack_require__(/*! @jupyter-widgets/html-manager */ \"@jupyter-widgets/html-manager\");\n/* harmony import */ var _jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0___default = /*#__PURE__*/__webpack_require__.n(_jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__);\n/* harmony import */ var _comm__WEBPACK_IMPORTED_MODULE_1__ = __webpack_require__(/*! ./comm */ \"./src/comm.ts\");\n/* harmony import */ var _plotly__WEBPACK_IMPORTED_MODULE_2__ = __webpack_require__(/*! ./plotly */ \"./src/plotly.ts\");\n/* harmony import */ var _utils__WEBPACK_IMPORTED_MODULE_3__ = __webpack_require__(/*! ./utils */ \"./src/utils.ts\");\nvar _a;\n\n\n\n\n/******************************************************************************\n * Define a custom HTMLManager for use with Shiny\n ******************************************************************************/\nclass OutputManager extends _jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__.HTMLManager {\n    // In a soon-to-be-released version of @jupyter-widgets/html-manager,\n    // display_view()'s first \"dummy\" argument will be removed... this shim simply\n    // makes it so that our manager can work with either version\n    // https://github.com/jupyter-widgets/ipywidgets/commit/159bbe4#diff-45c126b24c3c43d2cee5313364805c025e911c4721d45ff8a68356a215bfb6c8R42-R43\n    async display_view(view, options) {\n        const n_args = super.display_view.length;\n        if (n_args === 3) {\n            return super.display_view({}, view, options);\n        }\n        else {\n            // @ts-ignore\n            return super.display_view(view, options);\n        }\n    }\n}\n// Define our own custom module loader for Shiny\nconst shinyRequireLoader = async function (moduleName, moduleVersion) {\n    // shiny provides a shim of require.js which allows <script>s with anonymous\n    // define()s to be loaded without error. When an anonymous define() occurs,\n    // the shim uses the data-requiremodule attribute (set by require.js) on the script\n    // to determine the module name.\n    // https://github.com/posit-dev/py-shiny/blob/230940c/scripts/define-shims.js#L10-L16\n    // In the context of shinywidgets, when a widget gets rendered, it should\n    // come with another <script> tag that does `require.config({paths: {...}})`\n    // which maps the module name to a URL of the widget's JS file.\n    const oldAmd = window.define.amd;\n    // This is probably not necessary, but just in case -- especially now in a\n    // anywidget/ES6 world, we probably don't want to load AMD modules\n    // (plotly is one example of a widget that will fail to load if AMD is enabled)\n    window.define.amd = false;\n    // Store jQuery global since loading we load a module, it may overwrite it\n    // (qgrid is one good example)\n    const old$ = window.$;\n    const oldJQ = window.jQuery;\n    if (moduleName === 'qgrid') {\n        // qgrid wants to use base/js/dialog (if it's available) for full-screen tables\n        // https://github.com/quantopian/qgrid/blob/877b420/js/src/qgrid.widget.js#L11-L16\n        // Maybe that's worth supporting someday, but for now, we define it to be nothing\n        // to avoid require('qgrid') from producing an error\n        window.define(\"base/js/dialog\", [], function () { return null; });\n    }\n    return (0,_jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__.requireLoader)(moduleName, moduleVersion).finally(() => {\n        window.define.amd = oldAmd;\n        window.$ = old$;\n        window.jQuery = oldJQ;\n    });\n};\nconst manager = new OutputManager({ loader: shinyRequireLoader });\n/******************************************************************************\n* Define the Shiny binding\n******************************************************************************/\n// Ideally we'd extend Shiny's HTMLOutputBinding, but the implementation isn't exported\nclass IPyWidgetOutput extends Shiny.OutputBinding {\n    find(scope) {\n        return $(scope).find(\".shiny-ipywidget-output\");\n    }\n    onValueError(el, err) {\n        Shiny.unbindAll(el);\n        el.style.visibility = \"inherit\";\n        this.renderError(el, err);\n    }\n    async renderValue(el, data) {\n        const hiddenVisibility = \"hidden\";\n        const revealVisibility = \"inherit\";\n        const renderToken = this._nextRenderToken(el);\n        // Allow for a None/null value to hide the widget (css inspired by htmlwidgets)\n        if (!data) {\n            el.style.visibility = hiddenVisibility;\n            return;\n        }\n        const isPlotlyWidget = data.widget_pkg === \"plotly\";\n        el.style.visibility = isPlotlyWidget ? hiddenVisibility : revealVisibility;\n        // Only forward the potential to fill if `output_widget(fillable=True)`\n        // _and_ the widget instance wants to fill\n        const fill = data.fill && el.classList.contains(\"html-fill-container\");\n        if (fill)\n            el.classList.add(\"forward-fill-potential\");\n        // At this time point, we should've already handled an 'open' message, and so\n        // the model should be ready to use\n        const model = await manager.get_model(data.model_id);\n        if (!model) {\n            throw new Error(`No model found for id ${data.model_id}`);\n        }\n        const view = await manager.create_view(model, {});\n        await manager.display_view(view, { el: el });\n        // Don't allow more than one .lmWidget container, which can happen\n        // when the view is displayed more than once\n        // N.B. It's probably better to get view(s) from m.views and .remove() them,\n        // but empirically, this seems to work better\n        while (el.childNodes.length > 1) {\n            el.removeChild(el.childNodes[0]);\n        }\n        // The ipywidgets container (.lmWidget)\n        const lmWidget = el.children[0];\n        if (fill) {\n            this._onImplementation(lmWidget, () => this._doAddFillClasses(lmWidget));\n        }\n        if (!isPlotlyWidget) {\n            this._onImplementation(lmWidget, () => this._doResize());\n        }\n        else {\n            this._onImplementation(lmWidget, () => {\n                if (!this._isCurrentRenderToken(el, renderToken)) {\n                    return;\n                }\n                const plotEl = (0,_plotly__WEBPACK_IMPORTED_MODULE_2__.findPlotlyGraphDiv)(lmWidget);\n                if (!plotEl) {\n                    this._doResize();\n                    if (this._isCurrentRenderToken(el, renderToken)) {\n                        el.style.visibility = revealVisibility;\n                    }\n                    return;\n                }\n                // Plotly FigureWidget may first render at its internal 360px fallback,\n                // then resize after paint. Keep it hidden until a direct Plotly resize\n                // completes so the first visible paint is already settled.\n                void (0,_plotly__WEBPACK_IMPORTED_MODULE_2__.waitForPlotlyReadyToReveal)(plotEl, () => this._doResize()).finally(() => {\n                    if (this._isCurrentRenderToken(el, renderToken)) {\n                        el.style.visibility = revealVisibility;\n                    }\n                });\n            });\n        }\n    }\n    _nextRenderToken(el) {\n        var _a;\n        const trackedEl = el;\n        const nextToken = ((_a = trackedEl.__shinywidgetsRenderToken) !== null && _a !== void 0 ? _a : 0) + 1;\n        trackedEl.__shinywidgetsRenderToken = nextToken;\n        return nextToken;\n    }\n    _isCurrentRenderToken(el, token) {\n        return el.__shinywidgetsRenderToken === token;\n    }\n    _onImplementation(lmWidget, callback) {\n        if (this._hasImplementation(lmWidget)) {\n            callback();\n            return;\n        }\n        // Some widget implementation (e.g., ipyleaflet, pydeck) won't actually\n        // have rendered to the DOM at this point, so wait until they do\n        const mo = new MutationObserver((_mutations) => {\n            if (this._hasImplementation(lmWidget)) {\n                mo.disconnect();\n                callback();\n            }\n        });\n        mo.observe(lmWidget, { childList: true });\n    }\n    // In most cases, we can get widgets to fill through Python/CSS, but some widgets\n    // (e.g., quak) don't have a Python API and use shadow DOM, which can only access\n    // from JS\n    _doAddFillClasses(lmWidget) {\n        var _a;\n        const impl = lmWidget.children[0];\n        const isQuakWidget = impl && !!((_a = impl.shadowRoot) === null || _a === void 0 ? void 0 : _a.querySelector(\".quak\"));\n        if (isQuakWidget) {\n            impl.classList.add(\"html-fill-container\", \"html-fill-item\");\n            const quakWidget = impl.shadowRoot.querySelector(\".quak\");\n            quakWidget.style.maxHeight = \"unset\";\n        }\n    }\n    _doResize() {\n        // Trigger resize event to force layout (setTimeout() is needed for altair)\n        // TODO: debounce this call?\n        setTimeout(() => {\n            window.dispatchEvent(new Event('resize'));\n        }, 0);\n    }\n    _hasImplementation(lmWidget) {\n        var _a;\n        const impl = lmWidget.children[0];\n        return impl && (impl.children.length > 0 || ((_a = impl.shadowRoot) === null || _a === void 0 ? void 0 : _a.children.length) > 0);\n    }\n}\nShiny.outputBindings.register(new IPyWidgetOutput(), \"shiny.IPyWidgetOutput\");\n// Due to the way HTMLManager (and widget implementations) get loaded (via\n// require.js), the binding registration above can happen _after_ Shiny has\n// already bound the DOM, especially in the dynamic UI case (i.e., output_binding()'s\n// dependencies don't come in until after initial page load). And, in the dynamic UI\n// case, UI is rendered asychronously via Shiny.shinyapp.taskQueue, so if it exists,\n// we probably need to re-bind the DOM after the taskQueue is done.\nconst taskQueue = (_a = Shiny === null || Shiny === void 0 ? void 0 : Shiny.shinyapp) === null || _a === void 0 ? void 0 : _a.taskQueue;\nif (taskQueue) {\n    taskQueue.enqueue(() => Shiny.bindAll(document.body));\n}\n/******************************************************************************\n* Handle messages from the server-side Widget\n******************************************************************************/\n// Initialize the comm and model when a new widget is created\n// This is basically our version of https://github.com/jupyterlab/jupyterlab/blob/d33de15/packages/services/src/kernel/default.ts#L1144-L1176\nShiny.addCustomMessageHandler(\"shinywidgets_comm_open\", (msg_txt) => {\n    setBaseURL();\n    const msg = (0,_utils__WEBPACK_IMPORTED_MODULE_3__.jsonParse)(msg_txt);\n    Shiny.renderDependencies(msg.content.html_deps);\n    const comm = new _comm__WEBPACK_IMPORTED_MODULE_1__.ShinyComm(msg.content.comm_id);\n    manager.handle_comm_open(comm, msg);\n});\n// Handle any mutation of the model (e.g., add a marker to a map, without a full redraw)\n// Basically out version of https://github.com/jupyterlab/jupyterlab/blob/d33de15/packages/services/src/kernel/default.ts#L1200-L1215\nShiny.addCustomMessageHandler(\"shinywidgets_comm_msg\", async (msg_txt) => {\n    const msg = (0,_utils__WEBPACK_IMPORTED_MODULE_3__.jsonParse)(msg_txt);\n    const id = msg.content.comm_id;\n    const model = manager.get_model(id);\n    if (!model) {\n        console.error(`Couldn't handle message for model ${id} because it doesn't exist.`);\n        return;\n    }\n    try {\n        const m = await model;\n        // @ts-ignore for some reason IClassicComm doesn't have this method, but we do\n        m.comm.handle_msg(msg);\n    }\n    catch (err) {\n        console.error(\"Error handling message:\", err);\n    }\n});\n// Handle the closing of a widget/comm/model\nShiny.addCustomMessageHandler(\"shinywidgets_comm_close\", async (msg_txt) => {\n    const msg = (0,_utils__WEBPACK_IMPORTED_MODULE_3__.jsonParse)(msg_txt);\n    const id = msg.content.comm_id;\n    const model = manager.get_model(id);\n    if (!model) {\n        console.error(`Couldn't close model ${id} because it doesn't exist.`);\n        return;\n    }\n    try {\n        const m = await model;\n        // Some widget views need explicit teardown before model.close() removes them.\n        if (m.views) {\n            await Promise.all(Object.values(m.views).map(async (viewPromise) => {\n                try {\n                    const v = await viewPromise;\n                    // Plotly-backed views can leave DOM state and listeners behind unless\n                    // destroy() runs before the view is removed.\n                    if (hasMethod(v, 'destroy')) {\n                        v.destroy();\n                        // Clearing the back-reference prevents later teardown from touching a\n                        // model that is already being closed.\n                        delete v.model;\n                        v.remove();\n                    }\n                }\n                catch (err) {\n                    console.error(\"Error cleaning up view:\", err);\n                }\n            }));\n        }\n        // View removal updates _view_count. Mark the comm as inactive first so that\n        // save_changes() does not try to send those updates after the comm is gone.\n        m.comm_live = false;\n        // Close model after all views are cleaned up.\n        try {\n            await m.close();\n        }\n        catch (closeErr) {\n            if (!isIgnorableTeardownError(closeErr)) {\n                console.error(\"Unexpected error while closing model:\", closeErr);\n            }\n        }\n        // HTMLManager releases the model from its registry on comm:close.\n        try {\n            m.trigger(\"comm:close\");\n        }\n        catch (triggerErr) {\n            if (!isIgnorableTeardownError(triggerErr)) {\n                console.error(\"Unexpected error while triggering comm:close:\", triggerErr);\n            }\n        }\n    }\n    catch (err) {\n        console.error(\"Error during model cleanup:\", err);\n    }\n});\n$(document).on(\"shiny:disconnected\", () => {\n    manager.clear_state();\n});\n// When in filling layout, some widgets (specifically, altair) incorrectly think their\n// height is 0 after it's shown, hidden, then shown again. As a workaround, trigger a\n// resize event when a tab is shown.\n// TODO: This covers the 95% use case, but it's definitely not an ideal way to handle\n// this situation. A more robust solution would use IntersectionObserver to detect when\n// the widget becomes visible. Or better yet, we'd get altair to handle this situation\n// better.\n// https://github.com/posit-dev/py-shinywidgets/issues/172\ndocument.addEventListener('shown.bs.tab', event => {\n    window.dispatchEvent(new Event('resize'));\n});\n// Our version of https://github.com/jupyter-widgets/widget-cookiecutter/blob/9694718/%7B%7Bcookiecutter.github_project_name%7D%7D/js/lib/extension.js#L8\nfunction setBaseURL(x = '') {\n    const base_url = document.querySelector('body').getAttribute('data-base-url');\n    if (!base_url) {\n        document.querySelector('body').setAttribute('data-base-url', x);\n    }\n}\n// TypeGuard to safely check if an object has a method\nfunction hasMethod(obj, methodName) {\n    return typeof obj[methodName] === 'function';\n}\nfunction isIgnorableTeardownError(err) {\n    const msg = errorMessage(err).toLowerCase();\n    return (msg.includes(\"widget is not attached\") ||\n        msg.includes(\"no comm channel defined\"));\n}\nfunction errorMessage(err) {\n    if (err instanceof Error) {\n        return err.message;\n    }\n    return String(err);\n}\n\n\n//# sourceURL=webpack://@jupyter-widgets/shiny-embed-manager/./src/output.ts?");
+eval("__webpack_require__.r(__webpack_exports__);\n/* harmony import */ var _jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__ = __webpack_require__(/*! @jupyter-widgets/html-manager */ \"@jupyter-widgets/html-manager\");\n/* harmony import */ var _jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0___default = /*#__PURE__*/__webpack_require__.n(_jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__);\n/* harmony import */ var _comm__WEBPACK_IMPORTED_MODULE_1__ = __webpack_require__(/*! ./comm */ \"./src/comm.ts\");\n/* harmony import */ var _plotly__WEBPACK_IMPORTED_MODULE_2__ = __webpack_require__(/*! ./plotly */ \"./src/plotly.ts\");\n/* harmony import */ var _utils__WEBPACK_IMPORTED_MODULE_3__ = __webpack_require__(/*! ./utils */ \"./src/utils.ts\");\nvar _a;\n\n\n\n\n/******************************************************************************\n * Define a custom HTMLManager for use with Shiny\n ******************************************************************************/\nclass OutputManager extends _jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__.HTMLManager {\n    // In a soon-to-be-released version of @jupyter-widgets/html-manager,\n    // display_view()'s first \"dummy\" argument will be removed... this shim simply\n    // makes it so that our manager can work with either version\n    // https://github.com/jupyter-widgets/ipywidgets/commit/159bbe4#diff-45c126b24c3c43d2cee5313364805c025e911c4721d45ff8a68356a215bfb6c8R42-R43\n    async display_view(view, options) {\n        const n_args = super.display_view.length;\n        if (n_args === 3) {\n            return super.display_view({}, view, options);\n        }\n        else {\n            // @ts-ignore\n            return super.display_view(view, options);\n        }\n    }\n}\n// Define our own custom module loader for Shiny\nconst shinyRequireLoader = async function (moduleName, moduleVersion) {\n    // shiny provides a shim of require.js which allows <script>s with anonymous\n    // define()s to be loaded without error. When an anonymous define() occurs,\n    // the shim uses the data-requiremodule attribute (set by require.js) on the script\n    // to determine the module name.\n    // https://github.com/posit-dev/py-shiny/blob/230940c/scripts/define-shims.js#L10-L16\n    // In the context of shinywidgets, when a widget gets rendered, it should\n    // come with another <script> tag that does `require.config({paths: {...}})`\n    // which maps the module name to a URL of the widget's JS file.\n    const oldAmd = window.define.amd;\n    // This is probably not necessary, but just in case -- especially now in a\n    // anywidget/ES6 world, we probably don't want to load AMD modules\n    // (plotly is one example of a widget that will fail to load if AMD is enabled)\n    window.define.amd = false;\n    // Store jQuery global since loading we load a module, it may overwrite it\n    // (qgrid is one good example)\n    const old$ = window.$;\n    const oldJQ = window.jQuery;\n    if (moduleName === 'qgrid') {\n        // qgrid wants to use base/js/dialog (if it's available) for full-screen tables\n        // https://github.com/quantopian/qgrid/blob/877b420/js/src/qgrid.widget.js#L11-L16\n        // Maybe that's worth supporting someday, but for now, we define it to be nothing\n        // to avoid require('qgrid') from producing an error\n        window.define(\"base/js/dialog\", [], function () { return null; });\n    }\n    return (0,_jupyter_widgets_html_manager__WEBPACK_IMPORTED_MODULE_0__.requireLoader)(moduleName, moduleVersion).finally(() => {\n        window.define.amd = oldAmd;\n        window.$ = old$;\n        window.jQuery = oldJQ;\n    });\n};\nconst manager = new OutputManager({ loader: shinyRequireLoader });\n/******************************************************************************\n* Define the Shiny binding\n******************************************************************************/\n// Ideally we'd extend Shiny's HTMLOutputBinding, but the implementation isn't exported\nclass IPyWidgetOutput extends Shiny.OutputBinding {\n    find(scope) {\n        return $(scope).find(\".shiny-ipywidget-output\");\n    }\n    onValueError(el, err) {\n        Shiny.unbindAll(el);\n        el.style.visibility = \"inherit\";\n        this.renderError(el, err);\n    }\n    async renderValue(el, data) {\n        const hiddenVisibility = \"hidden\";\n        const revealVisibility = \"inherit\";\n        const renderToken = this._nextRenderToken(el);\n        // Allow for a None/null value to hide the widget (css inspired by htmlwidgets)\n        if (!data) {\n            el.style.visibility = hiddenVisibility;\n            return;\n        }\n        // The model's open may be in a batch that hasn't been applied yet (i.e., one that's\n        // still arriving in chunks, which can't happen until Shiny is done with this\n        // value), in which case render once it has been\n        if (!manager.get_model(data.model_id) && unappliedBatches > 0) {\n            pendingBatches.then(() => {\n                if (this._isCurrentRenderToken(el, renderToken)) {\n                    return this.renderValue(el, data);\n                }\n            }).catch((err) => {\n                console.error(\"Error rendering widget:\", err);\n            });\n            return;\n        }\n        const isPlotlyWidget = data.widget_pkg === \"plotly\";\n        el.style.visibility = isPlotlyWidget ? hiddenVisibility : revealVisibility;\n        // Only forward the potential to fill if `output_widget(fillable=True)`\n        // _and_ the widget instance wants to fill\n        const fill = data.fill && el.classList.contains(\"html-fill-container\");\n        if (fill)\n            el.classList.add(\"forward-fill-potential\");\n        // At this time point, we should've already handled an 'open' message, and so\n        // the model should be ready to use\n        const model = await manager.get_model(data.model_id);\n        if (!model) {\n            throw new Error(`No model found for id ${data.model_id}`);\n        }\n        const view = await manager.create_view(model, {});\n        await manager.display_view(view, { el: el });\n        // Don't allow more than one .lmWidget container, which can happen\n        // when the view is displayed more than once\n        // N.B. It's probably better to get view(s) from m.views and .remove() them,\n        // but empirically, this seems to work better\n        while (el.childNodes.length > 1) {\n            el.removeChild(el.childNodes[0]);\n        }\n        // The ipywidgets container (.lmWidget)\n        const lmWidget = el.children[0];\n        if (fill) {\n            this._onImplementation(lmWidget, () => this._doAddFillClasses(lmWidget));\n        }\n        if (!isPlotlyWidget) {\n            this._onImplementation(lmWidget, () => this._doResize());\n        }\n        else {\n            this._onImplementation(lmWidget, () => {\n                if (!this._isCurrentRenderToken(el, renderToken)) {\n                    return;\n                }\n                const plotEl = (0,_plotly__WEBPACK_IMPORTED_MODULE_2__.findPlotlyGraphDiv)(lmWidget);\n                if (!plotEl) {\n                    this._doResize();\n                    if (this._isCurrentRenderToken(el, renderToken)) {\n                        el.style.visibility = revealVisibility;\n                    }\n                    return;\n                }\n                // Plotly FigureWidget may first render at its internal 360px fallback,\n                // then resize after paint. Keep it hidden until a direct Plotly resize\n                // completes so the first visible paint is already settled.\n                void (0,_plotly__WEBPACK_IMPORTED_MODULE_2__.waitForPlotlyReadyToReveal)(plotEl, () => this._doResize()).finally(() => {\n                    if (this._isCurrentRenderToken(el, renderToken)) {\n                        el.style.visibility = revealVisibility;\n                    }\n                });\n            });\n        }\n    }\n    _nextRenderToken(el) {\n        var _a;\n        const trackedEl = el;\n        const nextToken = ((_a = trackedEl.__shinywidgetsRenderToken) !== null && _a !== void 0 ? _a : 0) + 1;\n        trackedEl.__shinywidgetsRenderToken = nextToken;\n        return nextToken;\n    }\n    _isCurrentRenderToken(el, token) {\n        return el.__shinywidgetsRenderToken === token;\n    }\n    _onImplementation(lmWidget, callback) {\n        if (this._hasImplementation(lmWidget)) {\n            callback();\n            return;\n        }\n        // Some widget implementation (e.g., ipyleaflet, pydeck) won't actually\n        // have rendered to the DOM at this point, so wait until they do\n        const mo = new MutationObserver((_mutations) => {\n            if (this._hasImplementation(lmWidget)) {\n                mo.disconnect();\n                callback();\n            }\n        });\n        mo.observe(lmWidget, { childList: true });\n    }\n    // In most cases, we can get widgets to fill through Python/CSS, but some widgets\n    // (e.g., quak) don't have a Python API and use shadow DOM, which can only access\n    // from JS\n    _doAddFillClasses(lmWidget) {\n        var _a;\n        const impl = lmWidget.children[0];\n        const isQuakWidget = impl && !!((_a = impl.shadowRoot) === null || _a === void 0 ? void 0 : _a.querySelector(\".quak\"));\n        if (isQuakWidget) {\n            impl.classList.add(\"html-fill-container\", \"html-fill-item\");\n            const quakWidget = impl.shadowRoot.querySelector(\".quak\");\n            quakWidget.style.maxHeight = \"unset\";\n        }\n    }\n    _doResize() {\n        // Trigger resize event to force layout (setTimeout() is needed for altair)\n        // TODO: debounce this call?\n        setTimeout(() => {\n            window.dispatchEvent(new Event('resize'));\n        }, 0);\n    }\n    _hasImplementation(lmWidget) {\n        var _a;\n        const impl = lmWidget.children[0];\n        return impl && (impl.children.length > 0 || ((_a = impl.shadowRoot) === null || _a === void 0 ? void 0 : _a.children.length) > 0);\n    }\n}\nShiny.outputBindings.register(new IPyWidgetOutput(), \"shiny.IPyWidgetOutput\");\n// Due to the way HTMLManager (and widget implementations) get loaded (via\n// require.js), the binding registration above can happen _after_ Shiny has\n// already bound the DOM, especially in the dynamic UI case (i.e., output_binding()'s\n// dependencies don't come in until after initial page load). And, in the dynamic UI\n// case, UI is rendered asychronously via Shiny.shinyapp.taskQueue, so if it exists,\n// we probably need to re-bind the DOM after the taskQueue is done.\nconst taskQueue = (_a = Shiny === null || Shiny === void 0 ? void 0 : Shiny.shinyapp) === null || _a === void 0 ? void 0 : _a.taskQueue;\nif (taskQueue) {\n    taskQueue.enqueue(() => Shiny.bindAll(document.body));\n}\n/******************************************************************************\n* Handle messages from the server-side Widget\n******************************************************************************/\n// All the comm messages produced during a server-side flush arrive as one batch, which\n// we apply in order (the server guarantees that opens come before messages that\n// reference them). Batches are applied one at a time, in the order the flushes that\n// produced them happened.\nlet pendingBatches = Promise.resolve();\n// How many batches are yet to be applied, and how many of those are still arriving in\n// chunks\nlet unappliedBatches = 0;\nlet chunkedBatches = 0;\nfunction enqueueBatch(batch) {\n    unappliedBatches++;\n    pendingBatches = pendingBatches\n        .then(async () => applyBatch(await batch()))\n        .catch((err) => {\n        console.error(\"Error applying comm messages:\", err);\n    })\n        .finally(() => {\n        unappliedBatches--;\n    });\n    return pendingBatches;\n}\n// Shiny handles messages one at a time, waiting on what a handler returns. So, while\n// a chunked batch is still arriving, don't have it wait on batches being applied\n// (which would keep it from ever getting the rest of the chunks).\nfunction waitForBatches() {\n    return chunkedBatches > 0 ? undefined : pendingBatches;\n}\nShiny.addCustomMessageHandler(\"shinywidgets_comm_batch\", (x) => {\n    const batch = (0,_utils__WEBPACK_IMPORTED_MODULE_3__.jsonParse)(x);\n    if (batch.chunks !== undefined) {\n        // A batch that was sent in chunks (all of which have arrived by now), and that\n        // already got in line when its first chunk arrived\n        (0,_utils__WEBPACK_IMPORTED_MODULE_3__.finishChunks)(batch.chunks);\n        chunkedBatches--;\n    }\n    else {\n        enqueueBatch(async () => batch);\n    }\n    return waitForBatches();\n});\n// The pieces of a very large batch. Listen for the 'shinywidgets:chunk-progress' event\n// on document to track progress.\nShiny.addCustomMessageHandler(\"shinywidgets_comm_chunk\", (x) => {\n    const id = (0,_utils__WEBPACK_IMPORTED_MODULE_3__.receiveChunk)(x);\n    if (id !== null) {\n        // The first chunk comes with the flush that produced the batch, so that's its\n        // place in line\n        chunkedBatches++;\n        enqueueBatch(async () => (0,_utils__WEBPACK_IMPORTED_MODULE_3__.jsonParse)(await (0,_utils__WEBPACK_IMPORTED_MODULE_3__.takeChunks)(id)));\n    }\n});\nasync function applyBatch(batch) {\n    for (const { type, msg } of await (0,_utils__WEBPACK_IMPORTED_MODULE_3__.unpackBatch)(batch)) {\n        const handler = commMessageHandlers[type];\n        if (!handler) {\n            console.error(`Unknown comm message type ${type}.`);\n            continue;\n        }\n        await handler(msg);\n    }\n}\n// Initialize the comm and model when a new widget is created\n// This is basically our version of https://github.com/jupyterlab/jupyterlab/blob/d33de15/packages/services/src/kernel/default.ts#L1144-L1176\nasync function handleCommOpen(msg) {\n    setBaseURL();\n    Shiny.renderDependencies(msg.content.html_deps);\n    const comm = new _comm__WEBPACK_IMPORTED_MODULE_1__.ShinyComm(msg.content.comm_id);\n    try {\n        await manager.handle_comm_open(comm, msg);\n    }\n    catch (err) {\n        console.error(\"Error opening widget model:\", err);\n    }\n}\n// Open a whole tree of widgets (ordered children first) at once: every model gets\n// registered right away, so they're created concurrently (a model that references\n// another just waits on that model's promise), and then wait for all of them\nasync function handleCommOpenBulk(msgs) {\n    await Promise.all(msgs.map(handleCommOpen));\n}\n// Handle any mutation of the model (e.g., add a marker to a map, without a full redraw)\n// Basically out version of https://github.com/jupyterlab/jupyterlab/blob/d33de15/packages/services/src/kernel/default.ts#L1200-L1215\nasync function handleCommMsg(msg) {\n    const id = msg.content.comm_id;\n    const model = manager.get_model(id);\n    if (!model) {\n        console.error(`Couldn't handle message for model ${id} because it doesn't exist.`);\n        return;\n    }\n    try {\n        const m = await model;\n        // @ts-ignore for some reason IClassicComm doesn't have this method, but we do\n        m.comm.handle_msg(msg);\n    }\n    catch (err) {\n        console.error(\"Error handling message:\", err);\n    }\n}\n// Handle the closing of a widget/comm/model\nasync function handleCommClose(msg) {\n    const id = msg.content.comm_id;\n    const model = manager.get_model(id);\n    if (!model) {\n        console.error(`Couldn't close model ${id} because it doesn't exist.`);\n        return;\n    }\n    try {\n        const m = await model;\n        // Some widget views need explicit teardown before model.close() removes them.\n        if (m.views) {\n            await Promise.all(Object.values(m.views).map(async (viewPromise) => {\n                try {\n                    const v = await viewPromise;\n                    // Plotly-backed views can leave DOM state and listeners behind unless\n                    // destroy() runs before the view is removed.\n                    if (hasMethod(v, 'destroy')) {\n                        v.destroy();\n                        // Clearing the back-reference prevents later teardown from touching a\n                        // model that is already being closed.\n                        delete v.model;\n                        v.remove();\n                    }\n                }\n                catch (err) {\n                    console.error(\"Error cleaning up view:\", err);\n                }\n            }));\n        }\n        // View removal updates _view_count. Mark the comm as inactive first so that\n        // save_changes() does not try to send those updates after the comm is gone.\n        m.comm_live = false;\n        // Close model after all views are cleaned up.\n        try {\n            await m.close();\n        }\n        catch (closeErr) {\n            if (!isIgnorableTeardownError(closeErr)) {\n                console.error(\"Unexpected error while closing model:\", closeErr);\n            }\n        }\n        // HTMLManager releases the model from its registry on comm:close.\n        try {\n            m.trigger(\"comm:close\");\n        }\n        catch (triggerErr) {\n            if (!isIgnorableTeardownError(triggerErr)) {\n                console.error(\"Unexpected error while triggering comm:close:\", triggerErr);\n            }\n        }\n    }\n    catch (err) {\n        console.error(\"Error during model cleanup:\", err);\n    }\n}\nconst commMessageHandlers = {\n    shinywidgets_comm_open: handleCommOpen,\n    shinywidgets_comm_open_bulk: handleCommOpenBulk,\n    shinywidgets_comm_msg: handleCommMsg,\n    shinywidgets_comm_close: handleCommClose,\n};\n$(document).on(\"shiny:disconnected\", () => {\n    manager.clear_state();\n    (0,_utils__WEBPACK_IMPORTED_MODULE_3__.clearChunks)();\n    pendingBatches = Promise.resolve();\n    unappliedBatches = 0;\n    chunkedBatches = 0;\n});\n// When in filling layout, some widgets (specifically, altair) incorrectly think their\n// height is 0 after it's shown, hidden, then shown again. As a workaround, trigger a\n// resize event when a tab is shown.\n// TODO: This covers the 95% use case, but it's definitely not an ideal way to handle\n// this situation. A more robust solution would use IntersectionObserver to detect when\n// the widget becomes visible. Or better yet, we'd get altair to handle this situation\n// better.\n// https://github.com/posit-dev/py-shinywidgets/issues/172\ndocument.addEventListener('shown.bs.tab', event => {\n    window.dispatchEvent(new Event('resize'));\n});\n// Our version of https://github.com/jupyter-widgets/widget-cookiecutter/blob/9694718/%7B%7Bcookiecutter.github_project_name%7D%7D/js/lib/extension.js#L8\nfunction setBaseURL(x = '') {\n    const base_url = document.querySelector('body').getAttribute('data-base-url');\n    if (!base_url) {\n        document.querySelector('body').setAttribute('data-base-url', x);\n    }\n}\n// TypeGuard to safely check if an object has a method\nfunction hasMethod(obj, methodName) {\n    return typeof obj[methodName] === 'function';\n}\nfunction isIgnorableTeardownError(err) {\n    const msg = errorMessage(err).toLowerCase();\n    return (msg.includes(\"widget is not attached\") ||\n        msg.includes(\"no comm channel defined\"));\n}\nfunction errorMessage(err) {\n    if (err instanceof Error) {\n        return err.message;\n    }\n    return String(err);\n}\n\n\n//# sourceURL=webpack://@jupyter-widgets/shiny-embed-manager/./src/output.ts?");
 
 /***/ }),
 
@@ -56,7 +56,7 @@ eval("__webpack_require__.r(__webpack_exports__);\n/* harmony export */ __webpac
   \**********************/
 /***/ ((__unused_webpack_module, __webpack_exports__, __webpack_require__) => {
 
-eval("__webpack_require__.r(__webpack_exports__);\n/* harmony export */ __webpack_require__.d(__webpack_exports__, {\n/* harmony export */   \"Throttler\": () => (/* binding */ Throttler),\n/* harmony export */   \"base64EncodeBuffers\": () => (/* binding */ base64EncodeBuffers),\n/* harmony export */   \"jsonParse\": () => (/* binding */ jsonParse)\n/* harmony export */ });\n/* harmony import */ var base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__ = __webpack_require__(/*! base64-arraybuffer */ \"./node_modules/base64-arraybuffer/dist/base64-arraybuffer.es5.js\");\n\n// On the server, we're using jupyter_client.session.json_packer to serialize messages,\n// and it encodes binary data (i.e., buffers) as base64, so decode it before passing it\n// along to the comm logic\nfunction jsonParse(x) {\n    const msg = JSON.parse(x);\n    msg.buffers = msg.buffers.map((base64) => new DataView((0,base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__.decode)(base64)));\n    return msg;\n}\nfunction normalizeBufferPayload(payload) {\n    if (!ArrayBuffer.isView(payload)) {\n        return payload;\n    }\n    const view = payload;\n    if (view.byteOffset === 0 && view.byteLength === view.buffer.byteLength) {\n        return view.buffer;\n    }\n    return view.buffer.slice(view.byteOffset, view.byteOffset + view.byteLength);\n}\nfunction base64EncodeBuffer(payload) {\n    return (0,base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__.encode)(normalizeBufferPayload(payload));\n}\nfunction base64EncodeBuffers(buffers) {\n    return buffers.map(base64EncodeBuffer);\n}\nclass Throttler {\n    constructor(wait = 100) {\n        if (wait < 0)\n            throw new Error(\"wait must be a positive number\");\n        this.wait = wait;\n        this._reset();\n    }\n    // Try to execute the function immediately, if it is not waiting\n    // If it is waiting, update the function to be called\n    throttle(fn) {\n        if (fn.length > 0)\n            throw new Error(\"fn must not take any arguments\");\n        if (this.isWaiting) {\n            // If the timeout is currently waiting, update the func to be called\n            this.fnToCall = fn;\n        }\n        else {\n            // If there is nothing waiting, call it immediately\n            // and start the throttling\n            fn();\n            this._setTimeout();\n        }\n    }\n    // Execute the function immediately and reset the timeout\n    // This is useful when the timeout is waiting and we want to\n    // execute the function immediately to not have events be out\n    // of order\n    flush() {\n        if (this.fnToCall)\n            this.fnToCall();\n        this._reset();\n    }\n    _setTimeout() {\n        this.timeoutId = setTimeout(() => {\n            if (this.fnToCall) {\n                this.fnToCall();\n                this.fnToCall = null;\n                // Restart the timeout as we just called the function\n                // This call is the key step of Throttler\n                this._setTimeout();\n            }\n            else {\n                this._reset();\n            }\n        }, this.wait);\n    }\n    _reset() {\n        this.fnToCall = null;\n        clearTimeout(this.timeoutId);\n        this.timeoutId = null;\n    }\n    get isWaiting() {\n        return this.timeoutId !== null;\n    }\n}\n\n\n\n//# sourceURL=webpack://@jupyter-widgets/shiny-embed-manager/./src/utils.ts?");
+eval("__webpack_require__.r(__webpack_exports__);\n/* harmony export */ __webpack_require__.d(__webpack_exports__, {\n/* harmony export */   \"Throttler\": () => (/* binding */ Throttler),\n/* harmony export */   \"base64EncodeBuffers\": () => (/* binding */ base64EncodeBuffers),\n/* harmony export */   \"clearChunks\": () => (/* binding */ clearChunks),\n/* harmony export */   \"finishChunks\": () => (/* binding */ finishChunks),\n/* harmony export */   \"jsonParse\": () => (/* binding */ jsonParse),\n/* harmony export */   \"receiveChunk\": () => (/* binding */ receiveChunk),\n/* harmony export */   \"takeChunks\": () => (/* binding */ takeChunks),\n/* harmony export */   \"unpackBatch\": () => (/* binding */ unpackBatch)\n/* harmony export */ });\n/* harmony import */ var base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__ = __webpack_require__(/*! base64-arraybuffer */ \"./node_modules/base64-arraybuffer/dist/base64-arraybuffer.es5.js\");\n\n// On the server, we're using jupyter_client.session.json_packer to serialize messages,\n// and it encodes binary data (i.e., buffers) as base64, so decode it before passing it\n// along to the comm logic\nfunction jsonParse(x) {\n    if (typeof x !== \"string\") {\n        return binaryParse(x);\n    }\n    const msg = JSON.parse(x);\n    msg.buffers = msg.buffers.map((base64) => new DataView((0,base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__.decode)(base64)));\n    return msg;\n}\n// When SHINYWIDGETS_BINARY_BUFFERS is enabled, messages with buffers arrive as binary\n// frames (see pack_binary_frame() on the server) laid out as:\n//   [4 byte header length][JSON header][buffer 0][buffer 1]...\n// where the header's buffers field holds the byte length of each buffer.\nfunction binaryParse(x) {\n    const headerLength = new DataView(x, 0, 4).getUint32(0);\n    const header = new TextDecoder().decode(new Uint8Array(x, 4, headerLength));\n    const msg = JSON.parse(header);\n    let offset = 4 + headerLength;\n    msg.buffers = msg.buffers.map((byteLength) => {\n        const buf = new DataView(x, offset, byteLength);\n        offset += byteLength;\n        return buf;\n    });\n    return msg;\n}\n// Comm messages arrive in batches (one per server-side flush phase). Each message's\n// buffers are either base64 strings or, when the batch is a binary frame, the byte\n// lengths of the message's share of the frame's buffers (which are in message order).\n// Large messages may arrive deflate compressed (see SHINYWIDGETS_COMPRESS_THRESHOLD),\n// in which case the compressed payload is either base64 text or the frame buffer\n// preceding the message's own buffers. Takes the batch as parsed by jsonParse().\nasync function unpackBatch(batch) {\n    const frameBuffers = batch.buffers;\n    let i = 0;\n    const result = [];\n    for (const entry of batch.messages) {\n        let msg = entry.msg;\n        if (entry.deflate !== undefined) {\n            const payload = typeof entry.deflate === \"string\" ?\n                new DataView((0,base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__.decode)(entry.deflate)) : frameBuffers[i++];\n            msg = JSON.parse(await inflate(payload));\n        }\n        // A bulk open's message is a list of open messages\n        for (const m of Array.isArray(msg) ? msg : [msg]) {\n            m.buffers = m.buffers.map((buf) => {\n                return typeof buf === \"string\" ? new DataView((0,base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__.decode)(buf)) : frameBuffers[i++];\n            });\n        }\n        result.push({ type: entry.type, msg });\n    }\n    return result;\n}\nconst pendingChunks = new Map();\nfunction getPendingChunks(id) {\n    let pending = pendingChunks.get(id);\n    if (!pending) {\n        let resolve;\n        const done = new Promise((r) => { resolve = r; });\n        pending = { pieces: [], received: 0, done, resolve };\n        pendingChunks.set(id, pending);\n    }\n    return pending;\n}\n// A very large batch gets sent in chunks (see SHINYWIDGETS_CHUNK_SIZE), ahead of a\n// batch that just refers to them. The first chunk comes with the server-side flush\n// that produced the batch (and the rest after it). Collect the pieces, and let anyone\n// listening know how far along they are. Returns the batch's id if this is its first\n// piece.\nfunction receiveChunk(x) {\n    const chunk = x instanceof ArrayBuffer ? binaryParse(x) : x;\n    const pending = getPendingChunks(chunk.id);\n    pending.pieces[chunk.index] = chunk.data !== undefined ? chunk.data : chunk.buffers[0];\n    pending.received++;\n    document.dispatchEvent(new CustomEvent(\"shinywidgets:chunk-progress\", {\n        detail: { comm_ids: chunk.comm_ids, received: pending.received, total: chunk.total },\n    }));\n    return chunk.index === 0 ? chunk.id : null;\n}\n// Called once the batch that refers to the chunks arrives (by which time all of them\n// have arrived too)\nfunction finishChunks(id) {\n    const pending = getPendingChunks(id);\n    pending.resolve(joinChunks(pending.pieces));\n}\nfunction joinChunks(pieces) {\n    if (typeof pieces[0] === \"string\") {\n        return pieces.join(\"\");\n    }\n    const views = pieces;\n    const result = new Uint8Array(views.reduce((n, v) => n + v.byteLength, 0));\n    let offset = 0;\n    for (const v of views) {\n        result.set(new Uint8Array(v.buffer, v.byteOffset, v.byteLength), offset);\n        offset += v.byteLength;\n    }\n    return result.buffer;\n}\nfunction clearChunks() {\n    pendingChunks.clear();\n}\n// Wait for (all the pieces of) a chunked batch\nasync function takeChunks(id) {\n    const result = await getPendingChunks(id).done;\n    pendingChunks.delete(id);\n    return result;\n}\n// zlib.compress() on the server produces what DecompressionStream calls \"deflate\"\nasync function inflate(payload) {\n    const stream = new Blob([payload]).stream().pipeThrough(new window.DecompressionStream(\"deflate\"));\n    return new Response(stream).text();\n}\nfunction normalizeBufferPayload(payload) {\n    if (!ArrayBuffer.isView(payload)) {\n        return payload;\n    }\n    const view = payload;\n    if (view.byteOffset === 0 && view.byteLength === view.buffer.byteLength) {\n        return view.buffer;\n    }\n    return view.buffer.slice(view.byteOffset, view.byteOffset + view.byteLength);\n}\nfunction base64EncodeBuffer(payload) {\n    return (0,base64_arraybuffer__WEBPACK_IMPORTED_MODULE_0__.encode)(normalizeBufferPayload(payload));\n}\nfunction base64EncodeBuffers(buffers) {\n    return buffers.map(base64EncodeBuffer);\n}\nclass Throttler {\n    constructor(wait = 100) {\n        if (wait < 0)\n            throw new Error(\"wait must be a positive number\");\n        this.wait = wait;\n        this._reset();\n    }\n    // Try to execute the function immediately, if it is not waiting\n    // If it is waiting, update the function to be called\n    throttle(fn) {\n        if (fn.length > 0)\n            throw new Error(\"fn must not take any arguments\");\n        if (this.isWaiting) {\n            // If the timeout is currently waiting, update the func to be called\n            this.fnToCall = fn;\n        }\n        else {\n            // If there is nothing waiting, call it immediately\n            // and start the throttling\n            fn();\n            this._setTimeout();\n        }\n    }\n    // Execute the function immediately and reset the timeout\n    // This is useful when the timeout is waiting and we want to\n    // execute the function immediately to not have events be out\n    // of order\n    flush() {\n        if (this.fnToCall)\n            this.fnToCall();\n        this._reset();\n    }\n    _setTimeout() {\n        this.timeoutId = setTimeout(() => {\n            if (this.fnToCall) {\n                this.fnToCall();\n                this.fnToCall = null;\n                // Restart the timeout as we just called the function\n                // This call is the key step of Throttler\n                this._setTimeout();\n            }\n            else {\n                this._reset();\n            }\n        }, this.wait);\n    }\n    _reset() {\n        this.fnToCall = null;\n        clearTimeout(this.timeoutId);\n        this.timeoutId = null;\n    }\n    get isWaiting() {\n        return this.timeoutId !== null;\n    }\n}\n\n\n\n//# sourceURL=webpack://@jupyter-widgets/shiny-embed-manager/./src/utils.ts?");
 
 /***/ }),
 
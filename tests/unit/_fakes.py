@@ -67,6 +67,9 @@ class FakeSession:
         # Used by init_shiny_widget() to embed deps into comm-open metadata.
         self._process_ui_calls: List[Any] = []
 
+        # (msg_type, message) pairs passed to send_custom_message()
+        self.sent_messages: List[Any] = []
+
         self._root = root
 
     def is_stub_session(self) -> bool:
@@ -89,8 +92,7 @@ class FakeSession:
         self._flushed_handlers.append(fn)
 
     async def send_custom_message(self, msg_type: str, msg_txt: str) -> None:
-        # Unit tests inspect scheduled callbacks; they do not need to execute sends.
-        return None
+        self.sent_messages.append((msg_type, msg_txt))
 
     def _process_ui(self, x: Any) -> Dict[str, Any]:
         self._process_ui_calls.append(x)
@@ -105,6 +107,7 @@ class FakeStaticFiles:
 class FakeCommManager:
     def __init__(self) -> None:
         self.comms: Dict[str, Any] = {}
+        self.widgets: Dict[str, Any] = {}
         self.registered: List[str] = []
         self.unregistered: List[str] = []
 
@@ -1,32 +1,47 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import gc
 import json
-from typing import Any, Dict
+import struct
+import zlib
+from typing import Any, Dict, List
 
 import pytest
 
 from tests.unit._fakes import FakeSession
 
 
-def closure_map(fn: Any) -> Dict[str, Any]:
-    freevars = getattr(fn.__code__, "co_freevars", ())
-    closure = fn.__closure__ or ()
-    return {name: cell.cell_contents for name, cell in zip(freevars, closure)}
-
-
 @pytest.fixture(autouse=True)
-def _reset_comm_manager_class_state() -> None:
-    from shinywidgets._comm import ShinyCommManager
-
-    ShinyCommManager.comms.clear()
+def _collect_comms_from_previous_tests() -> None:
+    # Comms and their manager reference each other, so collect those left over from
+    # earlier tests now (their __del__ would otherwise publish a close into whatever
+    # session a later test has patched in)
+    gc.collect()
 
 
-def _scheduled_payloads(session: FakeSession):
-    return {
-        "flush": list(session._flush_handlers),
-        "flushed": list(session._flushed_handlers),
-    }
+def _drain(session: FakeSession, phase: str) -> List[Dict[str, Any]]:
+    """Run the scheduled flush (or flushed) callbacks and return the batched messages."""
+    handlers = (
+        session._flush_handlers if phase == "flush" else session._flushed_handlers
+    )
+    for fn in list(handlers):
+        asyncio.run(fn())
+    handlers.clear()
+
+    msgs: List[Dict[str, Any]] = []
+    for msg_type, batch_txt in session.sent_messages:
+        assert msg_type == "shinywidgets_comm_batch"
+        for entry in json.loads(batch_txt)["messages"]:
+            if entry["type"] == "shinywidgets_comm_open_bulk":
+                msgs.extend(
+                    {"type": "shinywidgets_comm_open", "msg": m} for m in entry["msg"]
+                )
+            else:
+                msgs.append(entry)
+    session.sent_messages.clear()
+    return msgs
 
 
 def test_open_registers_and_schedules_on_flush(monkeypatch):
@@ -44,13 +59,12 @@ def test_open_registers_and_schedules_on_flush(monkeypatch):
     )
 
     assert "c1" in mgr.comms
-    payloads = _scheduled_payloads(session)
-    assert len(payloads["flush"]) == 1
-    assert len(payloads["flushed"]) == 0
+    assert len(session._flush_handlers) == 1
+    assert len(session._flushed_handlers) == 0
 
-    cells = closure_map(payloads["flush"][0])
-    assert cells["msg_type"] == "shinywidgets_comm_open"
-    msg = json.loads(cells["msg_txt"])
+    (entry,) = _drain(session, "flush")
+    assert entry["type"] == "shinywidgets_comm_open"
+    msg = entry["msg"]
     assert msg["content"]["comm_id"] == "c1"
     assert msg["content"]["data"] == {"a": 1}
     assert msg["content"]["target_name"] == "jupyter.widget"
@@ -67,18 +81,322 @@ def test_send_schedules_on_flushed(monkeypatch):
 
     mgr = comm.ShinyCommManager()
     c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
-    session._flush_handlers.clear()
+    _drain(session, "flush")
 
     c.send(data={"k": "v"})
-    payloads = _scheduled_payloads(session)
-    assert len(payloads["flushed"]) == 1
-    cells = closure_map(payloads["flushed"][0])
-    assert cells["msg_type"] == "shinywidgets_comm_msg"
-    msg = json.loads(cells["msg_txt"])
+    assert len(session._flush_handlers) == 0
+    assert len(session._flushed_handlers) == 1
+    (entry,) = _drain(session, "flushed")
+    assert entry["type"] == "shinywidgets_comm_msg"
+    msg = entry["msg"]
     assert msg["content"]["comm_id"] == "c1"
     assert msg["content"]["data"] == {"k": "v"}
 
 
+def test_messages_within_a_flush_are_sent_as_one_ordered_batch(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+
+    mgr = comm.ShinyCommManager()
+    parent = comm.ShinyComm(
+        comm_id="parent", comm_manager=mgr, target_name="jupyter.widget"
+    )
+    for i in range(3):
+        parent.send(data={"i": i})
+    # A child opened after the parent's updates were produced
+    child = comm.ShinyComm(
+        comm_id="child", comm_manager=mgr, target_name="jupyter.widget"
+    )
+    child.close()
+
+    # One callback per flush phase, regardless of how many messages were produced
+    assert len(session._flush_handlers) == 1
+    assert len(session._flushed_handlers) == 1
+
+    # Opens go out (in one batch) before the messages that may reference them
+    opens = _drain(session, "flush")
+    assert [m["msg"]["content"]["comm_id"] for m in opens] == ["parent", "child"]
+    assert len(session.sent_messages) == 0
+
+    for fn in list(session._flushed_handlers):
+        asyncio.run(fn())
+    assert len(session.sent_messages) == 1
+    session._flushed_handlers.clear()
+    msgs = [m for _, txt in session.sent_messages for m in json.loads(txt)["messages"]]
+    assert [m["type"] for m in msgs] == [
+        "shinywidgets_comm_msg",
+        "shinywidgets_comm_msg",
+        "shinywidgets_comm_msg",
+        "shinywidgets_comm_close",
+    ]
+    assert [m["msg"]["content"]["data"] for m in msgs[:3]] == [
+        {"i": 0},
+        {"i": 1},
+        {"i": 2},
+    ]
+
+    # The queue re-arms for the next flush
+    parent.send(data={"i": 3})
+    assert len(session._flushed_handlers) == 1
+
+
+def test_state_updates_are_coalesced_per_comm(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+
+    mgr = comm.ShinyCommManager()
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    b = comm.ShinyComm(comm_id="b", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+
+    def update(c, state, paths=(), buffers=()):
+        c.send(
+            data={"method": "update", "state": state, "buffer_paths": list(paths)},
+            buffers=list(buffers),
+        )
+
+    update(a, {"color": "red", "size": 1})
+    update(b, {"value": 1})
+    update(a, {"color": "blue"})
+    update(a, {}, paths=[["data", "x"]], buffers=[b"\x00"])
+    update(a, {"opacity": 0.5}, paths=[["data", "y"]], buffers=[b"\x01"])
+
+    msgs = _drain(session, "flushed")
+    assert [m["msg"]["content"]["comm_id"] for m in msgs] == ["a", "b"]
+    data = msgs[0]["msg"]["content"]["data"]
+    assert data["state"] == {"color": "blue", "size": 1, "opacity": 0.5}
+    # Last write wins for buffers too
+    assert data["buffer_paths"] == [["data", "y"]]
+    assert msgs[0]["msg"]["buffers"] == [base64.b64encode(b"\x01").decode("ascii")]
+
+
+def test_custom_messages_are_barriers_for_coalescing(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+
+    mgr = comm.ShinyCommManager()
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+
+    a.send(data={"method": "update", "state": {"x": 1}, "buffer_paths": []})
+    a.send(data={"method": "custom", "content": {"event": "reset"}})
+    a.send(data={"method": "update", "state": {"x": 2}, "buffer_paths": []})
+    a.send(data={"method": "update", "state": {"x": 3}, "buffer_paths": []})
+
+    msgs = _drain(session, "flushed")
+    datas = [m["msg"]["content"]["data"] for m in msgs]
+    assert [d["method"] for d in datas] == ["update", "custom", "update"]
+    assert datas[0]["state"] == {"x": 1}
+    assert datas[2]["state"] == {"x": 3}
+
+    # Nothing merges into an update that has already been sent
+    a.send(data={"method": "update", "state": {"x": 4}, "buffer_paths": []})
+    (entry,) = _drain(session, "flushed")
+    assert entry["msg"]["content"]["data"]["state"] == {"x": 4}
+
+
+def _update(c: Any, **state: Any) -> None:
+    c.send(data={"method": "update", "state": state, "buffer_paths": []})
+
+
+def _custom(c: Any, event: str) -> None:
+    c.send(data={"method": "custom", "content": {"event": event}})
+
+
+def _events(msgs: List[Dict[str, Any]]) -> List[Any]:
+    result: List[Any] = []
+    for m in msgs:
+        data = m["msg"]["content"]["data"]
+        if m["type"] == "shinywidgets_comm_close":
+            result.append("close")
+        elif data["method"] == "custom":
+            result.append(data["content"]["event"])
+        else:
+            result.append(data)
+    return result
+
+
+def test_queue_overflow_coalesce_holds_updates_back_until_under_the_cap(monkeypatch):
+    import shinywidgets
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_QUEUE_MAX_MESSAGES", 1)
+    counts = shinywidgets.queue_overflow_counts()
+
+    mgr = comm.ShinyCommManager()
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    b = comm.ShinyComm(comm_id="b", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+
+    _custom(a, "one")
+    # Over the cap, so these are held back (and merged)
+    _update(a, x=1, y=1)
+    _update(a, x=2)
+    _update(b, z=1)
+    queue = comm.CommMessageQueue.get(session)
+    assert len(queue._flushed_queue) == 1
+    # A custom message goes out after the widget's held back state, though
+    _custom(a, "two")
+    _update(a, x=3)
+    assert shinywidgets.queue_overflow_counts(session) == {
+        "coalesce": 4,
+        "drop": 0,
+        "block": 0,
+    }
+    assert comm.OVERFLOW_COUNTS["coalesce"] == counts["coalesce"] + 4
+
+    # The held back updates go out once the flush's messages have been sent
+    msgs = _drain(session, "flushed")
+    assert _events(msgs) == [
+        "one",
+        {"method": "update", "state": {"x": 2, "y": 1}, "buffer_paths": []},
+        "two",
+        {"method": "update", "state": {"z": 1}, "buffer_paths": []},
+        {"method": "update", "state": {"x": 3}, "buffer_paths": []},
+    ]
+    assert not queue._held
+
+
+def test_queue_overflow_drop_sends_the_current_state_of_dropped_traits(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_QUEUE_MAX_MESSAGES", 1)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_QUEUE_OVERFLOW", "drop")
+
+    class Widget:
+        state = {"x": 10, "y": 20, "z": 30}
+
+        def get_state(self, key: Any = None) -> Dict[str, Any]:
+            return {k: self.state[k] for k in key}
+
+    mgr = comm.ShinyCommManager.get(session)  # type: ignore[arg-type]
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    b = comm.ShinyComm(comm_id="b", comm_manager=mgr, target_name="jupyter.widget")
+    mgr.widgets["a"] = widget = Widget()
+    _drain(session, "flush")
+
+    _custom(a, "one")
+    _update(a, x=1)
+    _update(a, x=2, y=2)
+    # Nothing (but the traits) is kept for dropped updates, and nothing gets sent for
+    # a widget that's closed meanwhile
+    queue = comm.CommMessageQueue.get(session)
+    ((_, traits),) = queue._dropped.values()
+    assert traits == {"x", "y"}
+    _update(b, z=1)
+    b.close()
+    assert queue.overflow_counts["drop"] == 3
+
+    widget.state = {"x": 11, "y": 21, "z": 31}
+    msgs = _drain(session, "flushed")
+    assert _events(msgs) == [
+        "one",
+        "close",
+        {"method": "update", "state": {"x": 11, "y": 21}, "buffer_paths": []},
+    ]
+    assert not queue._dropped
+
+
+def test_queue_caps_count_chunks_still_being_sent(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_CHUNK_SIZE", 1000)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_QUEUE_MAX_BYTES", 1500)
+
+    mgr = comm.ShinyCommManager()
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+    _custom(a, "a" * 2500)
+    queue = comm.CommMessageQueue.get(session)
+
+    async def flush() -> None:
+        await session._flushed_handlers.pop()()
+        # The rest of the batch is still on its way, so the next flush's update is
+        # held back...
+        _update(a, x=1)
+        assert queue.overflow_counts["coalesce"] == 1
+        await session._flushed_handlers.pop()()
+        assert queue._held
+        # ...until it's been sent
+        await asyncio.gather(*queue._chunk_tasks)
+        assert not queue._held
+        assert queue._sending_nbytes == queue._sending_messages == 0
+
+    asyncio.run(flush())
+
+    *_, (stub_type, stub), (batch_type, batch_txt) = session.sent_messages
+    assert json.loads(stub)["chunks"]
+    (entry,) = json.loads(batch_txt)["messages"]
+    assert entry["msg"]["content"]["data"]["state"] == {"x": 1}
+
+
+def test_queue_overflow_block_waits_for_chunks_still_being_sent(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_CHUNK_SIZE", 1000)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_QUEUE_MAX_BYTES", 500)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_QUEUE_OVERFLOW", "block")
+
+    mgr = comm.ShinyCommManager()
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+    _custom(a, "a" * 2500)
+    queue = comm.CommMessageQueue.get(session)
+
+    async def flush() -> None:
+        await session._flushed_handlers.pop()()
+        # Nothing is held back...
+        _update(a, x=1)
+        assert not queue._held
+        # ...but the next flush waits for what's still being sent
+        flushed = asyncio.ensure_future(session._flushed_handlers.pop()())
+        await asyncio.sleep(0)
+        assert not flushed.done()
+        await flushed
+
+    asyncio.run(flush())
+
+    assert queue.overflow_counts["block"] == 1
+    chunks = [m for t, m in session.sent_messages if t == "shinywidgets_comm_chunk"]
+    assert [c["index"] for c in chunks] == [0, 1, 2]
+    (_, batch_txt) = session.sent_messages[-1]
+    (entry,) = json.loads(batch_txt)["messages"]
+    assert entry["msg"]["content"]["data"]["state"] == {"x": 1}
+
+
+def test_uncapped_queue_does_not_reserialize_on_flush(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+
+    mgr = comm.ShinyCommManager()
+    a = comm.ShinyComm(comm_id="a", comm_manager=mgr, target_name="jupyter.widget")
+    _update(a, x=1)
+    _custom(a, "one")
+
+    calls: List[Any] = []
+    packer = comm.json_packer
+    monkeypatch.setattr(comm, "json_packer", lambda x: calls.append(x) or packer(x))
+    _drain(session, "flush")
+    _drain(session, "flushed")
+    assert calls == []
+
+
 def test_close_is_idempotent_and_unregisters(monkeypatch):
     import shinywidgets._comm as comm
 
@@ -135,13 +453,11 @@ def test_buffers_are_base64_encoded_and_validated(monkeypatch):
 
     mgr = comm.ShinyCommManager()
     c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
-    session._flush_handlers.clear()
-    session._flushed_handlers.clear()
+    _drain(session, "flush")
 
     c.send(data={"buffer_paths": [["x"]]}, buffers=[b"\x00\x01"])
-    cells = closure_map(session._flushed_handlers[0])
-    msg = json.loads(cells["msg_txt"])
-    assert msg["buffers"] == [base64.b64encode(b"\x00\x01").decode("ascii")]
+    (entry,) = _drain(session, "flushed")
+    assert entry["msg"]["buffers"] == [base64.b64encode(b"\x00\x01").decode("ascii")]
 
     # Non-contiguous buffers must raise.
     # `_comm.py` checks `isinstance(buf, memoryview)` and then calls `memoryview(buf)`,
@@ -162,6 +478,316 @@ def test_buffers_are_base64_encoded_and_validated(monkeypatch):
         c.send(buffers=[object()])  # type: ignore[list-item]
 
 
+class _FakeWebSocket:
+    def __init__(self) -> None:
+        self.frames: list = []
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.frames.append(data)
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.conn = _FakeWebSocket()
+        self.closed = False
+
+    def _is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self, code: int, reason: Any) -> None:
+        self.closed = True
+
+
+def test_binary_buffers_are_sent_as_binary_frames(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    session._conn = _FakeConnection()  # type: ignore[attr-defined]
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_BINARY_BUFFERS", True)
+
+    mgr = comm.ShinyCommManager()
+    c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
+    # No buffers, so the open message stays JSON text
+    (entry,) = _drain(session, "flush")
+    assert entry["msg"]["buffers"] == []
+
+    c.send(data={"buffer_paths": [["x"]]}, buffers=[b"\x00\x01"])
+    c.send(data={"buffer_paths": [["y"]]}, buffers=[b"abc"])
+    asyncio.run(session._flushed_handlers[0]())
+    assert session.sent_messages == []
+
+    (frame,) = session._conn.conn.frames  # type: ignore[attr-defined]
+    n = frame[0]
+    assert frame[1 : 1 + n] == b"shinywidgets_comm_batch"
+    payload = frame[1 + n :]
+    (header_len,) = struct.unpack(">I", payload[:4])
+    header = json.loads(payload[4 : 4 + header_len].decode("utf-8"))
+    assert header["buffers"] == [2, 3]
+    assert [m["msg"]["buffers"] for m in header["messages"]] == [[2], [3]]
+    assert payload[4 + header_len :] == b"\x00\x01abc"
+
+
+def test_binary_buffers_fall_back_to_base64_without_binary_transport(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_BINARY_BUFFERS", True)
+
+    mgr = comm.ShinyCommManager()
+    with pytest.warns(UserWarning, match="SHINYWIDGETS_BINARY_BUFFERS"):
+        c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
+    c.send(data={"buffer_paths": [["x"]]}, buffers=[b"\x00\x01"])
+
+    msgs = _drain(session, "flushed")
+    assert msgs[0]["msg"]["buffers"] == [base64.b64encode(b"\x00\x01").decode("ascii")]
+
+
+# What the client does with a binary frame: Shiny's dispatchMessage() (shiny.js) reads
+# the type name's length from the first byte, then the type name, and hands the rest to
+# that custom message handler, where binaryParse() and unpackBatch() (js/src/utils.ts)
+# read the header length (a big-endian uint32), the JSON header, then slice each
+# message's buffers out of the rest of the frame (in message order).
+def _dispatch_binary_message(frame: bytes) -> tuple[str, List[Dict[str, Any]]]:
+    view = memoryview(frame)
+    n = view[0]
+    msg_type = bytes(view[1 : 1 + n]).decode("ascii")
+    data = view[1 + n :]
+
+    (header_len,) = struct.unpack_from(">I", data, 0)
+    batch = json.loads(bytes(data[4 : 4 + header_len]).decode("utf-8"))
+    offset = 4 + header_len
+    frame_buffers = []
+    for byte_length in batch["buffers"]:
+        frame_buffers.append(bytes(data[offset : offset + byte_length]))
+        offset += byte_length
+    assert offset == len(data)
+
+    i = 0
+    msgs = []
+    for entry in batch["messages"]:
+        msg = entry["msg"]
+        for m in msg if isinstance(msg, list) else [msg]:
+            bufs = []
+            for buf in m["buffers"]:
+                if isinstance(buf, str):
+                    bufs.append(base64.b64decode(buf))
+                else:
+                    bufs.append(frame_buffers[i])
+                    i += 1
+            m["buffers"] = bufs
+        msgs.append({"type": entry["type"], "msg": msg})
+    assert i == len(frame_buffers)
+    return msg_type, msgs
+
+
+def test_binary_frames_parse_the_way_the_client_dispatches_them(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    session._conn = _FakeConnection()  # type: ignore[attr-defined]
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_BINARY_BUFFERS", True)
+
+    mgr = comm.ShinyCommManager()
+    c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+
+    c.send(data={"buffer_paths": [["x"], ["y"]]}, buffers=[b"\x00" * 3, b"\xff"])
+    c.send(data={"method": "custom"})
+    c.send(
+        data={"buffer_paths": [["z"]]}, buffers=[memoryview("\u00e9t\u00e9".encode())]
+    )
+    asyncio.run(session._flushed_handlers[0]())
+
+    (frame,) = session._conn.conn.frames  # type: ignore[attr-defined]
+    msg_type, msgs = _dispatch_binary_message(frame)
+    assert msg_type == "shinywidgets_comm_batch"
+    assert [m["type"] for m in msgs] == ["shinywidgets_comm_msg"] * 3
+    assert [m["msg"]["buffers"] for m in msgs] == [
+        [b"\x00" * 3, b"\xff"],
+        [],
+        ["\u00e9t\u00e9".encode()],
+    ]
+    assert [m["msg"]["content"]["data"] for m in msgs] == [
+        {"buffer_paths": [["x"], ["y"]]},
+        {"method": "custom"},
+        {"buffer_paths": [["z"]]},
+    ]
+
+
+def test_large_messages_are_deflate_compressed(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_COMPRESS_THRESHOLD", 1000)
+
+    mgr = comm.ShinyCommManager()
+    c = comm.ShinyComm(
+        comm_id="big", comm_manager=mgr, target_name="jupyter.widget", data={"x": 1}
+    )
+    c.send(data={"method": "update", "state": {"y": "a" * 5000}})
+
+    asyncio.run(session._flush_handlers[0]())
+    asyncio.run(session._flushed_handlers[0]())
+    (small, large) = [
+        json.loads(txt)["messages"][0] for _, txt in session.sent_messages
+    ]
+
+    # Small messages are left alone
+    assert "deflate" not in small
+    assert small["msg"]["content"]["data"] == {"x": 1}
+
+    assert "msg" not in large
+    deflated = base64.b64decode(large["deflate"])
+    assert len(deflated) < 1000
+    msg = json.loads(zlib.decompress(deflated).decode("utf-8"))
+    assert msg["content"]["data"]["state"] == {"y": "a" * 5000}
+
+
+def test_compressed_messages_ride_in_binary_frames(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    session._conn = _FakeConnection()  # type: ignore[attr-defined]
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_BINARY_BUFFERS", True)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_COMPRESS_THRESHOLD", 1000)
+
+    mgr = comm.ShinyCommManager()
+    c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+    c.send(data={"state": {"y": "a" * 5000}, "buffer_paths": [["x"]]}, buffers=[b"xy"])
+    asyncio.run(session._flushed_handlers[0]())
+
+    (frame,) = session._conn.conn.frames  # type: ignore[attr-defined]
+    payload = frame[1 + frame[0] :]
+    (header_len,) = struct.unpack(">I", payload[:4])
+    header = json.loads(payload[4 : 4 + header_len].decode("utf-8"))
+    (entry,) = header["messages"]
+    n = entry["deflate"]
+    assert header["buffers"] == [n, 2]
+
+    body = payload[4 + header_len :]
+    msg = json.loads(zlib.decompress(body[:n]).decode("utf-8"))
+    assert msg["buffers"] == [2]
+    assert body[n:] == b"xy"
+
+
+def test_large_batches_are_sent_in_chunks_ahead_of_their_batch(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_CHUNK_SIZE", 1000)
+
+    mgr = comm.ShinyCommManager()
+    small = comm.ShinyComm(
+        comm_id="small", comm_manager=mgr, target_name="jupyter.widget"
+    )
+    big = comm.ShinyComm(comm_id="big", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+
+    small.send(data={"method": "custom", "content": {}})
+    big.send(data={"method": "update", "state": {"y": "a" * 2500}})
+
+    async def flush() -> None:
+        await session._flushed_handlers[0]()
+        # The flush only sends the first chunk
+        ((chunk_type, chunk),) = session.sent_messages
+        assert chunk_type == "shinywidgets_comm_chunk"
+        assert chunk["index"] == 0
+        await asyncio.gather(*comm.CommMessageQueue.get(session)._chunk_tasks)
+
+    asyncio.run(flush())
+
+    # Then come the rest of the chunks, and only then the batch that refers to them
+    *chunks, (batch_type, batch_txt) = session.sent_messages
+    assert {t for t, _ in chunks} == {"shinywidgets_comm_chunk"}
+    assert batch_type == "shinywidgets_comm_batch"
+    pieces = [c for _, c in chunks]
+    assert json.loads(batch_txt) == {"chunks": pieces[0]["id"], "buffers": []}
+    assert [c["index"] for c in pieces] == [0, 1, 2]
+    assert {c["total"] for c in pieces} == {3}
+    assert all(c["comm_ids"] == ["small", "big"] for c in pieces)
+    assert all(len(c["data"]) <= 1000 for c in pieces)
+
+    batch = json.loads("".join(c["data"] for c in pieces))
+    small_entry, big_entry = batch["messages"]
+    assert small_entry["msg"]["content"]["comm_id"] == "small"
+    assert big_entry["msg"]["content"]["data"]["state"] == {"y": "a" * 2500}
+
+
+def test_large_binary_batches_are_sent_in_binary_chunks(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    session._conn = _FakeConnection()  # type: ignore[attr-defined]
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_BINARY_BUFFERS", True)
+    monkeypatch.setattr(comm, "SHINYWIDGETS_CHUNK_SIZE", 1000)
+
+    mgr = comm.ShinyCommManager()
+    c = comm.ShinyComm(comm_id="c1", comm_manager=mgr, target_name="jupyter.widget")
+    _drain(session, "flush")
+    c.send(data={"buffer_paths": [["x"]]}, buffers=[bytes(range(256)) * 10])
+
+    async def flush() -> None:
+        await session._flushed_handlers[0]()
+        assert len(session._conn.conn.frames) == 1  # type: ignore[attr-defined]
+        assert session.sent_messages == []
+        await asyncio.gather(*comm.CommMessageQueue.get(session)._chunk_tasks)
+
+    asyncio.run(flush())
+
+    # (The batch that refers to the chunks is text, and goes out after all of them)
+    ((_, ref_txt),) = session.sent_messages
+    frames = session._conn.conn.frames  # type: ignore[attr-defined]
+    payload = b""
+    for i, frame in enumerate(frames):
+        msg_type, chunk = _dispatch_binary_chunk(frame)
+        assert msg_type == "shinywidgets_comm_chunk"
+        assert chunk["id"] == json.loads(ref_txt)["chunks"]
+        assert (chunk["index"], chunk["total"]) == (i, len(frames))
+        assert len(chunk["buffers"][0]) <= 1000
+        payload += chunk["buffers"][0]
+
+    # The pieces make up the batch's frame (minus the message type prefix)
+    _, (msg,) = _dispatch_binary_message(
+        bytes([len(b"shinywidgets_comm_batch")]) + b"shinywidgets_comm_batch" + payload
+    )
+    assert msg["msg"]["buffers"] == [bytes(range(256)) * 10]
+
+
+def _dispatch_binary_chunk(frame: bytes) -> tuple[str, Dict[str, Any]]:
+    n = frame[0]
+    payload = frame[1 + n :]
+    (header_len,) = struct.unpack(">I", payload[:4])
+    chunk = json.loads(payload[4 : 4 + header_len].decode("utf-8"))
+    chunk["buffers"] = [payload[4 + header_len :]]
+    return frame[1 : 1 + n].decode("ascii"), chunk
+
+
+def test_consecutive_opens_are_sent_as_one_bulk_entry(monkeypatch):
+    import shinywidgets._comm as comm
+
+    session = FakeSession()
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+
+    mgr = comm.ShinyCommManager()
+    for id in ["layout", "child", "parent"]:
+        comm.ShinyComm(comm_id=id, comm_manager=mgr, target_name="jupyter.widget")
+    asyncio.run(session._flush_handlers[0]())
+
+    ((_, batch_txt),) = session.sent_messages
+    (entry,) = json.loads(batch_txt)["messages"]
+    assert entry["type"] == "shinywidgets_comm_open_bulk"
+    ids = [m["content"]["comm_id"] for m in entry["msg"]]
+    assert ids == ["layout", "child", "parent"]
+
+
 def test_msg_and_close_callbacks(monkeypatch):
     import shinywidgets._comm as comm
 
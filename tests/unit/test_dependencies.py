@@ -7,6 +7,7 @@ import shinywidgets._dependencies as deps
 from htmltools import HTMLDependency
 from ipywidgets.widgets.domwidget import DOMWidget
 from shinywidgets._dependencies import (
+    clear_dependency_cache,
     jupyter_extension_destination,
     jupyter_extension_path,
     output_binding_dependency,
@@ -17,6 +18,11 @@ from shinywidgets._dependencies import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_dependency_cache() -> None:
+    clear_dependency_cache()
+
+
 def test_parse_version_strips_semver_prefixes() -> None:
     assert parse_version("^1.2.3") == "1.2.3"
     assert parse_version(">=2.0.0") == "2.0.0"
@@ -182,3 +188,36 @@ def test_require_dependency_extension_found_returns_dependency(
     assert "window.require.config(" in head
     assert "some-widget-module" in head
     assert "/lib/some-widget-module-1.2.3/index" in head
+
+
+def test_require_dependency_is_cached_per_widget_class(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class DummyWidget:
+        __module__ = "fakepkg.sub"
+
+        def __init__(self, version: str = "^1.2.3") -> None:
+            self._model_module = "some-widget-module"
+            self._model_module_version = version
+
+    lookups = []
+
+    def fake_path(name):
+        lookups.append(name)
+        return "/tmp/some-widget-module"
+
+    monkeypatch.setattr(deps, "_jupyter_extension_path", fake_path)
+    session = types.SimpleNamespace(app=types.SimpleNamespace(lib_prefix="/lib"))
+
+    dep = require_dependency(DummyWidget(), session)
+    assert require_dependency(DummyWidget(), session) is dep
+    assert lookups == ["some-widget-module"]
+
+    # A different module version is a different dependency
+    dep2 = require_dependency(DummyWidget("^2.0.0"), session)
+    assert dep2 is not None and str(dep2.version) == "2.0.0"
+
+    # The cache can be invalidated (e.g., after installing a new extension)
+    clear_dependency_cache()
+    assert require_dependency(DummyWidget(), session) is not dep
+    assert lookups == ["some-widget-module"] * 2
@@ -1,3 +1,4 @@
+import pytest
 import shinywidgets._render_widget as rw
 import shinywidgets._render_widget_base as rwb
 from htmltools import HTMLDependency, div
@@ -19,3 +20,82 @@ def test_render_bokeh_auto_output_ui_appends_bokeh_dependency(monkeypatch) -> No
     res = renderer.auto_output_ui()
 
     assert any(dep.name == "bokeh-inline" for dep in res.get_dependencies())
+
+
+def test_render_plotly_applies_figure_delta_in_place(monkeypatch) -> None:
+    pytest.importorskip("plotly")
+    import plotly.graph_objects as go
+    from ipywidgets.widgets import Widget
+
+    # Construct FigureWidgets without a Shiny session (i.e., init_shiny_widget())
+    monkeypatch.setattr(Widget, "_widget_construction_callback", None)
+
+    def figure(y: list[int], title: str, n: int = 1) -> go.FigureWidget:
+        traces = [go.Scatter(x=[1, 2], y=y) for _ in range(n)]
+        return go.FigureWidget(traces, layout={"title": {"text": title}})
+
+    old = figure([3, 4], "a")
+    uid = old.data[0].uid
+    sent: list[tuple[str, object]] = []
+    old.observe(
+        lambda change: change["new"] and sent.append((change["name"], change["new"])),
+        names=["_py2js_update", "_py2js_addTraces", "_py2js_deleteTraces"],
+    )
+
+    renderer = rw.render_plotly()
+    assert renderer._update_widget(old, figure([5, 4], "b", n=2)) is True
+
+    assert [name for name, _ in sent] == ["_py2js_update", "_py2js_addTraces"]
+    update = sent[0][1]
+    assert update["style_data"] == {"y": [[5, 4]]}  # type: ignore[index]
+    assert update["layout_data"] == {"title.text": "b"}  # type: ignore[index]
+    assert old.data[0].uid == uid
+    assert len(old.data) == 2
+
+    sent.clear()
+    assert renderer._update_widget(old, figure([5, 4], "b")) is True
+    assert [name for name, _ in sent] == ["_py2js_deleteTraces"]
+
+    # A different trace type can't be updated in place
+    assert renderer._update_widget(old, go.FigureWidget([go.Bar(y=[1])])) is False
+
+
+def test_render_altair_pushes_data_and_param_changes_in_place(monkeypatch) -> None:
+    alt = pytest.importorskip("altair")
+    from ipywidgets.widgets import Widget
+
+    # Construct JupyterCharts without a Shiny session (i.e., init_shiny_widget())
+    monkeypatch.setattr(Widget, "_widget_construction_callback", None)
+
+    def chart(rows: list[dict[str, int]], p: int, mark: str = "point"):
+        base = alt.Chart(alt.InlineData(values=rows))
+        return alt.JupyterChart(
+            getattr(base, f"mark_{mark}")()
+            .encode(x="a:Q")
+            .add_params(alt.param(name="p", value=p))
+        )
+
+    old = chart([{"a": 1}, {"a": 2}], p=1)
+    (name,) = old.spec["datasets"]
+    sent: list[str] = []
+    old.observe(lambda change: sent.append(change["name"]), names=["spec"])
+    updates: list[object] = []
+    old.observe(
+        lambda change: change["new"] and updates.append(change["new"]),
+        names=["_py_to_js_updates"],
+    )
+
+    renderer = rw.render_altair()
+    new = chart([{"a": 3}], p=2)
+    assert renderer._update_widget(old, new) is True
+
+    assert sent == []
+    assert updates == [
+        [{"namespace": "data", "name": name, "scope": [], "value": [{"a": 3}]}]
+    ]
+    assert old._params == {"p": 2}
+    assert old.spec["datasets"] == {name: [{"a": 3}]}
+    assert old.chart is new.chart
+
+    # Anything else about the chart changing means re-rendering it
+    assert renderer._update_widget(old, chart([{"a": 3}], p=2, mark="bar")) is False
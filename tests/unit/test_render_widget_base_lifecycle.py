@@ -1,4 +1,7 @@
 import asyncio
+import threading
+import warnings
+from typing import Any, Callable
 
 import pytest
 import shinywidgets._render_widget_base as rwb
@@ -193,7 +196,7 @@ def test_render_wraps_in_widget_render_context_and_restores_on_error(
     class _Boom(Exception):
         pass
 
-    async def _render_boom():  # type: ignore[no-untyped-def]
+    async def _render_boom(computed=None):  # type: ignore[no-untyped-def]
         assert rwb.WidgetRenderContext.is_rendering_widget(session) is True
         assert rwb.WidgetRenderContext.get_render_context(session) is ctx
         raise _Boom()
@@ -205,3 +208,433 @@ def test_render_wraps_in_widget_render_context_and_restores_on_error(
 
     assert vars(session)["__shinywidget_current_output_id"] == "old-id"
     assert vars(session)["__shinywidget_render_context"] == "old-ctx"
+
+
+@pytest.fixture
+def unmanaged_widgets(monkeypatch):
+    # Construct real ipywidgets without a Shiny session (i.e., init_shiny_widget())
+    from ipywidgets.widgets import Widget
+
+    monkeypatch.setattr(Widget, "_widget_construction_callback", None)
+
+
+def test_update_widget_diffs_traits_and_updates_child_widgets_in_place(
+    unmanaged_widgets,
+) -> None:
+    import ipywidgets
+
+    old = ipywidgets.Button(description="a")
+    old_layout = old.layout
+    new = ipywidgets.Button(description="b", layout={"width": "10px"})
+
+    assert rwb.update_widget(old, new) is True
+    assert old.description == "b"
+    assert old.layout is old_layout
+    assert old.layout.width == "10px"
+
+    assert rwb.update_widget(old, ipywidgets.IntSlider()) is False
+
+
+def test_reuse_updates_previous_widget_and_keeps_its_view(
+    monkeypatch, unmanaged_widgets
+) -> None:
+    import ipywidgets
+    from shiny.types import SilentCancelOutputException
+
+    session = FakeSession()
+    monkeypatch.setattr(rwb, "require_active_session", lambda _session: session)
+    monkeypatch.setattr(rwb, "get_current_context", lambda: FakeContext())
+    monkeypatch.setattr(rwb, "widget_pkg", lambda w: "ipywidgets")
+
+    closed: list[str] = []
+    values: list[ipywidgets.Widget] = []
+
+    # Stand in for init_shiny_widget()
+    def track(w: ipywidgets.Widget) -> ipywidgets.Widget:
+        for x in (w, *rwb.child_widgets(w)):
+            x._model_id = f"{type(x).__name__}{len(values)}"
+            closers = rwb.WidgetRenderContext.get_render_closers(session)
+            closers[x._model_id] = lambda id=x._model_id: closed.append(id)  # type: ignore[index]
+        values.append(w)
+        return w
+
+    r = rwb.render_widget_base(reuse=True)
+
+    @r
+    async def _():  # noqa: ANN202
+        return track(ipywidgets.Button(description=f"v{len(values)}"))
+
+    first_output = asyncio.run(r.render())
+    first = values[0]
+    assert first_output["model_id"] == first.model_id  # type: ignore[index]
+
+    with pytest.raises(SilentCancelOutputException):
+        asyncio.run(r.render())
+    assert first.description == "v1"
+    assert r._widget is first
+    assert sorted(closed) == ["Button1", "ButtonStyle1", "Layout1"]
+
+    # Something that can't update the previous widget replaces (and closes) it
+    monkeypatch.setattr(r, "fn", lambda: _value(track(ipywidgets.IntSlider())))
+    closed.clear()
+    assert asyncio.run(r.render())["model_id"] == values[2].model_id  # type: ignore[index]
+    assert sorted(closed) == ["Button0", "ButtonStyle0", "Layout0"]
+
+
+async def _value(x):  # type: ignore[no-untyped-def]
+    return x
+
+
+def test_cache_key_replays_widget_state_without_rendering(
+    monkeypatch, unmanaged_widgets
+) -> None:
+    import ipywidgets
+    import shinywidgets._render_cache as rc
+    from ipywidgets.widgets.widget import _instances
+
+    cache = rc.RenderCache(1_000_000)
+    monkeypatch.setattr(rwb, "RENDER_CACHE", cache)
+    calls: list[int] = []
+
+    def plot():  # noqa: ANN202
+        calls.append(1)
+        return ipywidgets.HBox([ipywidgets.Button(description="hi")])
+
+    # The same render function, in two different sessions
+    r1 = rwb.render_widget_base(cache_key=lambda: "key")(plot)
+    r2 = rwb.render_widget_base(cache_key=lambda: "key")(plot)
+
+    asyncio.run(r1._render())
+    # Nothing gets cached until the rendered widget's comm gets opened (with the state
+    # that's captured)
+    assert cache.nbytes == 0
+    assert calls == [1]
+    for w in rc._widget_tree(r1._widget):  # type: ignore[arg-type]
+        rc.widget_opened(w, *rc._remove_buffers(w.get_state()), 100)
+    assert cache.nbytes == 500
+
+    res = asyncio.run(r2._render())
+
+    assert calls == [1]
+    assert cache.counts["hit"] == 1
+    assert res["widget_pkg"] == "ipywidgets"  # type: ignore[index]
+    assert res["model_id"] == r2._widget.model_id  # type: ignore[index,union-attr]
+
+    # The replayed widgets reference each other by their new ids
+    box = r2._widget
+    assert isinstance(box, rc.CachedWidget)
+    (child_ref,) = box.get_state()["children"]
+    (child,) = [
+        w
+        for w in list(_instances.values())
+        if getattr(w, "_model_id", None) == child_ref[len("IPY_MODEL_") :]
+    ]
+    assert isinstance(child, rc.CachedWidget)
+    assert child.get_state()["description"] == "hi"
+    assert box.get_state()["_model_name"] == "HBoxModel"
+
+    # The stand-ins carry the original widgets' module traits and type (so they
+    # resolve to the same HTML dependency)
+    from shinywidgets._dependencies import widget_pkg, widget_type
+
+    orig = r1._widget
+    for name in rc._MODULE_TRAITS:
+        assert getattr(box, name) == getattr(orig, name)
+    assert box._view_name == "HBoxView"
+    assert widget_type(box) is ipywidgets.HBox
+    assert widget_type(child) is ipywidgets.Button
+    assert widget_pkg(child) == "ipywidgets"
+
+    # The stand-in has none of the original widget's behavior, so say so when it's
+    # accessed (but not when the widget was actually rendered)
+    with pytest.warns(UserWarning, match="recreated from a cached render"):
+        assert r2.widget is box
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert isinstance(r1.widget, ipywidgets.HBox)
+
+
+def test_returning_the_same_open_widget_is_a_no_op(
+    monkeypatch, unmanaged_widgets
+) -> None:
+    import ipywidgets
+    from shiny.types import SilentCancelOutputException
+    from shinywidgets._comm import OrphanedShinyComm
+
+    widget = ipywidgets.Button()
+    layouts: list[object] = []
+
+    def set_layout_defaults(w):  # type: ignore[no-untyped-def]
+        layouts.append(w)
+        return (w, True)
+
+    monkeypatch.setattr(rwb, "set_layout_defaults", set_layout_defaults)
+    monkeypatch.setattr(rwb, "widget_pkg", lambda w: "ipywidgets")
+
+    r = rwb.render_widget_base()
+
+    @r
+    async def _():  # noqa: ANN202
+        return widget
+
+    assert asyncio.run(r._render())["model_id"] == widget.model_id  # type: ignore[index]
+    with pytest.raises(SilentCancelOutputException):
+        asyncio.run(r._render())
+    assert layouts == [widget]
+    assert r._widget is widget
+
+    # Once closed (e.g., by its render context), it needs rendering again
+    widget.comm = OrphanedShinyComm(widget.model_id)
+    asyncio.run(r._render())
+    assert layouts == [widget, widget]
+
+
+def test_executor_runs_function_off_the_loop_and_inits_widgets_on_it(
+    monkeypatch,
+) -> None:
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    threads: dict[str, int] = {}
+
+    def as_widget(value):  # type: ignore[no-untyped-def]
+        threads["as_widget"] = threading.get_ident()
+        return value
+
+    monkeypatch.setattr(rwb, "as_widget", as_widget)
+
+    with ThreadPoolExecutor(1) as executor:
+        r = rwb.render_widget_base(executor=executor)
+
+        @r
+        def _():  # noqa: ANN202
+            threads["fn"] = threading.get_ident()
+            inits = rwb.deferred_widget_inits.get()
+            assert inits is not None
+            inits.append(
+                (None, lambda: threads.setdefault("init", threading.get_ident()))
+            )
+            return object()
+
+        asyncio.run(r._render())
+
+    main = threading.get_ident()
+    assert threads["fn"] != main
+    assert threads["as_widget"] == threads["fn"]
+    assert threads["init"] == main
+    assert rwb.deferred_widget_inits.get() is None
+
+
+def test_executor_requires_a_synchronous_function() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(1) as executor:
+        r = rwb.render_widget_base(executor=executor)
+
+        @r
+        async def _():  # noqa: ANN202
+            return None
+
+        with pytest.raises(TypeError, match="synchronous"):
+            asyncio.run(r._render())
+
+
+def test_executor_rejects_a_process_pool() -> None:
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(TypeError, match="ProcessPoolExecutor"):
+            rwb.render_widget_base(executor=executor)
+
+
+def _convert_when(gates: dict[object, threading.Event], built: list[Any]):  # type: ignore[no-untyped-def]
+    # Stands in for as_widget(): waits (on the worker thread) until the value's gate is
+    # opened, then constructs a Button (deferring its init, like init_shiny_widget())
+    import ipywidgets
+
+    def as_widget(value):  # type: ignore[no-untyped-def]
+        assert gates[value].wait(5)
+        w = ipywidgets.Button(description=str(value))
+        built.append(w)
+        inits = rwb.deferred_widget_inits.get()
+        inits.append((w, lambda: None))  # type: ignore[union-attr]
+        return w
+
+    return as_widget
+
+
+async def _settle(until: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if until():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_background_render_reads_calcs_and_is_superseded_by_the_latest_one(
+    monkeypatch, unmanaged_widgets
+) -> None:
+    from shiny import reactive
+    from shiny.reactive import Context
+    from shiny.types import SilentOperationInProgressException
+
+    session = FakeSession()
+    monkeypatch.setattr(rwb, "require_active_session", lambda _session: session)
+    monkeypatch.setattr(rwb, "widget_pkg", lambda w: "ipywidgets")
+
+    gates = {0: threading.Event(), 1: threading.Event()}
+    built: list[Any] = []
+    monkeypatch.setattr(rwb, "as_widget", _convert_when(gates, built))
+
+    n = reactive.Value(0)
+
+    @reactive.calc
+    def doubled() -> int:
+        return 2 * n()
+
+    r = rwb.render_widget_base(background=True)
+
+    @r
+    def _():  # noqa: ANN202
+        # (The function runs in the flush, so it can read calcs)
+        return doubled() // 2
+
+    async def render(ctx: Context):  # type: ignore[no-untyped-def]
+        with ctx():
+            return await r.render()
+
+    async def main() -> None:
+        ctx1 = Context()
+        with pytest.raises(SilentOperationInProgressException):
+            await render(ctx1)
+
+        # A dependency changes while the first render's widget is being constructed
+        with reactive.isolate():
+            n.set(1)
+        await reactive.flush()
+        assert ctx1._invalidated
+        ctx2 = Context()
+        with pytest.raises(SilentOperationInProgressException):
+            await render(ctx2)
+
+        # The first render's widget gets closed without being opened
+        gates[0].set()
+        await _settle(lambda: len(built) == 1 and built[0].comm is None)
+        assert not ctx2._invalidated
+
+        # Once the latest render is done, the output re-renders to display it
+        gates[1].set()
+        await _settle(lambda: ctx2._invalidated)
+        res = await render(Context())
+        assert res["model_id"] == built[1].model_id  # type: ignore[index]
+        assert built[1].description == "1"
+
+    try:
+        asyncio.run(main())
+    finally:
+        for gate in gates.values():
+            gate.set()
+
+
+def test_background_render_displays_a_widget_value_right_away(
+    monkeypatch, unmanaged_widgets
+) -> None:
+    import ipywidgets
+    from shiny.reactive import Context
+
+    session = FakeSession()
+    monkeypatch.setattr(rwb, "require_active_session", lambda _session: session)
+    monkeypatch.setattr(rwb, "widget_pkg", lambda w: "ipywidgets")
+    inited: list[Any] = []
+
+    r = rwb.render_widget_base(background=True)
+
+    @r
+    def _():  # noqa: ANN202
+        w = ipywidgets.Button()
+        inits = rwb.deferred_widget_inits.get()
+        inits.append((w, lambda: inited.append(w)))  # type: ignore[union-attr]
+        return w
+
+    async def main() -> None:
+        with Context()():
+            res = await r.render()
+        assert res["model_id"] == r._widget.model_id  # type: ignore[index,union-attr]
+        assert inited == [r._widget]
+
+    asyncio.run(main())
+
+
+def test_background_render_keeps_the_displayed_widget_until_it_is_replaced(
+    monkeypatch, unmanaged_widgets
+) -> None:
+    from shiny import reactive
+    from shiny.reactive import Context
+    from shiny.types import SilentOperationInProgressException
+
+    session = FakeSession()
+    monkeypatch.setattr(rwb, "require_active_session", lambda _session: session)
+    monkeypatch.setattr(rwb, "widget_pkg", lambda w: "ipywidgets")
+
+    gates = {0: threading.Event(), 1: threading.Event()}
+    built: list[Any] = []
+    convert = _convert_when(gates, built)
+    closed: list[int] = []
+
+    def as_widget(value):  # type: ignore[no-untyped-def]
+        w = convert(value)
+
+        # Stand in for init_shiny_widget()
+        def init() -> None:
+            closers = rwb.WidgetRenderContext.get_render_closers(session)
+            assert closers is not None
+            closers[str(value)] = lambda: closed.append(value)
+
+        rwb.deferred_widget_inits.get()[-1] = (w, init)  # type: ignore[index]
+        return w
+
+    monkeypatch.setattr(rwb, "as_widget", as_widget)
+
+    n = reactive.Value(0)
+    r = rwb.render_widget_base(background=True)
+
+    @r
+    def _():  # noqa: ANN202
+        return n()
+
+    async def render(ctx: Context):  # type: ignore[no-untyped-def]
+        with ctx():
+            return await r.render()
+
+    async def main() -> None:
+        # Display the first render
+        gates[0].set()
+        ctx = Context()
+        with pytest.raises(SilentOperationInProgressException):
+            await render(ctx)
+        await _settle(lambda: ctx._invalidated)
+        res = await render(Context())
+        assert res["model_id"] == built[0].model_id  # type: ignore[index]
+
+        # A dependency changes: the output shows progress, but the displayed widget
+        # stays open while the next render is in flight
+        with reactive.isolate():
+            n.set(1)
+        await reactive.flush()
+        ctx = Context()
+        with pytest.raises(SilentOperationInProgressException):
+            await render(ctx)
+        assert closed == []
+
+        # ...and gets closed once its replacement is displayed
+        gates[1].set()
+        await _settle(lambda: ctx._invalidated)
+        res = await render(Context())
+        assert res["model_id"] == built[1].model_id  # type: ignore[index]
+        assert closed == [0]
+
+    try:
+        asyncio.run(main())
+    finally:
+        for gate in gates.values():
+            gate.set()
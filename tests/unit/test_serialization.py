@@ -54,3 +54,28 @@ def test_json_packer_returns_str_and_round_trips() -> None:
 def test_json_packer_rejects_nan() -> None:
     with pytest.raises(ValueError):
         json_packer({"x": float("nan")})
+
+
+def test_pack_binary_frame_layout() -> None:
+    import struct
+
+    frame = ser.pack_binary_frame(
+        "shinywidgets_comm_msg",
+        json.dumps({"content": {"comm_id": "c1"}, "buffers": [2, 3]}),
+        [b"\x00\x01", memoryview(b"abc")],
+    )
+
+    # Shiny's binary custom message prefix: length of type, then type
+    n = frame[0]
+    assert frame[1 : 1 + n] == b"shinywidgets_comm_msg"
+    payload = frame[1 + n :]
+
+    (header_len,) = struct.unpack(">I", payload[:4])
+    header = json.loads(payload[4 : 4 + header_len].decode("utf-8"))
+    assert header == {"content": {"comm_id": "c1"}, "buffers": [2, 3]}
+    assert payload[4 + header_len :] == b"\x00\x01abc"
+
+
+def test_pack_binary_frame_rejects_long_type() -> None:
+    with pytest.raises(ValueError):
+        ser.pack_binary_frame("x" * 256, "{}", [])
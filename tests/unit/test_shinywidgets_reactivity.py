@@ -1,9 +1,13 @@
+import asyncio
+
 import pytest
 import shinywidgets._shinywidgets as sw
+from shinywidgets._trait_observers import _OBSERVERS
 
 
 class FakeContext:
     def __init__(self) -> None:
+        self.id = id(self)
         self.invalidated = 0
         self._on_invalidate = []
 
@@ -32,10 +36,10 @@ class FakeWidget:
         return name in self._traits
 
     def observe(self, handler, names, type):  # type: ignore[no-untyped-def]
-        self.observe_calls.append((handler, list(names), type))
+        self.observe_calls.append((handler, names, type))
 
     def unobserve(self, handler, names, type):  # type: ignore[no-untyped-def]
-        self.unobserve_calls.append((handler, list(names), type))
+        self.unobserve_calls.append((handler, names, type))
 
 
 def test_reactive_depend_outside_context_raises(monkeypatch) -> None:
@@ -77,34 +81,165 @@ def test_reactive_depend_validates_trait_existence(monkeypatch) -> None:
     assert "FakeWidget" in msg
 
 
-def test_reactive_depend_observe_and_cleanup_wiring(monkeypatch) -> None:
+def test_reactive_depend_shares_one_observer_per_trait(monkeypatch) -> None:
+    ctx1, ctx2 = FakeContext(), FakeContext()
+    w = FakeWidget({"a": 1, "b": 2})
+
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx1)
+    sw.reactive_depend(w, ["a", "b"], type="change")  # type: ignore[arg-type]
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx2)
+    sw.reactive_depend(w, "a", type="change")  # type: ignore[arg-type]
+    sw.reactive_depend(w, "a", type="change")  # type: ignore[arg-type]
+
+    assert [(names, typ) for _, names, typ in w.observe_calls] == [
+        ("a", "change"),
+        ("b", "change"),
+    ]
+    handle_a, handle_b = (handler for handler, _, _ in w.observe_calls)
+
+    # A change invalidates every dependent context (once), which then drops out
+    handle_a(change={})
+    assert (ctx1.invalidated, ctx2.invalidated) == (1, 1)
+    handle_a(change={})
+    assert (ctx1.invalidated, ctx2.invalidated) == (1, 1)
+
+    # The observers stay installed for the next contexts
+    ctx3 = FakeContext()
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx3)
+    sw.reactive_depend(w, "b", type="change")  # type: ignore[arg-type]
+    handle_b(change={})
+    assert ctx3.invalidated == 1
+    assert len(w.observe_calls) == 2
+    assert w.unobserve_calls == []
+
+
+def test_reactive_read_returns_values_in_order(monkeypatch) -> None:
     ctx = FakeContext()
     monkeypatch.setattr(sw, "get_current_context", lambda: ctx)
     w = FakeWidget({"a": 1, "b": 2})
 
-    sw.reactive_depend(w, ["a", "b"], type="change")  # type: ignore[arg-type]
+    assert sw.reactive_read(w, "a") == 1  # type: ignore[arg-type]
+    assert sw.reactive_read(w, ["a", "b"]) == (1, 2)  # type: ignore[arg-type]
 
-    assert len(w.observe_calls) == 1
-    handler, names, typ = w.observe_calls[0]
-    assert names == ["a", "b"]
-    assert typ == "change"
 
-    handler(change={})
-    assert ctx.invalidated == 1
+def test_reactive_depend_rejects_debounce_with_throttle(monkeypatch) -> None:
+    monkeypatch.setattr(sw, "get_current_context", lambda: FakeContext())
+    w = FakeWidget({"x": 1})
+
+    with pytest.raises(ValueError, match="debounce"):
+        sw.reactive_depend(w, "x", debounce=1, throttle=1)  # type: ignore[arg-type]
 
-    ctx.run_invalidate_callbacks()
 
-    assert len(w.unobserve_calls) == 1
-    uhandler, unames, utyp = w.unobserve_calls[0]
-    assert uhandler is handler
-    assert unames == ["a", "b"]
-    assert utyp == "change"
+def test_reactive_read_debounce_invalidates_once_changes_settle(monkeypatch) -> None:
+    w = FakeWidget({"x": 1})
+    ctx = FakeContext()
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx)
 
+    async def main() -> None:
+        sw.reactive_read(w, "x", debounce=0.05)  # type: ignore[arg-type]
+        # Another read shares the observer
+        sw.reactive_read(w, "x", debounce=0.05)  # type: ignore[arg-type]
+        assert len(w.observe_calls) == 1
+        ((handler, names, _),) = w.observe_calls
+        assert names == "x"
 
-def test_reactive_read_returns_values_in_order(monkeypatch) -> None:
+        for _ in range(3):
+            handler({})
+            await asyncio.sleep(0.02)
+        assert ctx.invalidated == 0
+        await asyncio.sleep(0.1)
+        assert ctx.invalidated == 1
+
+    asyncio.run(main())
+
+
+def test_reactive_read_throttle_bounds_the_invalidation_rate(monkeypatch) -> None:
+    w = FakeWidget({"x": 1})
+    ctx1, ctx2 = FakeContext(), FakeContext()
+
+    async def main() -> None:
+        monkeypatch.setattr(sw, "get_current_context", lambda: ctx1)
+        sw.reactive_read(w, "x", throttle=0.05)  # type: ignore[arg-type]
+        ((handler, _, _),) = w.observe_calls
+
+        # The first change invalidates right away...
+        handler({})
+        assert ctx1.invalidated == 1
+
+        # ...but later ones, no sooner than the throttle allows
+        monkeypatch.setattr(sw, "get_current_context", lambda: ctx2)
+        sw.reactive_read(w, "x", throttle=0.05)  # type: ignore[arg-type]
+        handler({})
+        handler({})
+        assert ctx2.invalidated == 0
+        await asyncio.sleep(0.1)
+        assert ctx2.invalidated == 1
+        assert len(w.observe_calls) == 1
+
+    asyncio.run(main())
+
+
+def test_reactive_read_tolerance_ignores_insignificant_changes(monkeypatch) -> None:
+    w = FakeWidget({"bounds": [[0.0, 0.0], [1.0, 1.0]]})
     ctx = FakeContext()
     monkeypatch.setattr(sw, "get_current_context", lambda: ctx)
-    w = FakeWidget({"a": 1, "b": 2})
 
-    assert sw.reactive_read(w, "a") == 1  # type: ignore[arg-type]
-    assert sw.reactive_read(w, ["a", "b"]) == (1, 2)  # type: ignore[arg-type]
+    sw.reactive_read(w, "bounds", atol=0.01)  # type: ignore[arg-type]
+    (handler, _, _) = w.observe_calls[0]
+
+    # Compared to what was read (not to the previous change), so drift adds up
+    handler({"new": [[0.004, 0.0], [1.0, 1.0]]})
+    handler({"new": [[0.008, 0.0], [1.0, 1.0]]})
+    assert ctx.invalidated == 0
+    handler({"new": [[0.012, 0.0], [1.0, 1.0]]})
+    assert ctx.invalidated == 1
+
+    # A structural change is always significant
+    w.bounds = [[0.012, 0.0]]
+    ctx2 = FakeContext()
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx2)
+    sw.reactive_read(w, "bounds", atol=0.01)  # type: ignore[arg-type]
+    handler({"new": [[0.012, 0.0], [1.0, 1.0]]})
+    assert ctx2.invalidated == 1
+
+
+def test_reactive_read_custom_equality(monkeypatch) -> None:
+    w = FakeWidget({"x": 1.2})
+    ctx = FakeContext()
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx)
+
+    def same_integer(old, new):  # type: ignore[no-untyped-def]
+        return round(old) == round(new)
+
+    sw.reactive_read(w, "x", equals=same_integer)  # type: ignore[arg-type]
+    (handler, _, _) = w.observe_calls[0]
+    handler({"new": 0.9})
+    assert ctx.invalidated == 0
+    handler({"new": 1.7})
+    assert ctx.invalidated == 1
+
+    with pytest.raises(ValueError, match="equals"):
+        sw.reactive_read(w, "x", equals=same_integer, rtol=0.1)  # type: ignore[arg-type]
+
+
+def test_reactive_read_inline_equals_shares_one_observer(monkeypatch) -> None:
+    w = FakeWidget({"x": 1.2})
+
+    contexts = [FakeContext() for _ in range(5)]
+    for ctx in contexts:
+        monkeypatch.setattr(sw, "get_current_context", lambda ctx=ctx: ctx)
+        sw.reactive_read(w, "x", equals=lambda a, b: round(a) == round(b))  # type: ignore[arg-type]
+        sw.reactive_read(w, "x", atol=0.5)  # type: ignore[arg-type]
+    assert len(_OBSERVERS[w]) == 1  # type: ignore[index]
+    assert len(w.observe_calls) == 1
+
+    # Each context still gets its own filter, relative to what it read
+    (handler, _, _) = w.observe_calls[0]
+    w.x = 0.9
+    monkeypatch.setattr(sw, "get_current_context", lambda: contexts[0])
+    sw.reactive_read(w, "x")  # type: ignore[arg-type]
+    handler({"new": 1.1})
+    assert contexts[0].invalidated == 1
+    assert all(ctx.invalidated == 0 for ctx in contexts[1:])
+    handler({"new": 1.8})
+    assert all(ctx.invalidated == 1 for ctx in contexts)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 from typing import Any, Dict
@@ -30,7 +31,6 @@ def reset_shinywidgets_globals(monkeypatch: pytest.MonkeyPatch) -> Dict[str, Any
     import shinywidgets._shinywidgets as sw
 
     monkeypatch.setattr(sw, "SESSIONS", sw.WeakSet())
-    monkeypatch.setattr(sw, "SESSION_WIDGET_ID_MAP", {})
     monkeypatch.setattr(sw, "WIDGET_INSTANCE_MAP", {})
     return {"sw": sw}
 
@@ -55,7 +55,7 @@ def test_init_returns_early_for_stub_session(monkeypatch, reset_shinywidgets_glo
     sw.init_shiny_widget(w)  # type: ignore[arg-type]
 
     assert session not in sw.SESSIONS
-    assert sw.SESSION_WIDGET_ID_MAP == {}
+    assert "__shinywidget_comm_manager" not in vars(session)
     assert reactive.effects == []
     assert session.app._dependency_handler.mounts == []
 
@@ -70,7 +70,7 @@ def test_session_is_wired_once_and_open_effect_assigns_comm(
 
     monkeypatch.setattr(sw, "get_current_session", lambda: root)
     monkeypatch.setattr(sw, "reactive", reactive)
-    monkeypatch.setattr(sw, "COMM_MANAGER", comm_mgr)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
     monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
     monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
     monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "w1"})())
@@ -118,7 +118,7 @@ def test_comm_send_handler_routes_to_existing_comm(
 
     monkeypatch.setattr(sw, "get_current_session", lambda: root)
     monkeypatch.setattr(sw, "reactive", reactive)
-    monkeypatch.setattr(sw, "COMM_MANAGER", comm_mgr)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
     monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
     monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
     monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "w1"})())
@@ -140,6 +140,46 @@ def test_comm_send_handler_routes_to_existing_comm(
     assert comm_mgr.comms["w1"].last_msg == {"content": {"comm_id": "w1"}}
 
 
+def test_comm_send_handler_is_scoped_to_the_session(
+    monkeypatch, reset_shinywidgets_globals
+):
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    s1 = FakeSession(session_id="s1")
+    s2 = FakeSession(session_id="s2")
+    current = {"session": s1}
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: current["session"])
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
+    monkeypatch.setattr(sw, "_remove_buffers", lambda state: (state, [], []))
+    monkeypatch.setattr(sw, "widget_comm_patch", lambda: _nullcontext())
+    monkeypatch.setattr(sw, "ShinyComm", FakeShinyComm)
+
+    for session in (s1, s2):
+        current["session"] = session
+        monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": session.id})())
+        sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+        open_eff = next(
+            e
+            for e in reactive.effects
+            if e.fn.__name__ == "_open_shiny_comm" and not e.destroyed
+        )
+        open_eff()
+
+    m1 = sw.ShinyCommManager.get(s1)
+    m2 = sw.ShinyCommManager.get(s2)
+    assert list(m1.comms) == ["s1"]
+    assert list(m2.comms) == ["s2"]
+
+    # Session 2's inbound handler can't reach session 1's comm
+    send_effs = [e for e in reactive.effects if e.fn.__name__ == "_"]
+    s2.input._shinywidgets_comm_send_value = json.dumps({"content": {"comm_id": "s1"}})
+    send_effs[1]()
+    assert m1.comms["s1"].last_msg is None
+
+
 def test_session_end_cleanup_closes_widgets_and_clears_maps(
     monkeypatch, reset_shinywidgets_globals
 ):
@@ -150,7 +190,7 @@ def test_session_end_cleanup_closes_widgets_and_clears_maps(
 
     monkeypatch.setattr(sw, "get_current_session", lambda: root)
     monkeypatch.setattr(sw, "reactive", reactive)
-    monkeypatch.setattr(sw, "COMM_MANAGER", comm_mgr)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
     monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
     monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
     monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "w1"})())
@@ -159,16 +199,14 @@ def test_session_end_cleanup_closes_widgets_and_clears_maps(
     monkeypatch.setattr(sw, "ShinyComm", FakeShinyComm)
 
     w = FakeWidget()
-    sw.WIDGET_INSTANCE_MAP["w1"] = w
-
     sw.init_shiny_widget(w)  # type: ignore[arg-type]
-    assert root.id in sw.SESSION_WIDGET_ID_MAP
+    assert comm_mgr.widgets["w1"] is w
     assert root in sw.SESSIONS
 
     root.end()
     assert root not in sw.SESSIONS
     assert w.closed is True
-    assert root.id not in sw.SESSION_WIDGET_ID_MAP
+    assert len(comm_mgr.widgets) == 0
 
 
 def test_render_context_invalidation_closes_widget_and_preserves_model_id(
@@ -182,7 +220,7 @@ def test_render_context_invalidation_closes_widget_and_preserves_model_id(
 
     monkeypatch.setattr(sw, "get_current_session", lambda: root)
     monkeypatch.setattr(sw, "reactive", reactive)
-    monkeypatch.setattr(sw, "COMM_MANAGER", comm_mgr)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
     monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
     monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
     monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "w1"})())
@@ -208,6 +246,43 @@ def test_render_context_invalidation_closes_widget_and_preserves_model_id(
     assert "w1" not in sw.WIDGET_INSTANCE_MAP
 
 
+def test_widgets_constructed_off_the_loop_are_tied_to_the_session_later(
+    monkeypatch, reset_shinywidgets_globals
+):
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    comm_mgr = FakeCommManager()
+    root = FakeSession(session_id="root")
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: root)
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
+    monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "w1"})())
+
+    inits: list[Any] = []
+    token = sw.deferred_widget_inits.set(inits)
+    try:
+        w = FakeWidget()
+        sw.init_shiny_widget(w)  # type: ignore[arg-type]
+    finally:
+        sw.deferred_widget_inits.reset(token)
+
+    # The widget has its id (and a placeholder comm), but isn't known to the session
+    assert w._model_id == "w1"
+    assert getattr(w.comm, "comm_id", None) == "w1"
+    assert root not in sw.SESSIONS
+    assert reactive.effects == []
+
+    ((widget, init),) = inits
+    assert widget is w
+    init()
+    assert root in sw.SESSIONS
+    assert comm_mgr.widgets["w1"] is w
+    assert "w1" in sw.pending_opens(root)
+
+
 def test_nbextensions_mount_when_widget_dep_has_subdir(
     monkeypatch, reset_shinywidgets_globals
 ):
@@ -222,7 +297,7 @@ def test_nbextensions_mount_when_widget_dep_has_subdir(
 
     monkeypatch.setattr(sw, "get_current_session", lambda: root)
     monkeypatch.setattr(sw, "reactive", reactive)
-    monkeypatch.setattr(sw, "COMM_MANAGER", comm_mgr)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
     monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
     monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "w1"})())
     monkeypatch.setattr(sw, "_remove_buffers", lambda state: (state, [], []))
@@ -238,7 +313,327 @@ def test_nbextensions_mount_when_widget_dep_has_subdir(
     assert any(m["path"] == "/nbextensions/somewidget" for m in mounts)
 
 
-def test_reactive_depend_registers_and_unregisters_on_invalidate(monkeypatch):
+def test_static_files_are_mounted_once_per_app(monkeypatch, reset_shinywidgets_globals):
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    comm_mgr = FakeCommManager()
+    s1 = FakeSession(session_id="s1")
+    s2 = FakeSession(session_id="s2")
+    s2.app = s1.app
+    current = {"session": s1}
+
+    class Dep:
+        name = "somewidget"
+        source = {"subdir": "/tmp/somewidget"}
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: current["session"])
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "widget_comm_patch", lambda: _nullcontext())
+    monkeypatch.setattr(sw, "ShinyComm", FakeShinyComm)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", False)
+    monkeypatch.setattr(sw, "require_dependency", lambda w, session, warn: Dep())
+
+    for session in (s1, s2, s1, s2):
+        current["session"] = session
+        sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+
+    mounts = s1.app._dependency_handler.mounts
+    assert [m["path"] for m in mounts] == ["/dist/", "/nbextensions/somewidget"]
+
+
+def test_html_dependencies_are_sent_once_per_session(
+    monkeypatch, reset_shinywidgets_globals
+):
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    comm_mgr = FakeCommManager()
+    s1 = FakeSession(session_id="s1")
+    s2 = FakeSession(session_id="s2")
+    s2.app = s1.app
+    current = {"session": s1}
+    dep = sw.HTMLDependency("somewidget", "1.0.0", source={"subdir": "/tmp/w"})
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: current["session"])
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "_remove_buffers", lambda state: (state, [], []))
+    monkeypatch.setattr(sw, "widget_comm_patch", lambda: _nullcontext())
+    monkeypatch.setattr(sw, "ShinyComm", FakeShinyComm)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", False)
+    monkeypatch.setattr(sw, "require_dependency", lambda w, session, warn: dep)
+
+    html_deps = []
+    for session in (s1, s1, s2):
+        current["session"] = session
+        w = FakeWidget()
+        sw.init_shiny_widget(w)  # type: ignore[arg-type]
+        open_eff = next(
+            e
+            for e in reactive.effects
+            if e.fn.__name__ == "_open_shiny_comm" and not e.destroyed
+        )
+        open_eff()
+        html_deps.append(w.comm.keys["html_deps"])
+
+    # Only the first comm_open of each session carries the dependency...
+    assert html_deps == [["dep1"], [], ["dep1"]]
+    # ...and it only gets rendered once per app
+    assert len(s1._process_ui_calls) == 1
+    assert len(s2._process_ui_calls) == 0
+
+
+def test_html_dependencies_of_cancelled_or_failed_opens_are_sent_again(
+    monkeypatch, reset_shinywidgets_globals
+):
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    comm_mgr = FakeCommManager()
+    session = FakeSession()
+    ctx = FakeContext()
+    rendering = {"value": True}
+    dep = sw.HTMLDependency("somewidget", "1.0.0", source={"subdir": "/tmp/w"})
+
+    class FailingShinyComm(FakeShinyComm):
+        def __init__(self, **kwargs: Any) -> None:
+            raise ValueError("Can't serialize")
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: session)
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "widget_comm_patch", lambda: _nullcontext())
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", False)
+    monkeypatch.setattr(sw, "require_dependency", lambda w, session, warn: dep)
+    monkeypatch.setattr(
+        sw.WidgetRenderContext,
+        "is_rendering_widget",
+        staticmethod(lambda _s: rendering["value"]),
+    )
+    monkeypatch.setattr(
+        sw.WidgetRenderContext, "get_render_context", staticmethod(lambda _s: ctx)
+    )
+    monkeypatch.setattr(sw, "session_context", lambda _s: _nullcontext())
+
+    def open_pending() -> None:
+        next(
+            e
+            for e in reactive.effects
+            if e.fn.__name__ == "_open_shiny_comm" and not e.destroyed
+        )()
+
+    # The render gets invalidated before the widget's open goes out
+    sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+    ctx.run_on_invalidate()
+    rendering["value"] = False
+
+    # The open fails (e.g., the state can't be serialized)
+    monkeypatch.setattr(sw, "ShinyComm", FailingShinyComm)
+    sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        open_pending()
+
+    monkeypatch.setattr(sw, "ShinyComm", FakeShinyComm)
+    w1 = FakeWidget()
+    w2 = FakeWidget()
+    sw.init_shiny_widget(w1)  # type: ignore[arg-type]
+    sw.init_shiny_widget(w2)  # type: ignore[arg-type]
+    open_pending()
+    assert w1.comm.keys["html_deps"] == ["dep1"]
+    assert w2.comm.keys["html_deps"] == []
+
+
+def test_one_effect_opens_all_pending_widgets_children_first(
+    monkeypatch, reset_shinywidgets_globals
+):
+    import shinywidgets._utils as utils
+
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    comm_mgr = FakeCommManager()
+    root = FakeSession(session_id="root")
+    ids = iter(["parent", "child1", "child2", "other"])
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: root)
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
+    monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": next(ids)})())
+    monkeypatch.setattr(sw, "_remove_buffers", lambda state: (state, [], []))
+    monkeypatch.setattr(sw, "widget_comm_patch", lambda: _nullcontext())
+    monkeypatch.setattr(sw, "ShinyComm", FakeShinyComm)
+    monkeypatch.setattr(sw, "Widget", FakeWidget)
+    monkeypatch.setattr(utils, "Widget", FakeWidget)
+
+    class Parent(FakeWidget):
+        keys = ["children"]
+
+    parent = Parent()
+    sw.init_shiny_widget(parent)  # type: ignore[arg-type]
+    parent.children = (FakeWidget(), FakeWidget())  # type: ignore[attr-defined]
+    for child in parent.children:  # type: ignore[attr-defined]
+        sw.init_shiny_widget(child)  # type: ignore[arg-type]
+    other = FakeWidget()
+    sw.init_shiny_widget(other)  # type: ignore[arg-type]
+
+    # A widget closed before it ever opened never gets opened
+    sw.cancel_open(root, "other")
+
+    (open_eff,) = [e for e in reactive.effects if e.fn.__name__ == "_open_shiny_comm"]
+    assert open_eff.priority == 99999
+    open_eff()
+    assert open_eff.destroyed is True
+    assert comm_mgr.registered == ["child1", "child2", "parent"]
+    assert sw.pending_opens(root) == {}
+
+    # The next widget schedules a new effect
+    monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": "later"})())
+    sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+    effs = [e for e in reactive.effects if e.fn.__name__ == "_open_shiny_comm"]
+    assert len(effs) == 2
+
+
+def test_widgets_left_pending_by_a_failed_open_get_opened_by_the_next_effect(
+    monkeypatch, reset_shinywidgets_globals
+):
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    comm_mgr = FakeCommManager()
+    root = FakeSession(session_id="root")
+    ids = iter(["w1", "bad", "w2", "w3"])
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: root)
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw.ShinyCommManager, "get", staticmethod(lambda _s: comm_mgr))
+    monkeypatch.setattr(sw, "StaticFiles", FakeStaticFiles)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
+    monkeypatch.setattr(sw, "uuid4", lambda: type("U", (), {"hex": next(ids)})())
+    monkeypatch.setattr(sw, "_remove_buffers", lambda state: (state, [], []))
+    monkeypatch.setattr(sw, "widget_comm_patch", lambda: _nullcontext())
+
+    class ShinyComm(FakeShinyComm):
+        def __init__(self, *, comm_id: str, **kwargs: Any) -> None:
+            if comm_id == "bad":
+                raise ValueError("can't serialize")
+            super().__init__(comm_id=comm_id, **kwargs)
+
+    monkeypatch.setattr(sw, "ShinyComm", ShinyComm)
+
+    def open_effects() -> list:
+        return [
+            e
+            for e in reactive.effects
+            if e.fn.__name__ == "_open_shiny_comm" and not e.destroyed
+        ]
+
+    for _ in range(3):
+        sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+    (open_eff,) = open_effects()
+    with pytest.raises(ValueError):
+        open_eff()
+    assert open_eff.destroyed
+    assert comm_mgr.registered == ["w1"]
+    assert list(sw.pending_opens(root)) == ["w2"]
+
+    # The next widget schedules a new effect, which opens what was left, too
+    sw.init_shiny_widget(FakeWidget())  # type: ignore[arg-type]
+    (open_eff,) = open_effects()
+    open_eff()
+    assert comm_mgr.registered == ["w1", "w2", "w3"]
+    assert sw.pending_opens(root) == {}
+
+
+def test_identical_layouts_share_a_model_until_written(
+    monkeypatch, reset_shinywidgets_globals
+):
+    import ipywidgets
+    import shinywidgets._comm as comm
+
+    sw = reset_shinywidgets_globals["sw"]
+    reactive = FakeReactive()
+    session = FakeSession()
+
+    monkeypatch.setattr(sw, "get_current_session", lambda: session)
+    monkeypatch.setattr(comm, "get_current_session", lambda: session)
+    monkeypatch.setattr(sw, "reactive", reactive)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_CDN_ONLY", True)
+    monkeypatch.setattr(sw, "SHINYWIDGETS_SHARED_LAYOUTS", True)
+
+    def sent(phase: str) -> list:
+        handlers = getattr(session, f"_{phase}_handlers")
+        for fn in list(handlers):
+            asyncio.run(fn())
+        handlers.clear()
+        msgs = []
+        for _, txt in session.sent_messages:
+            for entry in json.loads(txt)["messages"]:
+                msg = entry["msg"]
+                msgs.extend(msg if isinstance(msg, list) else [msg])
+        session.sent_messages.clear()
+        return msgs
+
+    b1 = ipywidgets.Button(description="a")
+    b2 = ipywidgets.Button(description="b")
+    try:
+        (open_eff,) = [
+            e for e in reactive.effects if e.fn.__name__ == "_open_shiny_comm"
+        ]
+        open_eff()
+
+        # One Layout and one ButtonStyle model, shared by both buttons
+        opens = sent("flush")
+        names = [m["content"]["data"]["state"]["_model_name"] for m in opens]
+        assert names == [
+            "LayoutModel",
+            "ButtonStyleModel",
+            "ButtonModel",
+            "ButtonModel",
+        ]
+        assert (
+            b1.layout.model_id == b2.layout.model_id == opens[0]["content"]["comm_id"]
+        )
+        assert b1.layout._model_id != b2.layout._model_id
+
+        # Writing to a shared layout gives it its own model (with the new state), and
+        # the parent gets pointed at it
+        b1.layout.width = "100px"
+        (open_msg,) = sent("flush")
+        assert open_msg["content"]["comm_id"] == b1.layout._model_id
+        assert open_msg["content"]["data"]["state"]["width"] == "100px"
+        (update,) = sent("flushed")
+        assert update["content"]["comm_id"] == b1.model_id
+        assert update["content"]["data"]["state"] == {
+            "layout": f"IPY_MODEL_{b1.layout._model_id}"
+        }
+        assert b2.layout.model_id == opens[0]["content"]["comm_id"]
+
+        # The client may message a shared model
+        shared_id = b2.layout.model_id
+        mgr = comm.ShinyCommManager.get(session)  # type: ignore[arg-type]
+        mgr.comms[shared_id].handle_msg({"content": {"data": {}}})
+
+        # It's closed once the last widget pointing at it is
+        b2.layout.close()
+        (closed,) = sent("flushed")
+        assert closed["content"]["comm_id"] == shared_id
+        assert shared_id not in mgr.comms
+        style_id = b1.style.model_id
+        b1.style.close()
+        assert sent("flushed") == []
+        b2.style.close()
+        (closed,) = sent("flushed")
+        assert closed["content"]["comm_id"] == style_id
+        assert vars(session)["__shinywidget_shared_models"] == {}
+    finally:
+        for w in (b1, b2):
+            for x in (w, w.layout, w.style):
+                x.close()
+
+
+def test_reactive_depend_keeps_a_single_observer_across_contexts(monkeypatch):
     import shinywidgets._shinywidgets as sw
 
     ctx = FakeContext()
@@ -246,15 +641,49 @@ def test_reactive_depend_registers_and_unregisters_on_invalidate(monkeypatch):
 
     w = FakeWidget()
     sw.reactive_depend(w, "x")  # type: ignore[arg-type]
-    assert any(c.startswith("observe:") for c in w.calls)
+    assert w.calls == ["observe:x:change"]
 
-    ctx.run_on_invalidate()
-    assert any(c.startswith("unobserve:") for c in w.calls)
+    fn, _, _ = w._observed
+    fn({})
+    assert ctx.invalidated
+
+    ctx2 = FakeContext()
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx2)
+    sw.reactive_depend(w, "x")  # type: ignore[arg-type]
+    fn({})
+    assert ctx2.invalidated
+    assert w.calls == ["observe:x:change"]
 
     with pytest.raises(ValueError):
         sw.reactive_depend(w, "not_a_trait")  # type: ignore[arg-type]
 
 
+def test_reactive_depend_forgets_contexts_invalidated_elsewhere(monkeypatch):
+    import shinywidgets._shinywidgets as sw
+    from shinywidgets._trait_observers import TraitObserver
+
+    ctx = FakeContext()
+    monkeypatch.setattr(sw, "get_current_context", lambda: ctx)
+
+    w = FakeWidget()
+    w.x = 0  # type: ignore[attr-defined]
+    checked = []
+    sw.reactive_depend(  # type: ignore[arg-type]
+        w, "x", equals=lambda old, new: checked.append(new) or False
+    )
+    observer = TraitObserver.get(w, "x", "change")  # type: ignore[arg-type]
+    assert ctx in observer._contexts
+
+    # Invalidated by some other dependency, while still alive
+    ctx.run_on_invalidate()
+    assert ctx not in observer._contexts
+
+    fn, _, _ = w._observed
+    fn({"new": 1})
+    assert checked == []
+    assert not ctx.invalidated
+
+
 def test_reactive_depend_requires_reactive_context(monkeypatch):
     import shinywidgets._shinywidgets as sw
 
@@ -273,7 +702,7 @@ def test_reactive_read_returns_values_and_delegates_depend(monkeypatch):
     monkeypatch.setattr(
         sw,
         "reactive_depend",
-        lambda widget, names, type="change": seen.append((widget, names, type)),
+        lambda widget, names, type="change", **kw: seen.append((widget, names, type)),
     )
 
     class W: